@@ -0,0 +1,278 @@
+"""
+Governor de requisições ao Supabase Auth - PETDor2
+
+O rate_limiter.py limita cada usuário/sessão. Este módulo limita o
+PROCESSO inteiro frente à cota do projeto no Supabase Auth, que é
+compartilhada por todos (ex.: e-mails de cadastro/recuperação por hora).
+
+- Um token bucket por categoria de chamada ("email", "login", "geral")
+- Sem token: a chamada espera na fila até AUTH_ESPERA_MAX_SEGUNDOS;
+  acima disso é recusada (AuthSobrecarregadoError) antes de gerar um 429
+- Um 429 da API abre um cooldown compartilhado da categoria, usando o
+  "after N seconds" da mensagem ou backoff exponencial
+- obter_folga() expõe a capacidade restante para a interface
+"""
+
+# ==========================================================
+# 📚 IMPORTS
+# ==========================================================
+
+import logging
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from backend.utils.config import (
+    AUTH_COTA_EMAILS_POR_HORA,
+    AUTH_COTA_LOGINS_POR_5MIN,
+    AUTH_COTA_GERAL_POR_5MIN,
+    AUTH_ESPERA_MAX_SEGUNDOS,
+)
+
+logger = logging.getLogger(__name__)
+
+
+# ==========================================================
+# 🕐 CONFIGURAÇÕES
+# ==========================================================
+
+# capacidade = rajada máxima; periodo_segundos = tempo para repor tudo
+COTAS_AUTH = {
+    "email": {"capacidade": AUTH_COTA_EMAILS_POR_HORA, "periodo_segundos": 3600},
+    "login": {"capacidade": AUTH_COTA_LOGINS_POR_5MIN, "periodo_segundos": 300},
+    "geral": {"capacidade": AUTH_COTA_GERAL_POR_5MIN, "periodo_segundos": 300},
+}
+
+BACKOFF_INICIAL = 5  # segundos
+BACKOFF_MAXIMO = 300  # segundos
+
+_RE_APOS_SEGUNDOS = re.compile(r"after (\d+) seconds?")
+
+
+# ==========================================================
+# ⚠️ EXCEÇÃO
+# ==========================================================
+
+class AuthSobrecarregadoError(Exception):
+    """Requisição recusada localmente para não estourar a cota do Auth."""
+
+    def __init__(self, categoria: str, espera: float):
+        self.categoria = categoria
+        self.espera = espera
+        super().__init__(
+            f"Cota do Supabase Auth ({categoria}) esgotada; "
+            f"tente em {int(espera) + 1}s"
+        )
+
+    @property
+    def mensagem(self) -> str:
+        """Texto amigável para a interface."""
+        if self.espera < 60:
+            return f"⏱️ Muitas solicitações no momento. Aguarde {int(self.espera) + 1} segundos."
+        return f"⏱️ Muitas solicitações no momento. Aguarde {int(self.espera / 60) + 1} minuto(s)."
+
+
+# ==========================================================
+# 🪣 BUCKET POR CATEGORIA
+# ==========================================================
+
+class _Bucket:
+    """
+    Token bucket com reserva: quem não encontra token reserva o próximo
+    (tokens negativos) e dorme até a sua vez — uma fila FIFO implícita.
+    """
+
+    def __init__(self, capacidade: int, periodo_segundos: float):
+        self.capacidade = max(int(capacidade), 1)
+        self.taxa = self.capacidade / float(periodo_segundos)  # tokens/s
+        self.tokens = float(self.capacidade)
+        self.atualizado_em = time.monotonic()
+        self.cooldown_ate = 0.0
+        self.falhas_seguidas = 0
+        self.na_fila = 0
+        self.recusadas = 0
+
+    def repor(self, agora: float) -> None:
+        if agora <= self.atualizado_em:
+            return
+        decorrido = agora - self.atualizado_em
+        self.tokens = min(self.capacidade, self.tokens + decorrido * self.taxa)
+        self.atualizado_em = agora
+
+    def espera_para_token(self, agora: float) -> float:
+        """Segundos até haver um token livre para a próxima reserva."""
+        cooldown = max(self.cooldown_ate - agora, 0.0)
+        falta = max(1.0 - self.tokens, 0.0) / self.taxa
+        return max(cooldown, falta)
+
+
+_lock = threading.Lock()
+_buckets: Dict[str, _Bucket] = {}
+
+
+def _bucket(categoria: str) -> _Bucket:
+    b = _buckets.get(categoria)
+    if b is None:
+        cota = COTAS_AUTH.get(categoria, COTAS_AUTH["geral"])
+        b = _buckets[categoria] = _Bucket(cota["capacidade"], cota["periodo_segundos"])
+    return b
+
+
+# ==========================================================
+# 🔍 DETECÇÃO DE 429
+# ==========================================================
+
+def e_erro_429(erro: Exception) -> bool:
+    """Erro do Auth indica limite de requisições/e-mails?"""
+    status = getattr(erro, "status", None) or getattr(erro, "code", None)
+    if str(status) == "429":
+        return True
+
+    msg = str(erro).lower()
+    return (
+        "429" in msg
+        or "too many requests" in msg
+        or "rate limit" in msg
+        or _RE_APOS_SEGUNDOS.search(msg) is not None
+    )
+
+
+def extrair_segundos(erro: Exception) -> Optional[int]:
+    """Extrai N de mensagens como '... after 38 seconds'."""
+    match = _RE_APOS_SEGUNDOS.search(str(erro).lower())
+    return int(match.group(1)) if match else None
+
+
+# ==========================================================
+# 🚦 API PÚBLICA
+# ==========================================================
+
+def adquirir(categoria: str, espera_max: float = AUTH_ESPERA_MAX_SEGUNDOS) -> None:
+    """
+    Reserva uma vaga na cota da categoria, esperando até `espera_max`.
+
+    Raises:
+        AuthSobrecarregadoError: se a espera necessária for maior.
+    """
+    with _lock:
+        b = _bucket(categoria)
+        agora = time.monotonic()
+        b.repor(agora)
+
+        espera = b.espera_para_token(agora)
+
+        if espera > espera_max:
+            b.recusadas += 1
+            logger.warning(
+                f"🚫 Auth governor recusou | Categoria={categoria} | espera={espera:.1f}s"
+            )
+            raise AuthSobrecarregadoError(categoria, espera)
+
+        b.tokens -= 1
+        b.na_fila += 1
+
+    try:
+        if espera > 0:
+            time.sleep(espera)
+    finally:
+        with _lock:
+            b.na_fila -= 1
+
+
+def registrar_sucesso(categoria: str) -> None:
+    with _lock:
+        _bucket(categoria).falhas_seguidas = 0
+
+
+def registrar_429(categoria: str, erro: Optional[Exception] = None) -> float:
+    """
+    Abre o cooldown compartilhado da categoria e zera seus tokens.
+
+    Returns:
+        Duração do cooldown, em segundos.
+    """
+    segundos = extrair_segundos(erro) if erro is not None else None
+
+    with _lock:
+        b = _bucket(categoria)
+        b.falhas_seguidas += 1
+
+        if segundos is None:
+            segundos = min(
+                BACKOFF_INICIAL * 2 ** (b.falhas_seguidas - 1),
+                BACKOFF_MAXIMO,
+            )
+
+        agora = time.monotonic()
+        b.repor(agora)
+        b.tokens = min(b.tokens, 0.0)
+        b.cooldown_ate = max(b.cooldown_ate, agora + segundos)
+
+    logger.warning(f"⏱️ 429 do Auth | Categoria={categoria} | cooldown={segundos}s")
+    return segundos
+
+
+def executar(categoria: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    Executa uma chamada do Supabase Auth sob o governor.
+
+    Exceções da chamada são repassadas; um 429 alimenta o cooldown antes.
+
+    Raises:
+        AuthSobrecarregadoError: cota local esgotada (a API nem é chamada).
+    """
+    adquirir(categoria)
+
+    try:
+        resultado = fn(*args, **kwargs)
+    except Exception as e:
+        if e_erro_429(e):
+            registrar_429(categoria, e)
+        raise
+
+    registrar_sucesso(categoria)
+    return resultado
+
+
+def obter_folga() -> Dict[str, Dict[str, Any]]:
+    """
+    Capacidade restante por categoria, para o painel admin.
+
+    Returns:
+        {categoria: {disponiveis, capacidade, percentual, cooldown_segundos,
+                     na_fila, recusadas}}
+    """
+    folga = {}
+
+    with _lock:
+        agora = time.monotonic()
+
+        for categoria in COTAS_AUTH:
+            b = _bucket(categoria)
+            b.repor(agora)
+            disponiveis = max(b.tokens, 0.0)
+
+            folga[categoria] = {
+                "disponiveis": int(disponiveis),
+                "capacidade": b.capacidade,
+                "percentual": round(disponiveis / b.capacidade * 100, 1),
+                "cooldown_segundos": int(max(b.cooldown_ate - agora, 0)),
+                "na_fila": b.na_fila,
+                "recusadas": b.recusadas,
+            }
+
+    return folga
+
+
+__all__ = [
+    "COTAS_AUTH",
+    "AuthSobrecarregadoError",
+    "adquirir",
+    "executar",
+    "registrar_429",
+    "registrar_sucesso",
+    "obter_folga",
+    "e_erro_429",
+    "extrair_segundos",
+]
@@ -9,6 +9,8 @@ import re
 from typing import Tuple
 
 from backend.database.supabase_client import supabase
+from backend.auth import auth_governor
+from backend.auth.auth_governor import AuthSobrecarregadoError, e_erro_429
 from backend.auth.rate_limiter import (
     verificar_rate_limit,
     registrar_tentativa,
@@ -51,7 +53,9 @@ def solicitar_reset_senha(email: str) -> Tuple[bool, str]:
             st.secrets["app"]["STREAMLIT_APP_URL"] + "/redefinir_senha"
         )
 
-        supabase.auth.reset_password_email(
+        auth_governor.executar(
+            "email",
+            supabase.auth.reset_password_email,
             email,
             options={"redirect_to": redirect_url}
         )
@@ -66,6 +70,10 @@ def solicitar_reset_senha(email: str) -> Tuple[bool, str]:
             "um link para redefinir sua senha em alguns instantes."
         )
 
+    except AuthSobrecarregadoError as e:
+        logger.warning(f"🚫 Reset adiado pelo governor: {email}")
+        return False, e.mensagem
+
     except Exception as e:
         logger.exception(f"❌ Erro reset: {email}")
 
@@ -114,6 +122,8 @@ def redefinir_senha(nova_senha: str) -> Tuple[bool, str]:
         (sucesso: bool, mensagem: str)
     """
 
+    conta = ""
+
     try:
         if not nova_senha:
             return False, "Informe a nova senha."
@@ -121,15 +131,7 @@ def redefinir_senha(nova_senha: str) -> Tuple[bool, str]:
         if len(nova_senha) < 6:
             return False, "Mínimo de 6 caracteres."
 
-        # Verificar rate limit
-        pode, msg = verificar_rate_limit("redefinir_senha")
-        if not pode:
-            return False, msg
-
-        # Registrar tentativa
-        registrar_tentativa("redefinir_senha")
-
-        # Verificar sessão
+        # Verificar sessão (aberta pelo link de recuperação)
         session = supabase.auth.get_session()
 
         if not session or not session.user:
@@ -138,25 +140,40 @@ def redefinir_senha(nova_senha: str) -> Tuple[bool, str]:
                 "Solicite um novo link."
             )
 
+        # Limite pela conta alvo: nova sessão do navegador não zera
+        conta = session.user.email or session.user.id
+
+        # Verificar rate limit
+        pode, msg = verificar_rate_limit("redefinir_senha", conta)
+        if not pode:
+            return False, msg
+
+        # Registrar tentativa
+        registrar_tentativa("redefinir_senha", conta)
+
         # Atualizar senha
-        supabase.auth.update_user({
+        auth_governor.executar("geral", supabase.auth.update_user, {
             "password": nova_senha
         })
 
         logger.info(f"✅ Senha redefinida: {session.user.id}")
 
         # Limpar histórico
-        limpar_historico("redefinir_senha")
+        limpar_historico("redefinir_senha", conta)
 
         return True, "Senha redefinida com sucesso!"
 
+    except AuthSobrecarregadoError as e:
+        return False, e.mensagem
+
     except Exception as e:
         logger.exception("❌ Erro redefinir")
 
         error_msg = str(e).lower()
 
-        if "429" in error_msg:
-            registrar_erro_429("redefinir_senha")
+        if e_erro_429(e):
+            if conta:
+                registrar_erro_429("redefinir_senha", conta)
             return False, "⏱️ Aguarde antes de tentar."
 
         if "weak password" in error_msg:
@@ -0,0 +1,240 @@
+"""
+Armazenamento do Rate Limiter - PETDor2
+
+Backends plugáveis para o estado dos limites (compartilhado entre sessões):
+- MemoriaStore: dict por processo, thread-safe
+- SQLiteStore: arquivo SQLite, compartilhado entre processos/workers
+
+Cada chave guarda um dict pequeno e de tamanho fixo (O(1) por chave),
+serializável em JSON. Toda alteração passa por `atualizar`, que é atômica.
+"""
+
+# ==========================================================
+# 📚 IMPORTS
+# ==========================================================
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+Estado = Dict[str, Any]
+Atualizacao = Callable[[Optional[Estado]], Optional[Estado]]
+
+
+# ==========================================================
+# 🧩 INTERFACE
+# ==========================================================
+
+class RateLimitStore(ABC):
+    """
+    Interface dos backends.
+
+    Estados podem trazer `expira_em` (epoch); entradas expiradas são
+    tratadas como inexistentes e removidas periodicamente.
+    """
+
+    @abstractmethod
+    def atualizar(self, chave: str, fn: Atualizacao) -> Optional[Estado]:
+        """Lê, aplica `fn` e grava atomicamente. `fn` → None remove a chave."""
+
+    @abstractmethod
+    def obter(self, chave: str) -> Optional[Estado]:
+        ...
+
+    @abstractmethod
+    def remover(self, chave: str) -> None:
+        ...
+
+    @abstractmethod
+    def listar(self, prefixo: str = "") -> Dict[str, Estado]:
+        ...
+
+    @abstractmethod
+    def limpar(self, prefixo: str = "") -> int:
+        ...
+
+    @staticmethod
+    def _expirado(estado: Optional[Estado], agora: float) -> bool:
+        return bool(estado and estado.get("expira_em") and estado["expira_em"] <= agora)
+
+
+# ==========================================================
+# 🧠 MEMÓRIA (processo)
+# ==========================================================
+
+class MemoriaStore(RateLimitStore):
+    """Compartilhado por todas as sessões do mesmo processo Streamlit."""
+
+    def __init__(self, limpar_a_cada: int = 500):
+        self._dados: Dict[str, Estado] = {}
+        self._lock = threading.Lock()
+        self._escritas = 0
+        self._limpar_a_cada = limpar_a_cada
+
+    def _purgar_expirados(self, agora: float) -> None:
+        expirados = [k for k, v in self._dados.items() if self._expirado(v, agora)]
+        for k in expirados:
+            del self._dados[k]
+
+    def atualizar(self, chave: str, fn: Atualizacao) -> Optional[Estado]:
+        agora = time.time()
+
+        with self._lock:
+            atual = self._dados.get(chave)
+            if self._expirado(atual, agora):
+                atual = None
+
+            novo = fn(dict(atual) if atual else None)
+
+            if novo is None:
+                self._dados.pop(chave, None)
+            else:
+                self._dados[chave] = novo
+
+            self._escritas += 1
+            if self._escritas % self._limpar_a_cada == 0:
+                self._purgar_expirados(agora)
+
+            return dict(novo) if novo else None
+
+    def obter(self, chave: str) -> Optional[Estado]:
+        with self._lock:
+            estado = self._dados.get(chave)
+            if self._expirado(estado, time.time()):
+                return None
+            return dict(estado) if estado else None
+
+    def remover(self, chave: str) -> None:
+        with self._lock:
+            self._dados.pop(chave, None)
+
+    def listar(self, prefixo: str = "") -> Dict[str, Estado]:
+        agora = time.time()
+        with self._lock:
+            return {
+                k: dict(v) for k, v in self._dados.items()
+                if k.startswith(prefixo) and not self._expirado(v, agora)
+            }
+
+    def limpar(self, prefixo: str = "") -> int:
+        with self._lock:
+            chaves = [k for k in self._dados if k.startswith(prefixo)]
+            for k in chaves:
+                del self._dados[k]
+            return len(chaves)
+
+
+# ==========================================================
+# 💾 SQLITE (entre processos)
+# ==========================================================
+
+class SQLiteStore(RateLimitStore):
+    """
+    Persistido num arquivo SQLite local (WAL), visível por todos os
+    workers da mesma máquina. Uma conexão por thread.
+    """
+
+    def __init__(self, caminho: str, timeout: float = 5.0):
+        self.caminho = caminho
+        self.timeout = timeout
+        self._local = threading.local()
+
+        with self._conexao() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS rate_limits (
+                    chave TEXT PRIMARY KEY,
+                    estado TEXT NOT NULL,
+                    expira_em REAL
+                )
+                """
+            )
+
+    def _conexao(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(
+                self.caminho,
+                timeout=self.timeout,
+                isolation_level=None,  # transações explícitas
+                check_same_thread=False,
+            )
+            self._local.conn = conn
+        return conn
+
+    def atualizar(self, chave: str, fn: Atualizacao) -> Optional[Estado]:
+        conn = self._conexao()
+        agora = time.time()
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT estado FROM rate_limits WHERE chave = ?", (chave,)
+            ).fetchone()
+
+            atual = json.loads(row[0]) if row else None
+            if self._expirado(atual, agora):
+                atual = None
+
+            novo = fn(atual)
+
+            if novo is None:
+                conn.execute("DELETE FROM rate_limits WHERE chave = ?", (chave,))
+            else:
+                conn.execute(
+                    "INSERT OR REPLACE INTO rate_limits (chave, estado, expira_em) "
+                    "VALUES (?, ?, ?)",
+                    (chave, json.dumps(novo), novo.get("expira_em")),
+                )
+
+            conn.execute("COMMIT")
+            return novo
+
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def obter(self, chave: str) -> Optional[Estado]:
+        row = self._conexao().execute(
+            "SELECT estado FROM rate_limits WHERE chave = ?", (chave,)
+        ).fetchone()
+
+        estado = json.loads(row[0]) if row else None
+        return None if self._expirado(estado, time.time()) else estado
+
+    def remover(self, chave: str) -> None:
+        self._conexao().execute("DELETE FROM rate_limits WHERE chave = ?", (chave,))
+
+    def listar(self, prefixo: str = "") -> Dict[str, Estado]:
+        conn = self._conexao()
+        conn.execute(
+            "DELETE FROM rate_limits WHERE expira_em IS NOT NULL AND expira_em <= ?",
+            (time.time(),),
+        )
+        rows = conn.execute(
+            "SELECT chave, estado FROM rate_limits "
+            "WHERE substr(chave, 1, length(?)) = ?",
+            (prefixo, prefixo),
+        ).fetchall()
+        return {chave: json.loads(estado) for chave, estado in rows}
+
+    def limpar(self, prefixo: str = "") -> int:
+        cur = self._conexao().execute(
+            "DELETE FROM rate_limits WHERE substr(chave, 1, length(?)) = ?",
+            (prefixo, prefixo),
+        )
+        return cur.rowcount
+
+
+__all__ = [
+    "RateLimitStore",
+    "MemoriaStore",
+    "SQLiteStore",
+]
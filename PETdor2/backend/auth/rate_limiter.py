@@ -3,8 +3,13 @@ Rate Limiter para Supabase Auth - PETDor2
 Gerencia tentativas, cooldowns e estatísticas para evitar erro 429.
 
 Escopo atual:
-- Baseado em session_state (por sessão Streamlit)
-- Protege UX e abuso básico
+- Estado compartilhado entre sessões (ver rate_limit_store.py):
+  memória do processo ou arquivo SQLite entre workers
+- Dois algoritmos por operação, ambos O(1) por chave:
+  • "janela": janela deslizante aproximada (contador atual + anterior)
+  • "gcra": token bucket via GCRA (um único timestamp, o TAT)
+- Toda operação é limitada por conta (e-mail ou id do usuário), nunca
+  por sessão: abrir outro navegador não zera o limite
 - Possui estatísticas para debug/admin
 """
 
@@ -12,11 +17,21 @@ Escopo atual:
 # 📚 IMPORTS
 # ==========================================================
 
-import streamlit as st
-from datetime import datetime, timedelta
+import time
+from datetime import datetime
 from typing import Tuple, Optional, Dict, Any
 import logging
 
+from backend.auth.rate_limit_store import (
+    RateLimitStore,
+    MemoriaStore,
+    SQLiteStore,
+)
+from backend.utils.config import (
+    RATE_LIMIT_BACKEND,
+    RATE_LIMIT_SQLITE_PATH,
+)
+
 logger = logging.getLogger(__name__)
 
 
@@ -28,40 +43,176 @@ logger = logging.getLogger(__name__)
 COOLDOWN_AFTER_429 = 60  # segundos
 
 # Limites por operação
+#   janela: max_attempts por period_minutes
+#   gcra:   rajada de `burst` tentativas; 1 nova a cada `refill_segundos`
 RATE_LIMITS = {
     "cadastro": {"max_attempts": 2, "period_minutes": 15},
-    "login": {"max_attempts": 5, "period_minutes": 5},
+    "login": {"algoritmo": "gcra", "burst": 5, "refill_segundos": 60},
     "recuperacao_senha": {"max_attempts": 2, "period_minutes": 15},
     "redefinir_senha": {"max_attempts": 3, "period_minutes": 10},
 }
 
+PREFIXO = "rl_"
+
+
+# ==========================================================
+# 🗄️ STORE
+# ==========================================================
+
+_store: Optional[RateLimitStore] = None
+
+
+def _criar_store_padrao() -> RateLimitStore:
+    if RATE_LIMIT_BACKEND == "sqlite":
+        logger.info(f"Rate limit em SQLite: {RATE_LIMIT_SQLITE_PATH}")
+        return SQLiteStore(RATE_LIMIT_SQLITE_PATH)
+
+    return MemoriaStore()
+
+
+def get_store() -> RateLimitStore:
+    """Store ativo (criado sob demanda conforme RATE_LIMIT_BACKEND)."""
+    global _store
+    if _store is None:
+        _store = _criar_store_padrao()
+    return _store
+
+
+def configurar_store(store: RateLimitStore) -> None:
+    """Substitui o backend (ex.: SQLiteStore com outro caminho)."""
+    global _store
+    _store = store
+
 
 # ==========================================================
 # 🔑 HELPERS INTERNOS
 # ==========================================================
 
-def _get_key(operacao: str, identificador: str = "") -> str:
+def _get_key(operacao: str, identificador: str) -> str:
     """
-    Gera chave única para session_state.
+    Gera chave única no store.
 
     Ex:
         rl_login_email@email.com
-        rl_cadastro_global
+        rl_redefinir_senha_<id do usuário>
     """
-    if identificador:
-        return f"rl_{operacao}_{identificador}"
+    if not identificador:
+        raise ValueError(f"Rate limit de '{operacao}' exige identificador (e-mail ou id).")
 
-    return f"rl_{operacao}_global"
+    return f"{PREFIXO}{operacao}_{identificador}"
 
 
-def _init_if_not_exists(key: str):
-    """Inicializa estrutura no session_state."""
-    if key not in st.session_state:
-        st.session_state[key] = {
-            "attempts": [],
-            "last_429": None,
-            "created_at": datetime.now(),
-        }
+def _periodo_segundos(config: Dict[str, Any]) -> float:
+    return config["period_minutes"] * 60
+
+
+def _novo_estado(agora: float) -> Dict[str, Any]:
+    return {
+        "last_429": None,
+        "ultima_tentativa": None,
+        "criado_em": agora,
+    }
+
+
+def _fim_cooldown(estado: Dict[str, Any]) -> float:
+    return (estado.get("last_429") or 0) + COOLDOWN_AFTER_429
+
+
+# ----------------------------------------------------------
+# Janela deslizante (contador atual + anterior)
+# ----------------------------------------------------------
+
+def _rolar_janela(estado: Dict[str, Any], agora: float, periodo: float) -> None:
+    """Avança a janela fixa; o contador atual vira o anterior."""
+    estado.setdefault("janela_inicio", agora)
+    estado.setdefault("atual", 0)
+    estado.setdefault("anterior", 0)
+
+    decorrido = agora - estado["janela_inicio"]
+
+    if decorrido < periodo:
+        return
+
+    if decorrido < 2 * periodo:
+        estado["anterior"] = estado["atual"]
+        estado["janela_inicio"] += periodo
+    else:
+        estado["anterior"] = 0
+        estado["janela_inicio"] = agora - (decorrido % periodo)
+
+    estado["atual"] = 0
+
+
+def _estimativa(estado: Dict[str, Any], agora: float, periodo: float) -> float:
+    """Tentativas estimadas na janela deslizante [agora - período, agora]."""
+    fracao = (agora - estado["janela_inicio"]) / periodo
+    return estado["anterior"] * (1 - fracao) + estado["atual"]
+
+
+def _espera_janela(estado: Dict[str, Any], agora: float, periodo: float, maximo: int) -> float:
+    """Segundos até a estimativa ficar abaixo do máximo."""
+    decorrido = agora - estado["janela_inicio"]
+
+    if estado["atual"] >= maximo:
+        # Após a virada, `atual` vira `anterior` e decai linearmente
+        ate_virada = periodo - decorrido
+        return ate_virada + periodo * (1 - maximo / estado["atual"])
+
+    # Bloqueio causado pelo peso da janela anterior
+    necessario = periodo * (1 - (maximo - estado["atual"]) / estado["anterior"])
+    return max(necessario - decorrido, 0)
+
+
+def _janela_espera(estado: Dict[str, Any], config: Dict[str, Any], agora: float) -> float:
+    periodo = _periodo_segundos(config)
+    _rolar_janela(estado, agora, periodo)
+
+    if _estimativa(estado, agora, periodo) < config["max_attempts"]:
+        return 0.0
+
+    return _espera_janela(estado, agora, periodo, config["max_attempts"])
+
+
+def _janela_registrar(estado: Dict[str, Any], config: Dict[str, Any], agora: float) -> float:
+    periodo = _periodo_segundos(config)
+    _rolar_janela(estado, agora, periodo)
+    estado["atual"] += 1
+    return estado["janela_inicio"] + 2 * periodo
+
+
+# ----------------------------------------------------------
+# GCRA (token bucket com um único timestamp)
+# ----------------------------------------------------------
+
+def _gcra_parametros(config: Dict[str, Any]) -> Tuple[float, float]:
+    """(intervalo de emissão T, tolerância de rajada τ)."""
+    intervalo = float(config["refill_segundos"])
+    tolerancia = intervalo * (config["burst"] - 1)
+    return intervalo, tolerancia
+
+
+def _gcra_espera(estado: Dict[str, Any], config: Dict[str, Any], agora: float) -> float:
+    intervalo, tolerancia = _gcra_parametros(config)
+    tat = max(estado.get("tat") or agora, agora)
+
+    # Próxima tentativa empurraria o TAT além da rajada permitida
+    return max(tat + intervalo - agora - (tolerancia + intervalo), 0.0)
+
+
+def _gcra_registrar(estado: Dict[str, Any], config: Dict[str, Any], agora: float) -> float:
+    intervalo, _ = _gcra_parametros(config)
+    estado["tat"] = max(estado.get("tat") or agora, agora) + intervalo
+    return estado["tat"]
+
+
+_ALGORITMOS = {
+    "janela": (_janela_espera, _janela_registrar),
+    "gcra": (_gcra_espera, _gcra_registrar),
+}
+
+
+def _algoritmo(config: Dict[str, Any]):
+    return _ALGORITMOS[config.get("algoritmo", "janela")]
 
 
 # ==========================================================
@@ -70,7 +221,7 @@ def _init_if_not_exists(key: str):
 
 def verificar_rate_limit(
     operacao: str,
-    identificador: str = ""
+    identificador: str
 ) -> Tuple[bool, Optional[str]]:
     """
     Verifica se operação pode ser executada.
@@ -84,18 +235,18 @@ def verificar_rate_limit(
         return True, None
 
     config = RATE_LIMITS[operacao]
-    key = _get_key(operacao, identificador)
+    estado = get_store().obter(_get_key(operacao, identificador))
 
-    _init_if_not_exists(key)
+    if not estado:
+        return True, None
 
-    hist = st.session_state[key]
-    now = datetime.now()
+    agora = time.time()
 
     # ------------------------------------------------------
     # ⏱️ Cooldown após erro 429
     # ------------------------------------------------------
-    if hist["last_429"]:
-        elapsed = (now - hist["last_429"]).total_seconds()
+    if estado.get("last_429"):
+        elapsed = agora - estado["last_429"]
 
         if elapsed < COOLDOWN_AFTER_429:
             remaining = int(COOLDOWN_AFTER_429 - elapsed)
@@ -104,25 +255,13 @@ def verificar_rate_limit(
                 f"⏱️ Aguarde {remaining} segundos antes de tentar novamente."
             )
 
-        # Reset cooldown
-        hist["last_429"] = None
-
     # ------------------------------------------------------
-    # 📊 Limite de tentativas
+    # 📊 Limite de tentativas (janela deslizante ou GCRA)
     # ------------------------------------------------------
-    period = timedelta(minutes=config["period_minutes"])
-    cutoff = now - period
+    calcular_espera, _ = _algoritmo(config)
+    wait_time = calcular_espera(estado, config, agora)
 
-    # Filtra tentativas recentes
-    recent_attempts = [
-        t for t in hist["attempts"]
-        if t > cutoff
-    ]
-
-    hist["attempts"] = recent_attempts
-
-    if len(recent_attempts) >= config["max_attempts"]:
-        wait_time = (recent_attempts[0] + period - now).total_seconds()
+    if wait_time > 0:
         minutes = int(wait_time / 60) + 1
 
         return False, (
@@ -139,14 +278,25 @@ def verificar_rate_limit(
 
 def registrar_tentativa(
     operacao: str,
-    identificador: str = ""
+    identificador: str
 ):
     """Registra tentativa de operação."""
 
-    key = _get_key(operacao, identificador)
-    _init_if_not_exists(key)
+    config = RATE_LIMITS.get(operacao)
+    if config is None:
+        return
+
+    _, registrar = _algoritmo(config)
+
+    def atualizar(estado):
+        agora = time.time()
+        estado = estado or _novo_estado(agora)
+        fim = registrar(estado, config, agora)
+        estado["ultima_tentativa"] = agora
+        estado["expira_em"] = max(fim, _fim_cooldown(estado))
+        return estado
 
-    st.session_state[key]["attempts"].append(datetime.now())
+    get_store().atualizar(_get_key(operacao, identificador), atualizar)
 
     logger.info(
         f"Tentativa registrada | Operação={operacao} | ID={identificador}"
@@ -155,14 +305,18 @@ def registrar_tentativa(
 
 def registrar_erro_429(
     operacao: str,
-    identificador: str = ""
+    identificador: str
 ):
     """Registra ocorrência de erro 429."""
 
-    key = _get_key(operacao, identificador)
-    _init_if_not_exists(key)
+    def atualizar(estado):
+        agora = time.time()
+        estado = estado or _novo_estado(agora)
+        estado["last_429"] = agora
+        estado["expira_em"] = max(estado.get("expira_em") or 0, _fim_cooldown(estado))
+        return estado
 
-    st.session_state[key]["last_429"] = datetime.now()
+    get_store().atualizar(_get_key(operacao, identificador), atualizar)
 
     logger.warning(
         f"Erro 429 registrado | Operação={operacao} | ID={identificador}"
@@ -171,24 +325,25 @@ def registrar_erro_429(
 
 def limpar_historico(
     operacao: str,
-    identificador: str = ""
+    identificador: str
 ):
     """Limpa histórico após sucesso."""
 
-    key = _get_key(operacao, identificador)
+    get_store().remover(_get_key(operacao, identificador))
 
-    if key in st.session_state:
-        del st.session_state[key]
-
-        logger.info(
-            f"Histórico limpo | Operação={operacao} | ID={identificador}"
-        )
+    logger.info(
+        f"Histórico limpo | Operação={operacao} | ID={identificador}"
+    )
 
 
 # ==========================================================
 # 📈 ESTATÍSTICAS
 # ==========================================================
 
+def _datetime(ts: Optional[float]) -> Optional[datetime]:
+    return datetime.fromtimestamp(ts) if ts else None
+
+
 def obter_estatisticas() -> Dict[str, Any]:
     """
     Retorna estatísticas completas do Rate Limiter.
@@ -202,47 +357,20 @@ def obter_estatisticas() -> Dict[str, Any]:
 
     stats: Dict[str, Any] = {}
 
-    for key, value in st.session_state.items():
-
-        if not key.startswith("rl_"):
-            continue
-
-        attempts = value.get("attempts", [])
-        last_429 = value.get("last_429")
-        created_at = value.get("created_at")
-
+    for key, value in get_store().listar(PREFIXO).items():
         stats[key] = {
-            "total_tentativas": len(attempts),
-            "ultima_tentativa": attempts[-1] if attempts else None,
-            "ultimo_429": last_429,
-            "criado_em": created_at,
+            "total_tentativas": value.get("atual", 0) + value.get("anterior", 0),
+            "tat": _datetime(value.get("tat")),
+            "ultima_tentativa": _datetime(value.get("ultima_tentativa")),
+            "ultimo_429": _datetime(value.get("last_429")),
+            "criado_em": _datetime(value.get("criado_em")),
         }
 
     resumo = {
         "total_chaves_monitoradas": len(stats),
         "timestamp_consulta": datetime.now(),
+        "backend": type(get_store()).__name__,
         "dados": stats,
     }
 
     return resumo
-
-
-# ==========================================================
-# 🧹 LIMPEZA GLOBAL (OPCIONAL)
-# ==========================================================
-
-def limpar_tudo_rate_limit():
-    """
-    Remove TODOS os dados de rate limit da sessão.
-    Útil para logout ou reset admin.
-    """
-
-    keys_to_remove = [
-        key for key in st.session_state
-        if key.startswith("rl_")
-    ]
-
-    for key in keys_to_remove:
-        del st.session_state[key]
-
-    logger.info("Todos os rate limits foram limpos.")
\ No newline at end of file
@@ -0,0 +1,122 @@
+"""
+Micro-benchmark do Rate Limiter - PETDor2
+
+Mede o custo de `verificar_rate_limit` conforme o histórico de
+tentativas da chave cresce. Compara:
+- "lista":  abordagem antiga (filtra a lista de datetimes a cada checagem)
+- "janela": contador atual + anterior
+- "gcra":   um único timestamp (TAT)
+
+Uso (a partir de PETdor2/):
+    python -m backend.auth.rate_limiter_bench
+    python -m backend.auth.rate_limiter_bench --historicos 10 1000 100000
+"""
+
+import argparse
+import time
+import timeit
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from backend.auth import rate_limiter
+from backend.auth.rate_limit_store import MemoriaStore
+
+OPERACOES_BENCH = {
+    "janela": {"max_attempts": 10**9, "period_minutes": 60},
+    "gcra": {"algoritmo": "gcra", "burst": 10**9, "refill_segundos": 1},
+}
+
+
+# ==========================================================
+# REFERÊNCIA: LISTA DE TENTATIVAS (implementação anterior)
+# ==========================================================
+
+def _verificar_lista(hist: Dict, max_attempts: int, period_minutes: int) -> bool:
+    cutoff = datetime.now() - timedelta(minutes=period_minutes)
+    recent_attempts = [t for t in hist["attempts"] if t > cutoff]
+    return len(recent_attempts) < max_attempts
+
+
+def _medir(fn, repeticoes: int) -> float:
+    """Melhor tempo médio por chamada, em microssegundos."""
+    tempos = timeit.repeat(fn, number=repeticoes, repeat=5)
+    return min(tempos) / repeticoes * 1e6
+
+
+# ==========================================================
+# BENCHMARK
+# ==========================================================
+
+def executar(historicos: List[int], repeticoes: int = 2000) -> List[Dict[str, float]]:
+    """
+    Para cada tamanho de histórico, registra N tentativas numa chave e
+    mede o custo de uma checagem em cada algoritmo.
+    """
+    store_anterior: Optional[object] = rate_limiter._store
+    limites_anteriores = dict(rate_limiter.RATE_LIMITS)
+
+    rate_limiter.configurar_store(MemoriaStore())
+    rate_limiter.RATE_LIMITS.update(
+        {f"bench_{nome}": cfg for nome, cfg in OPERACOES_BENCH.items()}
+    )
+
+    resultados = []
+
+    try:
+        for n in historicos:
+            linha: Dict[str, float] = {"historico": n}
+
+            agora = datetime.now()
+            hist = {"attempts": [agora - timedelta(seconds=i % 3600) for i in range(n)]}
+            linha["lista"] = _medir(
+                lambda: _verificar_lista(hist, 10**9, 60),
+                max(10, min(repeticoes, 2_000_000 // n)),
+            )
+
+            for nome in OPERACOES_BENCH:
+                operacao = f"bench_{nome}"
+                identificador = f"n{n}"
+
+                for _ in range(n):
+                    rate_limiter.registrar_tentativa(operacao, identificador)
+
+                linha[nome] = _medir(
+                    lambda: rate_limiter.verificar_rate_limit(operacao, identificador),
+                    repeticoes,
+                )
+
+            resultados.append(linha)
+
+    finally:
+        rate_limiter.configurar_store(store_anterior)
+        rate_limiter.RATE_LIMITS.clear()
+        rate_limiter.RATE_LIMITS.update(limites_anteriores)
+
+    return resultados
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Custo por checagem do rate limiter vs. tamanho do histórico."
+    )
+    parser.add_argument(
+        "--historicos", type=int, nargs="+", default=[10, 1_000, 10_000, 100_000]
+    )
+    parser.add_argument("--repeticoes", type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    inicio = time.perf_counter()
+    resultados = executar(args.historicos, args.repeticoes)
+
+    print(f"{'histórico':>10} | {'lista (µs)':>11} | {'janela (µs)':>11} | {'gcra (µs)':>10}")
+    print("-" * 52)
+    for r in resultados:
+        print(
+            f"{r['historico']:>10} | {r['lista']:>11.2f} | "
+            f"{r['janela']:>11.2f} | {r['gcra']:>10.2f}"
+        )
+    print(f"\n⏱️ {time.perf_counter() - inicio:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
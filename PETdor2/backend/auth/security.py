@@ -9,6 +9,8 @@ import secrets
 import hashlib
 from typing import Dict, Any
 
+from backend.auth.user import CHAVE_PERFIL_CACHE
+
 
 # ==========================================================
 # Sessão
@@ -22,6 +24,7 @@ def logout(session_state: Dict[str, Any]) -> None:
     keys = [
         "user_data",
         "pagina",
+        CHAVE_PERFIL_CACHE,
     ]
     for key in keys:
         session_state.pop(key, None)
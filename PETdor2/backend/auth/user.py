@@ -6,9 +6,23 @@ Versão estável para Supabase Auth + constraints + rate limit
 from typing import Tuple, Optional, Dict, Any
 import streamlit as st
 import logging
+import time
+
+from backend.auth import auth_governor
+from backend.auth.auth_governor import AuthSobrecarregadoError, e_erro_429
+from backend.auth.rate_limiter import (
+    verificar_rate_limit,
+    registrar_tentativa,
+    registrar_erro_429,
+    limpar_historico,
+)
 
 logger = logging.getLogger(__name__)
 
+# Perfil do usuário logado, cacheado na sessão Streamlit
+CHAVE_PERFIL_CACHE = "_perfil_usuario_cache"
+PERFIL_CACHE_TTL = 300  # segundos (mudanças feitas por outro admin)
+
 # ==========================================================
 # 🔧 NORMALIZAÇÃO DE TIPO (compatível com constraint)
 # ==========================================================
@@ -66,6 +80,15 @@ def cadastrar_usuario(
         if len(senha) < 6:
             return False, "Senha deve ter no mínimo 6 caracteres."
 
+        # -------------------------
+        # Rate limit por e-mail
+        # -------------------------
+        pode, msg = verificar_rate_limit("cadastro", email)
+        if not pode:
+            return False, msg
+
+        registrar_tentativa("cadastro", email)
+
         # -------------------------
         # Verificar duplicata
         # -------------------------
@@ -81,7 +104,7 @@ def cadastrar_usuario(
         # -------------------------
         # Criar no Supabase Auth
         # -------------------------
-        auth_resp = supabase.auth.sign_up({
+        auth_resp = auth_governor.executar("email", supabase.auth.sign_up, {
             "email": email,
             "password": senha,
             "options": {
@@ -119,20 +142,27 @@ def cadastrar_usuario(
         if not perfil:
             return False, "Erro ao criar perfil."
 
+        limpar_historico("cadastro", email)
+
         return True, (
             "Conta criada com sucesso! "
             "Verifique seu e-mail para confirmar."
         )
 
+    except AuthSobrecarregadoError as e:
+        return False, e.mensagem
+
     except Exception as e:
         logger.exception("Erro no cadastro")
 
         msg = str(e).lower()
 
         if "email rate limit exceeded" in msg:
+            registrar_erro_429("cadastro", email)
             return False, "Limite de envio de e-mails atingido. Aguarde 15 minutos."
 
-        if "429" in msg:
+        if e_erro_429(e):
+            registrar_erro_429("cadastro", email)
             return False, "Muitas tentativas. Aguarde alguns minutos."
 
         if "duplicate key" in msg:
@@ -156,10 +186,16 @@ def fazer_login(
     from backend.database.supabase_client import supabase
     from backend.database import supabase_table_select
 
+    email = email.lower().strip()
+
     try:
-        email = email.lower().strip()
+        pode, msg = verificar_rate_limit("login", email)
+        if not pode:
+            return False, msg, None
+
+        registrar_tentativa("login", email)
 
-        auth_resp = supabase.auth.sign_in_with_password({
+        auth_resp = auth_governor.executar("login", supabase.auth.sign_in_with_password, {
             "email": email,
             "password": senha,
         })
@@ -178,8 +214,14 @@ def fazer_login(
         if not usuario:
             return False, "Perfil não encontrado.", None
 
+        _salvar_perfil(usuario[0])
+        limpar_historico("login", email)
+
         return True, "Login realizado!", usuario[0]
 
+    except AuthSobrecarregadoError as e:
+        return False, e.mensagem, None
+
     except Exception as e:
         msg = str(e).lower()
 
@@ -189,7 +231,8 @@ def fazer_login(
         if "invalid login credentials" in msg:
             return False, "Credenciais inválidas.", None
 
-        if "429" in msg:
+        if e_erro_429(e):
+            registrar_erro_429("login", email)
             return False, "Muitas tentativas. Aguarde.", None
 
         return False, "Erro no login.", None
@@ -203,6 +246,8 @@ def fazer_logout() -> Tuple[bool, str]:
 
     from backend.database.supabase_client import supabase
 
+    invalidar_perfil_usuario()
+
     try:
         supabase.auth.sign_out()
         return True, "Logout realizado."
@@ -219,7 +264,9 @@ def solicitar_recuperacao_senha(email: str) -> Tuple[bool, str]:
     from backend.database.supabase_client import supabase
 
     try:
-        supabase.auth.reset_password_email(
+        auth_governor.executar(
+            "email",
+            supabase.auth.reset_password_email,
             email,
             options={
                 "redirect_to":
@@ -228,6 +275,8 @@ def solicitar_recuperacao_senha(email: str) -> Tuple[bool, str]:
             }
         )
         return True, "E-mail enviado."
+    except AuthSobrecarregadoError as e:
+        return False, e.mensagem
     except Exception as e:
         if "429" in str(e):
             return False, "Aguarde antes de tentar novamente."
@@ -246,9 +295,11 @@ def redefinir_senha(nova_senha: str) -> Tuple[bool, str]:
         if len(nova_senha) < 6:
             return False, "Senha fraca."
 
-        supabase.auth.update_user({"password": nova_senha})
+        auth_governor.executar("geral", supabase.auth.update_user, {"password": nova_senha})
 
         return True, "Senha redefinida com sucesso."
+    except AuthSobrecarregadoError as e:
+        return False, e.mensagem
     except:
         return False, "Erro ao redefinir senha."
 
@@ -257,26 +308,82 @@ def redefinir_senha(nova_senha: str) -> Tuple[bool, str]:
 # 👤 USUÁRIO ATUAL
 # ==========================================================
 
-def obter_usuario_atual():
+def _perfil_em_cache() -> Optional[Dict[str, Any]]:
+    entrada = st.session_state.get(CHAVE_PERFIL_CACHE)
+
+    if not entrada:
+        return None
+
+    if time.time() - entrada["carregado_em"] > PERFIL_CACHE_TTL:
+        return None
+
+    return entrada["perfil"]
+
+
+def _salvar_perfil(perfil: Dict[str, Any]) -> None:
+    if getattr(perfil, "obsoleta", False):
+        return
+
+    st.session_state[CHAVE_PERFIL_CACHE] = {
+        "perfil": perfil,
+        "carregado_em": time.time(),
+    }
+
+    # Mantém o user_data (usado pelas páginas) em sincronia
+    user_data = st.session_state.get("user_data")
+    if user_data and user_data.get("id") == perfil.get("id"):
+        st.session_state["user_data"] = perfil
+
+
+def invalidar_perfil_usuario() -> None:
+    """
+    Descarta o perfil cacheado; a próxima leitura busca no banco.
+
+    Chamar após alterar o próprio registro em `usuarios` e no logout.
+    """
+    st.session_state.pop(CHAVE_PERFIL_CACHE, None)
+
+
+def obter_usuario_atual(forcar: bool = False) -> Optional[Dict[str, Any]]:
+    """
+    Perfil (`usuarios`) do usuário logado.
+
+    Servido do cache da sessão por até PERFIL_CACHE_TTL segundos;
+    `forcar=True` ignora o cache.
+    """
+
+    if not forcar:
+        perfil = _perfil_em_cache()
+        if perfil is not None:
+            return perfil
 
     from backend.database.supabase_client import supabase
     from backend.database import supabase_table_select
 
     try:
-        session = supabase.auth.get_session()
+        user_id = (st.session_state.get("user_data") or {}).get("id")
 
-        if not session or not session.user:
-            return None
+        if not user_id:
+            session = supabase.auth.get_session()
 
-        user_id = session.user.id
+            if not session or not session.user:
+                return None
+
+            user_id = session.user.id
 
         usuario = supabase_table_select(
             table="usuarios",
             filters={"id": user_id},
             limit=1,
+            cache_ttl=0,
         )
 
-        return usuario[0] if usuario else None
+        if not usuario:
+            invalidar_perfil_usuario()
+            return None
+
+        _salvar_perfil(usuario[0])
+        return usuario[0]
 
     except:
         return None
@@ -287,6 +394,7 @@ def obter_usuario_atual():
 # ==========================================================
 
 def e_admin() -> bool:
+    """Lê o claim `is_admin` do perfil cacheado (sem consulta se fresco)."""
 
     usuario = obter_usuario_atual()
 
@@ -307,5 +415,6 @@ __all__ = [
     "solicitar_recuperacao_senha",
     "redefinir_senha",
     "obter_usuario_atual",
+    "invalidar_perfil_usuario",
     "e_admin",
 ]
\ No newline at end of file
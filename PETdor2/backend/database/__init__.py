@@ -4,10 +4,24 @@ Inicialização leve (sem imports circulares)
 """
 from .supabase_client import (
     supabase_table_select,
+    supabase_table_iter,
+    supabase_table_count,
     supabase_table_insert,
+    supabase_table_insert_many,
+    supabase_table_upsert,
     supabase_table_update,
+    supabase_table_update_many,
     supabase_table_delete,
     testar_conexao,
+    LeituraIncompleta,
+)
+from .aggregations import agregar_avaliacoes
+from .health import status_backend
+from .circuit_breaker import e_leitura_obsoleta, estado_circuito
+from .query_cache import (
+    QUERY_CACHE_TTL,
+    invalidar_cache_tabela,
+    limpar_cache_consultas,
 )
 
 # Não importar módulos inteiros aqui
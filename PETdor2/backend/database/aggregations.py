@@ -0,0 +1,253 @@
+"""
+Agregações de avaliações - PETDor2
+RPC no Postgres (sql/agregar_avaliacoes.sql) + fallback local em streaming.
+"""
+
+import logging
+import math
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from postgrest.exceptions import APIError
+
+from .circuit_breaker import ChamadaProtegida
+from .supabase_client import LeituraIncompleta, supabase, supabase_table_iter
+from .query_cache import QueryCache, get_query_cache
+
+logger = logging.getLogger(__name__)
+
+# ==========================================================
+# CONFIGURAÇÕES
+# ==========================================================
+
+RPC_AGREGAR_AVALIACOES = "agregar_avaliacoes"
+AGRUPAMENTOS_VALIDOS = (None, "especie", "dia", "avaliador")
+PERCENTIS_PADRAO = (0.5, 0.9)
+AGREGACAO_CACHE_TTL = 120  # segundos
+
+# Códigos de "função não existe": PostgREST (PGRST202/404) e Postgres (42883)
+CODIGOS_RPC_AUSENTE = {"PGRST202", "404", "42883"}
+
+# Desligado só quando a função não está instalada no banco
+_rpc_disponivel = True
+
+
+def _rpc_ausente(erro: Exception) -> bool:
+    return isinstance(erro, APIError) and str(erro.code or "") in CODIGOS_RPC_AUSENTE
+
+
+# ==========================================================
+# HELPERS
+# ==========================================================
+
+def _nome_percentil(p: float) -> str:
+    return f"p{round(p * 100):g}"
+
+
+def _percentil(valores_ordenados: Sequence[float], p: float) -> Optional[float]:
+    """Interpolação linear — mesmo resultado do percentile_cont do Postgres."""
+    n = len(valores_ordenados)
+    if n == 0:
+        return None
+
+    pos = p * (n - 1)
+    baixo = math.floor(pos)
+    alto = math.ceil(pos)
+
+    if baixo == alto:
+        return float(valores_ordenados[baixo])
+
+    frac = pos - baixo
+    return valores_ordenados[baixo] * (1 - frac) + valores_ordenados[alto] * frac
+
+
+def _grupo_da_linha(row: Dict[str, Any], agrupar_por: Optional[str]) -> Optional[str]:
+    if agrupar_por == "especie":
+        animal = row.get("animais") or {}
+        return animal.get("especie")
+
+    if agrupar_por == "dia":
+        criado_em = row.get("criado_em")
+        return str(criado_em)[:10] if criado_em else None
+
+    if agrupar_por == "avaliador":
+        return row.get("avaliador_id")
+
+    return None
+
+
+# ==========================================================
+# IMPLEMENTAÇÕES
+# ==========================================================
+
+def _agregar_via_rpc(
+    agrupar_por: Optional[str],
+    percentis: Sequence[float],
+) -> List[Dict[str, Any]]:
+    response = supabase.rpc(
+        RPC_AGREGAR_AVALIACOES,
+        {"agrupar_por": agrupar_por, "percentis": list(percentis)},
+    ).execute()
+
+    resultado = []
+    for row in response.data or []:
+        valores = row.get("valores_percentis") or [None] * len(percentis)
+        item = {
+            "grupo": row.get("grupo"),
+            "total": int(row.get("total") or 0),
+            "media": row.get("media"),
+        }
+        for p, v in zip(percentis, valores):
+            item[_nome_percentil(p)] = v
+        resultado.append(item)
+
+    return resultado
+
+
+def agregar_linhas(
+    rows: Iterable[Dict[str, Any]],
+    agrupar_por: Optional[str] = None,
+    percentis: Sequence[float] = PERCENTIS_PADRAO,
+) -> List[Dict[str, Any]]:
+    """
+    Calcula count/média/percentis sobre um iterável de avaliações.
+
+    Guarda apenas um `array('d')` de pontuações por grupo, nunca as
+    linhas inteiras, então pode consumir `supabase_table_iter` direto.
+    """
+    grupos: Dict[Optional[str], array] = {}
+
+    for row in rows:
+        valor = row.get("pontuacao_total")
+        if valor is None:
+            continue
+
+        chave = _grupo_da_linha(row, agrupar_por)
+        grupos.setdefault(chave, array("d")).append(float(valor))
+
+    resultado = []
+    for chave in sorted(grupos, key=lambda g: (g is None, g or "")):
+        valores = sorted(grupos[chave])
+        item = {
+            "grupo": chave,
+            "total": len(valores),
+            "media": sum(valores) / len(valores),
+        }
+        for p in percentis:
+            item[_nome_percentil(p)] = _percentil(valores, p)
+        resultado.append(item)
+
+    return resultado
+
+
+def _agregar_local(
+    agrupar_por: Optional[str],
+    percentis: Sequence[float],
+) -> Optional[List[Dict[str, Any]]]:
+    """None se a varredura parar no meio: estatística parcial é errada."""
+    select = "id, pontuacao_total, criado_em, avaliador_id"
+    if agrupar_por == "especie":
+        select += ", animais(especie)"
+
+    rows = supabase_table_iter(
+        table="avaliacoes_dor",
+        select=select,
+        page_size=2000,
+    )
+
+    try:
+        return agregar_linhas(rows, agrupar_por, percentis)
+    except LeituraIncompleta as e:
+        logger.error(f"❌ Agregação local incompleta: {e}")
+        return None
+
+
+# ==========================================================
+# API PÚBLICA
+# ==========================================================
+
+def agregar_avaliacoes(
+    agrupar_por: Optional[str] = None,
+    percentis: Sequence[float] = PERCENTIS_PADRAO,
+    cache_ttl: float = AGREGACAO_CACHE_TTL,
+) -> Optional[List[Dict[str, Any]]]:
+    """
+    Estatísticas de `avaliacoes_dor` (total, média e percentis de
+    `pontuacao_total`), opcionalmente agrupadas.
+
+    Tenta a RPC `agregar_avaliacoes` no Postgres; se ela não existir,
+    calcula o mesmo resultado localmente percorrendo a tabela em páginas.
+    Timeouts/5xx da RPC passam pelo circuit breaker e devolvem None: a
+    RPC é tentada de novo na próxima chamada, sem varrer a tabela.
+
+    Args:
+        agrupar_por: None, "especie", "dia" ou "avaliador".
+        percentis: frações entre 0 e 1 (ex.: 0.5 → chave "p50").
+        cache_ttl: segundos no cache da sessão; 0 ignora o cache (nem lê
+            nem grava), para quem precisa do valor atual ou roda fora
+            da thread do script.
+
+    Returns:
+        Lista de dicts {grupo, total, media, p50, ...} ou None em erro
+        (inclusive varredura local interrompida no meio).
+    """
+    global _rpc_disponivel
+
+    if agrupar_por not in AGRUPAMENTOS_VALIDOS:
+        raise ValueError(f"Agrupamento inválido: {agrupar_por}")
+
+    # Sem cache a sessão nem é consultada (pode rodar fora da thread do
+    # script, ex.: async_client.em_thread)
+    usar_cache = cache_ttl > 0
+    cache = get_query_cache() if usar_cache else None
+    chave = QueryCache.chave(
+        "avaliacoes_dor",
+        agregacao=agrupar_por,
+        percentis=list(percentis),
+    )
+
+    em_cache = cache.obter(chave) if usar_cache else None
+    if em_cache is not None:
+        return em_cache
+
+    resultado = None
+
+    if _rpc_disponivel:
+        with ChamadaProtegida("RPC", RPC_AGREGAR_AVALIACOES) as chamada:
+            if not chamada.permitida():
+                return None
+
+            try:
+                resultado = _agregar_via_rpc(agrupar_por, percentis)
+                chamada.sucesso()
+            except Exception as e:
+                if not _rpc_ausente(e):
+                    logger.error(f"❌ RPC '{RPC_AGREGAR_AVALIACOES}' falhou: {e}")
+                    chamada.falha(e)
+                    return None
+
+                # Função ausente não é indisponibilidade: resolve a chamada
+                chamada.sucesso()
+                _rpc_disponivel = False
+                logger.warning(
+                    f"⚠️ RPC '{RPC_AGREGAR_AVALIACOES}' não instalada, "
+                    f"usando agregação local: {e}"
+                )
+
+    if resultado is None:
+        try:
+            resultado = _agregar_local(agrupar_por, percentis)
+        except Exception as e:
+            logger.error(f"❌ Erro ao agregar avaliações: {e}", exc_info=True)
+            return None
+
+    if usar_cache and resultado is not None:
+        cache.salvar(chave, resultado, ttl=cache_ttl)
+    return resultado
+
+
+__all__ = [
+    "AGRUPAMENTOS_VALIDOS",
+    "agregar_avaliacoes",
+    "agregar_linhas",
+]
@@ -0,0 +1,419 @@
+# PETdor2/backend/database/async_client.py
+
+"""
+Cliente Supabase assíncrono + fan-out de consultas - PETDor2
+
+O script do Streamlit é síncrono; as corrotinas rodam num event loop
+próprio, numa thread em segundo plano (um por processo), onde vivem os
+clientes async (acreate_client). Assim consultas independentes saem ao
+mesmo tempo e a página espera max(consulta), não a soma.
+
+Uso típico numa página (ex.: pages/admin.py):
+
+    dados = executar_em_paralelo({
+        "usuarios": async_table_iter("usuarios", max_rows=2000),
+        "total": async_table_count("usuarios"),
+    })
+
+Mesmas regras dos helpers síncronos (ChamadaProtegida: circuit breaker
+e última leitura boa). Tudo que depende da sessão — cache e access
+token do usuário logado (RLS) — é capturado na chamada, ainda na thread
+do script; as corrotinas só usam o que receberam.
+"""
+
+import asyncio
+import concurrent.futures
+import logging
+import threading
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import streamlit as st
+from supabase import AsyncClient, acreate_client
+
+from backend.utils.config import SUPABASE_ASYNC_TIMEOUT
+
+from .circuit_breaker import ChamadaProtegida
+from .query_cache import QueryCache, get_query_cache
+from .supabase_client import (
+    LeituraIncompleta,
+    _colunas_cursor,
+    _incluir_colunas,
+    _montar_pagina,
+    _montar_select,
+    supabase,
+)
+
+logger = logging.getLogger(__name__)
+
+# ==========================================================
+# EVENT LOOP EM SEGUNDO PLANO
+# ==========================================================
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    """Loop do processo, rodando numa thread daemon."""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=_loop.run_forever,
+                name="supabase-async",
+                daemon=True,
+            ).start()
+            logger.info("🔁 Event loop do Supabase async iniciado")
+        return _loop
+
+
+def rodar(corrotina: Awaitable[Any], timeout: float = SUPABASE_ASYNC_TIMEOUT) -> Any:
+    """
+    Executa a corrotina no loop de segundo plano e espera o resultado.
+    No timeout a corrotina é cancelada (não segue rodando no loop).
+    """
+    futuro = asyncio.run_coroutine_threadsafe(corrotina, _get_loop())
+    try:
+        return futuro.result(timeout)
+    except concurrent.futures.TimeoutError:
+        futuro.cancel()
+        raise
+
+
+# ==========================================================
+# CLIENTES (criados dentro do loop)
+# ==========================================================
+
+_clientes: Dict[str, AsyncClient] = {}
+_clientes_lock: Optional[asyncio.Lock] = None
+
+
+async def get_async_client(admin: bool = False) -> AsyncClient:
+    """Cliente async público (RLS) ou admin; um de cada por processo."""
+    global _clientes_lock
+    if _clientes_lock is None:
+        _clientes_lock = asyncio.Lock()
+
+    tipo = "admin" if admin else "public"
+
+    async with _clientes_lock:
+        if tipo not in _clientes:
+            url = st.secrets["supabase"]["SUPABASE_URL"]
+            key = st.secrets["supabase"]["SUPABASE_SECRET_KEY" if admin else "SUPABASE_KEY"]
+
+            logger.info(f"🔗 Inicializando Supabase async ({tipo} client)")
+            _clientes[tipo] = await acreate_client(url, key)
+
+        return _clientes[tipo]
+
+
+# ==========================================================
+# SESSÃO DO USUÁRIO
+# ==========================================================
+
+def _token_sessao() -> Optional[str]:
+    """Access token do usuário logado (sessão guardada no cliente sync)."""
+    try:
+        session = supabase.auth.get_session()
+        return session.access_token if session else None
+    except Exception:
+        return None
+
+
+def _autenticar(query, token: Optional[str]):
+    """
+    Authorization do usuário só nesta requisição: o cliente async é
+    compartilhado, então não se usa client.postgrest.auth() (global).
+    """
+    if token:
+        query.headers["Authorization"] = f"Bearer {token}"
+    return query
+
+
+# ==========================================================
+# HELPERS ASYNC
+# ==========================================================
+# Funções comuns que devolvem corrotinas: o contexto da sessão é lido
+# aqui, na thread do script; o await acontece no loop. A ChamadaProtegida
+# fica dentro da corrotina: se o fan-out estourar o timeout, o
+# CancelledError sai pelo `with` e conta como falha (a sonda do
+# meio-aberto nunca fica presa).
+
+def async_table_select(
+    table: str,
+    filters: Optional[Dict[str, Any]] = None,
+    select: str = "*",
+    order: Optional[str] = None,
+    limit: Optional[int] = None,
+    offset: Optional[int] = None,
+    permitir_obsoleta: bool = False,
+) -> Awaitable[Optional[List[Dict[str, Any]]]]:
+    """
+    Variante async de supabase_table_select, como o usuário logado
+    (sem cache de sessão).
+    """
+    token = _token_sessao()
+    chave = QueryCache.chave(
+        table, filters=filters, select=select, order=order, limit=limit, offset=offset
+    )
+
+    async def _executar() -> Optional[List[Dict[str, Any]]]:
+        with ChamadaProtegida("SELECT", table, chave if permitir_obsoleta else None) as chamada:
+            if not chamada.permitida():
+                return chamada.recusada()
+
+            try:
+                client = await get_async_client()
+                query = _montar_select(client, table, filters, select, order, limit, offset)
+                response = await _autenticar(query, token).execute()
+                return chamada.sucesso(response.data)
+
+            except Exception as e:
+                logger.error(f"❌ SELECT async erro | Tabela={table} | Erro={e}", exc_info=True)
+                return chamada.falha(e)
+
+    return _executar()
+
+
+def async_table_count(
+    table: str,
+    filters: Optional[Dict[str, Any]] = None,
+) -> Awaitable[Optional[int]]:
+    """Variante async de supabase_table_count, como o usuário logado."""
+    token = _token_sessao()
+
+    async def _executar() -> Optional[int]:
+        with ChamadaProtegida("COUNT", table) as chamada:
+            if not chamada.permitida():
+                return None
+
+            try:
+                client = await get_async_client()
+                query = client.table(table).select("id", count="exact")
+
+                if filters:
+                    for k, v in filters.items():
+                        query = query.eq(k, v)
+
+                response = await _autenticar(query.limit(1), token).execute()
+                chamada.sucesso()
+                return response.count
+
+            except Exception as e:
+                logger.error(f"❌ COUNT async erro | Tabela={table} | Erro={e}", exc_info=True)
+                chamada.falha(e)
+                return None
+
+    return _executar()
+
+
+def async_table_iter(
+    table: str,
+    filters: Optional[Dict[str, Any]] = None,
+    select: str = "*",
+    cursor: str = "id",
+    desc: bool = False,
+    page_size: int = 1000,
+    max_rows: Optional[int] = None,
+) -> Awaitable[List[Dict[str, Any]]]:
+    """
+    Variante async de supabase_table_iter; devolve a lista inteira
+    (páginas keyset, no máximo `max_rows` linhas).
+
+    Raises:
+        LeituraIncompleta: como no síncrono (no fan-out vira None).
+    """
+    if page_size <= 0:
+        raise ValueError("page_size deve ser positivo.")
+
+    token = _token_sessao()
+    select = _incluir_colunas(select, _colunas_cursor(cursor))
+
+    async def _executar() -> List[Dict[str, Any]]:
+        linhas: List[Dict[str, Any]] = []
+        ultimo: Optional[Dict[str, Any]] = None
+
+        while max_rows is None or len(linhas) < max_rows:
+            tamanho = page_size
+            if max_rows is not None:
+                tamanho = min(page_size, max_rows - len(linhas))
+
+            with ChamadaProtegida("SELECT paginado", table) as chamada:
+                if not chamada.permitida():
+                    raise LeituraIncompleta(table, len(linhas))
+
+                try:
+                    client = await get_async_client()
+                    query = _montar_pagina(client, table, filters, select, cursor, desc, ultimo, tamanho)
+                    rows = (await _autenticar(query, token).execute()).data or []
+                    chamada.sucesso()
+
+                except Exception as e:
+                    logger.error(f"❌ SELECT paginado async erro | Tabela={table} | Erro={e}", exc_info=True)
+                    chamada.falha(e)
+                    raise LeituraIncompleta(table, len(linhas)) from e
+
+            linhas.extend(rows)
+
+            if len(rows) < tamanho:
+                break
+
+            ultimo = rows[-1]
+
+        return linhas
+
+    return _executar()
+
+
+# Escritas usam o cliente admin (como as síncronas) e invalidam o cache
+# da sessão capturado na chamada.
+
+def async_table_insert(
+    table: str,
+    data: Dict[str, Any],
+) -> Awaitable[Optional[Dict[str, Any]]]:
+    cache = get_query_cache()
+
+    async def _executar() -> Optional[Dict[str, Any]]:
+        with ChamadaProtegida("INSERT", table) as chamada:
+            if not chamada.permitida():
+                return None
+
+            try:
+                client = await get_async_client(admin=True)
+                response = await client.table(table).insert(data).execute()
+                chamada.sucesso()
+                cache.invalidar_tabela(table)
+
+                return response.data[0] if response.data else None
+
+            except Exception as e:
+                logger.error(f"❌ INSERT async erro | Tabela={table} | Erro={e}", exc_info=True)
+                chamada.falha(e)
+                return None
+
+    return _executar()
+
+
+def async_table_update(
+    table: str,
+    filters: Dict[str, Any],
+    data: Dict[str, Any],
+) -> Awaitable[Optional[List[Dict[str, Any]]]]:
+    cache = get_query_cache()
+
+    async def _executar() -> Optional[List[Dict[str, Any]]]:
+        with ChamadaProtegida("UPDATE", table) as chamada:
+            if not chamada.permitida():
+                return None
+
+            try:
+                client = await get_async_client(admin=True)
+                query = client.table(table).update(data)
+
+                for k, v in filters.items():
+                    query = query.eq(k, v)
+
+                response = await query.execute()
+                chamada.sucesso()
+                cache.invalidar_tabela(table)
+                return response.data
+
+            except Exception as e:
+                logger.error(f"❌ UPDATE async erro | Tabela={table} | Erro={e}", exc_info=True)
+                chamada.falha(e)
+                return None
+
+    return _executar()
+
+
+def async_table_delete(
+    table: str,
+    filters: Dict[str, Any],
+) -> Awaitable[bool]:
+    cache = get_query_cache()
+
+    async def _executar() -> bool:
+        with ChamadaProtegida("DELETE", table) as chamada:
+            if not chamada.permitida():
+                return False
+
+            try:
+                client = await get_async_client(admin=True)
+                query = client.table(table).delete()
+
+                for k, v in filters.items():
+                    query = query.eq(k, v)
+
+                await query.execute()
+                chamada.sucesso()
+                cache.invalidar_tabela(table)
+                return True
+
+            except Exception as e:
+                logger.error(f"❌ DELETE async erro | Tabela={table} | Erro={e}", exc_info=True)
+                chamada.falha(e)
+                return False
+
+    return _executar()
+
+
+def em_thread(funcao: Callable[..., Any], *args: Any, **kwargs: Any) -> Awaitable[Any]:
+    """
+    Função síncrona (ex.: agregar_avaliacoes) como corrotina, rodando no
+    pool de threads do loop, para entrar no mesmo fan-out das consultas
+    async. Não deve usar st.session_state (roda fora da thread do script).
+    """
+    return asyncio.to_thread(funcao, *args, **kwargs)
+
+
+# ==========================================================
+# FAN-OUT (chamado do script do Streamlit)
+# ==========================================================
+
+def executar_em_paralelo(
+    consultas: Dict[str, Awaitable[Any]],
+    timeout: float = SUPABASE_ASYNC_TIMEOUT,
+) -> Dict[str, Any]:
+    """
+    Executa as corrotinas ao mesmo tempo (asyncio.gather) e devolve
+    {nome: resultado}. Uma consulta que falhar vira None sem derrubar
+    as demais.
+    """
+    if not consultas:
+        return {}
+
+    nomes = list(consultas)
+
+    async def _reunir():
+        return await asyncio.gather(*consultas.values(), return_exceptions=True)
+
+    try:
+        resultados = rodar(_reunir(), timeout)
+    except Exception as e:
+        logger.error(f"❌ Fan-out de consultas falhou: {e!r}", exc_info=True)
+        return dict.fromkeys(nomes)
+
+    saida: Dict[str, Any] = {}
+    for nome, resultado in zip(nomes, resultados):
+        if isinstance(resultado, BaseException):
+            logger.error(f"❌ Consulta '{nome}' falhou: {resultado}")
+            resultado = None
+        saida[nome] = resultado
+
+    return saida
+
+
+__all__ = [
+    "rodar",
+    "get_async_client",
+    "async_table_select",
+    "async_table_count",
+    "async_table_iter",
+    "async_table_insert",
+    "async_table_update",
+    "async_table_delete",
+    "em_thread",
+    "executar_em_paralelo",
+]
@@ -0,0 +1,332 @@
+# PETdor2/backend/database/circuit_breaker.py
+
+"""
+Circuit breaker + última leitura boa do Supabase (um por processo).
+
+- fechado: requisições passam; SUPABASE_CB_FALHAS falhas seguidas abrem
+- aberto: requisições falham na hora, sem esperar o timeout do cliente
+- meio_aberto: passado SUPABASE_CB_ABERTO_SEGUNDOS, UMA requisição
+  sonda o Supabase; sucesso fecha, falha (ou sonda sem resposta em
+  SUPABASE_CB_SONDA_TIMEOUT) reabre
+
+Enquanto o circuito não está fechado (ou uma leitura falha), os SELECTs
+devolvem a última resposta boa da mesma consulta, marcada como
+LeituraObsoleta, para que tutores continuem vendo animais e histórico.
+"""
+
+import asyncio
+import copy
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from postgrest.exceptions import APIError
+
+from backend.utils.config import (
+    SUPABASE_CB_ABERTO_SEGUNDOS,
+    SUPABASE_CB_FALHAS,
+    SUPABASE_CB_SONDA_TIMEOUT,
+    SUPABASE_ULTIMAS_LEITURAS_MAX,
+    SUPABASE_ULTIMAS_LEITURAS_TTL,
+)
+
+logger = logging.getLogger(__name__)
+
+FECHADO = "fechado"
+ABERTO = "aberto"
+MEIO_ABERTO = "meio_aberto"
+
+
+def e_falha_upstream(erro: Exception) -> bool:
+    """
+    Só indisponibilidade conta para o circuito (rede, timeout, 5xx,
+    PGRST00x = banco inacessível). Erros de dados/RLS não contam: o
+    Supabase respondeu.
+    """
+    if isinstance(erro, APIError):
+        codigo = str(erro.code or "")
+        return codigo.startswith("5") or codigo.startswith("PGRST00")
+    return True
+
+
+# ==========================================================
+# CIRCUIT BREAKER
+# ==========================================================
+
+class CircuitBreaker:
+    """Estado compartilhado entre sessões e threads."""
+
+    def __init__(
+        self,
+        limite_falhas: int = SUPABASE_CB_FALHAS,
+        tempo_aberto: float = SUPABASE_CB_ABERTO_SEGUNDOS,
+        tempo_sonda: float = SUPABASE_CB_SONDA_TIMEOUT,
+    ):
+        self.limite_falhas = max(limite_falhas, 1)
+        self.tempo_aberto = tempo_aberto
+        self.tempo_sonda = tempo_sonda
+
+        self._estado = FECHADO
+        self._falhas = 0
+        self._aberto_em = 0.0
+        self._sonda_em_andamento = False
+        self._sonda_iniciada_em = 0.0
+        self._rejeitadas = 0
+        self._lock = threading.Lock()
+
+    def permitir(self) -> bool:
+        """True se a requisição pode ir ao Supabase."""
+        with self._lock:
+            if self._estado == FECHADO:
+                return True
+
+            agora = time.monotonic()
+
+            if (
+                self._estado == MEIO_ABERTO
+                and self._sonda_em_andamento
+                and agora - self._sonda_iniciada_em >= self.tempo_sonda
+            ):
+                # Sonda nunca resolvida (travou ou foi abandonada): falhou
+                logger.error(
+                    f"⛔ Sonda sem resposta em {self.tempo_sonda:.0f}s, "
+                    f"circuito reaberto por {self.tempo_aberto:.0f}s"
+                )
+                self._estado = ABERTO
+                self._aberto_em = agora
+                self._sonda_em_andamento = False
+
+            if (
+                self._estado == ABERTO
+                and agora - self._aberto_em >= self.tempo_aberto
+            ):
+                self._estado = MEIO_ABERTO
+                self._sonda_em_andamento = False
+
+            if self._estado == MEIO_ABERTO and not self._sonda_em_andamento:
+                self._sonda_em_andamento = True
+                self._sonda_iniciada_em = agora
+                logger.info("🔌 Circuito meio-aberto: sondando o Supabase")
+                return True
+
+            self._rejeitadas += 1
+            return False
+
+    def registrar_sucesso(self) -> None:
+        with self._lock:
+            if self._estado != FECHADO:
+                logger.info("✅ Circuito fechado: Supabase voltou a responder")
+            self._estado = FECHADO
+            self._falhas = 0
+            self._sonda_em_andamento = False
+
+    def liberar_sonda(self) -> None:
+        """Sonda encerrada sem resposta do Supabase: outra pode tentar."""
+        with self._lock:
+            if self._estado == MEIO_ABERTO:
+                self._sonda_em_andamento = False
+
+    def registrar_falha(self, erro: Optional[BaseException] = None) -> None:
+        with self._lock:
+            self._falhas += 1
+
+            if self._estado == MEIO_ABERTO or self._falhas >= self.limite_falhas:
+                if self._estado != ABERTO:
+                    logger.error(
+                        f"⛔ Circuito aberto após {self._falhas} falha(s) "
+                        f"por {self.tempo_aberto:.0f}s: {erro}"
+                    )
+                self._estado = ABERTO
+                self._aberto_em = time.monotonic()
+                self._sonda_em_andamento = False
+
+    def estado(self) -> Dict[str, Any]:
+        with self._lock:
+            reabre_em = 0
+            if self._estado == ABERTO:
+                reabre_em = max(int(self.tempo_aberto - (time.monotonic() - self._aberto_em)), 0)
+
+            return {
+                "estado": self._estado,
+                "falhas_consecutivas": self._falhas,
+                "sonda_em": reabre_em,
+                "rejeitadas": self._rejeitadas,
+            }
+
+
+# ==========================================================
+# ÚLTIMAS LEITURAS BOAS
+# ==========================================================
+
+class LeituraObsoleta(list):
+    """Linhas servidas da última leitura boa (Supabase indisponível)."""
+
+    obsoleta = True
+
+    def __init__(self, linhas: List[Dict[str, Any]], obtido_em: float):
+        super().__init__(linhas)
+        self.obtido_em = obtido_em
+
+    @property
+    def idade_segundos(self) -> int:
+        return int(time.time() - self.obtido_em)
+
+
+def e_leitura_obsoleta(dados: Any) -> bool:
+    return getattr(dados, "obsoleta", False)
+
+
+class UltimasLeituras:
+    """LRU por consulta, compartilhado entre sessões do processo."""
+
+    def __init__(
+        self,
+        max_entradas: int = SUPABASE_ULTIMAS_LEITURAS_MAX,
+        validade: float = SUPABASE_ULTIMAS_LEITURAS_TTL,
+    ):
+        self.max_entradas = max_entradas
+        self.validade = validade
+        self._dados: "OrderedDict[Tuple, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def salvar(self, chave: Tuple, linhas: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            self._dados[chave] = (time.time(), copy.deepcopy(linhas))
+            self._dados.move_to_end(chave)
+
+            while len(self._dados) > self.max_entradas:
+                self._dados.popitem(last=False)
+
+    def obter(self, chave: Tuple) -> Optional[LeituraObsoleta]:
+        with self._lock:
+            item = self._dados.get(chave)
+            if item is None:
+                return None
+
+            obtido_em, linhas = item
+            if time.time() - obtido_em > self.validade:
+                del self._dados[chave]
+                return None
+
+        return LeituraObsoleta(copy.deepcopy(linhas), obtido_em)
+
+    def __len__(self) -> int:
+        return len(self._dados)
+
+
+# ==========================================================
+# CHAMADA PROTEGIDA (usada pelo cliente sync e pelo async)
+# ==========================================================
+
+class ChamadaProtegida:
+    """
+    Circuit breaker + última leitura boa em volta de UMA requisição:
+
+        with ChamadaProtegida("SELECT", table, chave_obsoleta) as chamada:
+            if not chamada.permitida():
+                return chamada.recusada()
+            try:
+                return chamada.sucesso(query.execute().data)
+            except Exception as e:
+                return chamada.falha(e)
+
+    Com `chave_obsoleta`, respostas boas são guardadas e servidas como
+    LeituraObsoleta quando o Supabase está fora; sem ela, o fallback é None.
+
+    Ao sair do `with` a chamada permitida é sempre resolvida (senão uma
+    sonda do meio-aberto ficaria presa): cancelamento (timeout do
+    fan-out) e exceções contam como falha; return antecipado, rerun do
+    Streamlit ou Ctrl+C só liberam a sonda.
+    """
+
+    def __init__(self, operacao: str, table: str, chave_obsoleta: Optional[Tuple] = None):
+        self.operacao = operacao
+        self.table = table
+        self.chave_obsoleta = chave_obsoleta
+        self._pendente = False
+
+    def __enter__(self) -> "ChamadaProtegida":
+        return self
+
+    def __exit__(self, tipo, erro, traceback) -> bool:
+        if self._pendente:
+            if isinstance(erro, (Exception, asyncio.CancelledError)):
+                self.falha(erro)
+            else:
+                self._pendente = False
+                get_breaker().liberar_sonda()
+        return False
+
+    def permitida(self) -> bool:
+        if get_breaker().permitir():
+            self._pendente = True
+            return True
+        logger.warning(f"⛔ Circuito aberto, {self.operacao} ignorado | Tabela={self.table}")
+        return False
+
+    def recusada(self) -> Optional[LeituraObsoleta]:
+        if self.chave_obsoleta is None:
+            return None
+        return get_ultimas_leituras().obter(self.chave_obsoleta)
+
+    def sucesso(self, dados: Any = None) -> Any:
+        self._pendente = False
+        get_breaker().registrar_sucesso()
+        if self.chave_obsoleta is not None and dados is not None:
+            get_ultimas_leituras().salvar(self.chave_obsoleta, dados)
+        return dados
+
+    def falha(self, erro: BaseException) -> Optional[LeituraObsoleta]:
+        """Registra o erro; só indisponibilidade conta e usa o fallback."""
+        self._pendente = False
+        if not e_falha_upstream(erro):
+            get_breaker().registrar_sucesso()
+            return None
+
+        get_breaker().registrar_falha(erro)
+        return self.recusada()
+
+
+_breaker: Optional[CircuitBreaker] = None
+_ultimas: Optional[UltimasLeituras] = None
+_lock = threading.Lock()
+
+
+def get_breaker() -> CircuitBreaker:
+    """Circuito do Supabase (um por processo)."""
+    global _breaker
+    if _breaker is None:
+        with _lock:
+            if _breaker is None:
+                _breaker = CircuitBreaker()
+    return _breaker
+
+
+def get_ultimas_leituras() -> UltimasLeituras:
+    global _ultimas
+    if _ultimas is None:
+        with _lock:
+            if _ultimas is None:
+                _ultimas = UltimasLeituras()
+    return _ultimas
+
+
+def estado_circuito() -> Dict[str, Any]:
+    estado = get_breaker().estado()
+    estado["leituras_guardadas"] = len(get_ultimas_leituras())
+    return estado
+
+
+__all__ = [
+    "ChamadaProtegida",
+    "CircuitBreaker",
+    "LeituraObsoleta",
+    "UltimasLeituras",
+    "e_falha_upstream",
+    "e_leitura_obsoleta",
+    "get_breaker",
+    "get_ultimas_leituras",
+    "estado_circuito",
+]
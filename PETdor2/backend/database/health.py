@@ -0,0 +1,211 @@
+# PETdor2/backend/database/health.py
+
+"""
+Monitor de saúde do Supabase (um por processo).
+
+- Uma thread em segundo plano faz a sonda (select leve em "usuarios")
+  a cada HEALTH_INTERVALO_SEGUNDOS; offline, a cada INTERVALO_OFFLINE
+- Guarda o histórico recente de latência/disponibilidade em memória
+- status_backend() responde da memória: o badge da sidebar não faz
+  nenhuma chamada de rede durante o rerun
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from backend.utils.config import HEALTH_INTERVALO_SEGUNDOS
+
+logger = logging.getLogger(__name__)
+
+# ==========================================================
+# CONFIGURAÇÕES
+# ==========================================================
+
+INTERVALO_OFFLINE = 10  # segundos entre sondas enquanto offline
+HISTORICO_TAMANHO = 120  # sondas guardadas (~1h com intervalo de 30s)
+
+
+def _sonda_supabase() -> None:
+    """Levanta exceção se o Supabase não responder."""
+    from backend.database.supabase_client import supabase
+
+    supabase.table("usuarios").select("id").limit(1).execute()
+
+
+# ==========================================================
+# MONITOR
+# ==========================================================
+
+class MonitorSaude:
+    """Sonda periódica + histórico em memória."""
+
+    def __init__(
+        self,
+        sonda: Callable[[], None] = _sonda_supabase,
+        intervalo: float = HEALTH_INTERVALO_SEGUNDOS,
+        historico: int = HISTORICO_TAMANHO,
+    ):
+        self.sonda = sonda
+        self.intervalo = max(intervalo, 1)
+
+        self._historico: Deque[Dict[str, Any]] = deque(maxlen=historico)
+        self._falhas_consecutivas = 0
+        self._lock = threading.Lock()
+        self._acordar = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------
+    # Ciclo de vida
+    # ------------------------------------------------------
+
+    def iniciar(self) -> None:
+        """Sobe a thread de sondagem (idempotente)."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+
+            self._thread = threading.Thread(
+                target=self._executar,
+                name="health-supabase",
+                daemon=True,
+            )
+            self._thread.start()
+
+        logger.info("🩺 Monitor de saúde do Supabase iniciado")
+
+    def _executar(self) -> None:
+        while True:
+            registro = self.verificar_agora()
+            espera = self.intervalo if registro["online"] else min(self.intervalo, INTERVALO_OFFLINE)
+
+            self._acordar.wait(espera)
+            self._acordar.clear()
+
+    # ------------------------------------------------------
+    # Sonda
+    # ------------------------------------------------------
+
+    def verificar_agora(self) -> Dict[str, Any]:
+        """Executa uma sonda imediatamente e registra o resultado."""
+        inicio = time.perf_counter()
+        erro = None
+
+        try:
+            self.sonda()
+            online = True
+        except Exception as e:
+            online = False
+            erro = str(e)[:200]
+
+        registro = {
+            "momento": time.time(),
+            "online": online,
+            "latencia_ms": round((time.perf_counter() - inicio) * 1000, 1),
+            "erro": erro,
+        }
+
+        with self._lock:
+            anterior_online = self._historico[-1]["online"] if self._historico else None
+            self._historico.append(registro)
+            self._falhas_consecutivas = 0 if online else self._falhas_consecutivas + 1
+
+        # Loga só as transições, não cada sonda
+        if online and anterior_online is False:
+            logger.info("✅ Supabase voltou a responder")
+        elif not online and anterior_online is not False:
+            logger.error(f"❌ Supabase sem resposta: {erro}")
+
+        return registro
+
+    def solicitar_verificacao(self) -> None:
+        """Antecipa a próxima sonda da thread (não bloqueia)."""
+        self._acordar.set()
+
+    # ------------------------------------------------------
+    # Consulta
+    # ------------------------------------------------------
+
+    def status(self) -> Dict[str, Any]:
+        """
+        Estado atual, sem rede.
+
+        Returns:
+            {online (None antes da 1ª sonda), latencia_ms, verificado_ha_segundos,
+             disponibilidade (% do histórico), latencia_media_ms, falhas_consecutivas, erro}
+        """
+        with self._lock:
+            historico = list(self._historico)
+            falhas = self._falhas_consecutivas
+
+        if not historico:
+            return {
+                "online": None,
+                "latencia_ms": None,
+                "verificado_ha_segundos": None,
+                "disponibilidade": None,
+                "latencia_media_ms": None,
+                "falhas_consecutivas": 0,
+                "erro": None,
+            }
+
+        ultimo = historico[-1]
+        latencias = [r["latencia_ms"] for r in historico if r["online"]]
+
+        return {
+            "online": ultimo["online"],
+            "latencia_ms": ultimo["latencia_ms"],
+            "verificado_ha_segundos": int(time.time() - ultimo["momento"]),
+            "disponibilidade": round(
+                sum(r["online"] for r in historico) / len(historico) * 100, 1
+            ),
+            "latencia_media_ms": round(sum(latencias) / len(latencias), 1) if latencias else None,
+            "falhas_consecutivas": falhas,
+            "erro": ultimo["erro"],
+        }
+
+    def historico(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._historico)
+
+
+_monitor: Optional[MonitorSaude] = None
+_monitor_lock = threading.Lock()
+
+
+def get_monitor() -> MonitorSaude:
+    """Monitor do processo (compartilhado entre sessões), já iniciado."""
+    global _monitor
+    if _monitor is None:
+        with _monitor_lock:
+            if _monitor is None:
+                _monitor = MonitorSaude()
+                _monitor.iniciar()
+    return _monitor
+
+
+# ==========================================================
+# API
+# ==========================================================
+
+def status_backend() -> Dict[str, Any]:
+    return get_monitor().status()
+
+
+def historico_saude() -> List[Dict[str, Any]]:
+    return get_monitor().historico()
+
+
+def verificar_backend_agora() -> Dict[str, Any]:
+    return get_monitor().verificar_agora()
+
+
+__all__ = [
+    "MonitorSaude",
+    "get_monitor",
+    "status_backend",
+    "historico_saude",
+    "verificar_backend_agora",
+]
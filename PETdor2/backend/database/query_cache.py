@@ -0,0 +1,151 @@
+"""
+Cache de consultas por sessão - PETDor2
+TTL + LRU na frente de supabase_table_select, invalidado por escrita.
+"""
+
+import copy
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import streamlit as st
+
+logger = logging.getLogger(__name__)
+
+# ==========================================================
+# CONFIGURAÇÕES
+# ==========================================================
+
+QUERY_CACHE_TTL = 60          # segundos
+QUERY_CACHE_MAX_ENTRADAS = 128
+
+_SESSION_KEY = "_db_query_cache"
+
+
+# ==========================================================
+# CACHE
+# ==========================================================
+
+class QueryCache:
+    """
+    Cache LRU com expiração por entrada.
+
+    Chave = (tabela, filtros, select, order, limit). Cada entrada guarda
+    as tabelas de origem (a principal e as embutidas no select) para
+    permitir invalidação por tabela após insert/update/delete.
+    """
+
+    def __init__(self, ttl: float = QUERY_CACHE_TTL, max_entradas: int = QUERY_CACHE_MAX_ENTRADAS):
+        self.ttl = ttl
+        self.max_entradas = max_entradas
+        self._dados: "OrderedDict[Tuple, Tuple[float, frozenset, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def chave(table: str, **params: Any) -> Tuple:
+        return (table, json.dumps(params, sort_keys=True, default=str))
+
+    def obter(self, chave: Tuple) -> Optional[Any]:
+        with self._lock:
+            item = self._dados.get(chave)
+
+            if item is None:
+                self.misses += 1
+                return None
+
+            expira_em, _, valor = item
+
+            if expira_em < time.monotonic():
+                del self._dados[chave]
+                self.misses += 1
+                return None
+
+            self._dados.move_to_end(chave)
+            self.hits += 1
+
+        # Cópia para que o chamador possa mutar as linhas sem sujar o cache
+        return copy.deepcopy(valor)
+
+    def salvar(
+        self,
+        chave: Tuple,
+        valor: Any,
+        ttl: Optional[float] = None,
+        tabelas: Iterable[str] = (),
+    ) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+
+        # Leitura obsoleta (Supabase fora do ar) nunca vira dado fresco
+        if getattr(valor, "obsoleta", False):
+            return
+
+        origem = frozenset((chave[0], *tabelas))
+
+        with self._lock:
+            self._dados[chave] = (time.monotonic() + ttl, origem, copy.deepcopy(valor))
+            self._dados.move_to_end(chave)
+
+            while len(self._dados) > self.max_entradas:
+                self._dados.popitem(last=False)
+
+    def invalidar_tabela(self, table: str) -> int:
+        with self._lock:
+            chaves = [k for k, (_, origem, _) in self._dados.items() if table in origem]
+            for k in chaves:
+                del self._dados[k]
+
+        if chaves:
+            logger.debug(f"Cache invalidado | Tabela={table} | Entradas={len(chaves)}")
+
+        return len(chaves)
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._dados.clear()
+
+    def estatisticas(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entradas": len(self._dados),
+                "hits": self.hits,
+                "misses": self.misses,
+                "tabelas": sorted(set().union(*(o for _, o, _ in self._dados.values()))),
+            }
+
+
+# Fallback fora de uma sessão Streamlit (scripts, jobs, threads)
+_cache_processo = QueryCache()
+
+
+def get_query_cache() -> QueryCache:
+    """Retorna o cache da sessão Streamlit atual (ou o do processo)."""
+    try:
+        if _SESSION_KEY not in st.session_state:
+            st.session_state[_SESSION_KEY] = QueryCache()
+        return st.session_state[_SESSION_KEY]
+    except Exception:
+        return _cache_processo
+
+
+def invalidar_cache_tabela(table: str) -> None:
+    get_query_cache().invalidar_tabela(table)
+
+
+def limpar_cache_consultas() -> None:
+    get_query_cache().limpar()
+
+
+__all__ = [
+    "QUERY_CACHE_TTL",
+    "QueryCache",
+    "get_query_cache",
+    "invalidar_cache_tabela",
+    "limpar_cache_consultas",
+]
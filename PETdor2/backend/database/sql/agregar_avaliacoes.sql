@@ -0,0 +1,45 @@
+-- PETdor2/backend/database/sql/agregar_avaliacoes.sql
+--
+-- Agregações de avaliacoes_dor calculadas no Postgres.
+-- Chamada via RPC: supabase.rpc("agregar_avaliacoes", {...})
+-- Usada por backend/database/aggregations.py (com fallback local).
+--
+-- agrupar_por: NULL | 'especie' | 'dia' | 'avaliador'
+-- percentis:   lista de frações (ex.: {0.5, 0.9})
+
+create or replace function public.agregar_avaliacoes(
+    agrupar_por text default null,
+    percentis double precision[] default array[0.5, 0.9]
+)
+returns table (
+    grupo text,
+    total bigint,
+    media double precision,
+    valores_percentis double precision[]
+)
+language sql
+stable
+security invoker
+as $$
+    select
+        case agrupar_por
+            when 'especie'   then an.especie
+            when 'dia'       then to_char(av.criado_em::date, 'YYYY-MM-DD')
+            when 'avaliador' then av.avaliador_id::text
+            else null
+        end as grupo,
+        count(*) as total,
+        avg(av.pontuacao_total)::double precision as media,
+        percentile_cont(percentis) within group (
+            order by av.pontuacao_total
+        ) as valores_percentis
+    from public.avaliacoes_dor av
+    left join public.animais an on an.id = av.animal_id
+    where av.pontuacao_total is not null
+    group by 1
+    order by 1;
+$$;
+
+-- Índice de apoio para o agrupamento por dia
+create index if not exists idx_avaliacoes_dor_criado_em
+    on public.avaliacoes_dor (criado_em);
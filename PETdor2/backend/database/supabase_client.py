@@ -1,44 +1,3 @@
-"""
-Cliente Supabase centralizado - PETDor2
-Singleton com cache para evitar múltiplas instâncias
-"""
-import streamlit as st
-from supabase import create_client, Client
-import logging
-
-logger = logging.getLogger(__name__)
-
-
-@st.cache_resource
-def get_supabase_client() -> Client:
-    """
-    Retorna o cliente Supabase (singleton com cache).
-    Usa a publishable key para operações seguras do lado do cliente.
-    """
-    try:
-        url = st.secrets["supabase"]["SUPABASE_URL"]
-        key = st.secrets["supabase"]["SUPABASE_KEY"]  # publishable key
-
-        logger.info(f"✅ Conectando ao Supabase: {url}")
-        client = create_client(url, key)
-        logger.info("✅ Cliente Supabase inicializado com sucesso")
-
-        return client
-
-    except KeyError as e:
-        logger.critical(f"❌ Secrets do Supabase não encontradas: {e}")
-        raise RuntimeError(
-            "Configuração do Supabase incompleta. "
-            "Verifique SUPABASE_URL e SUPABASE_KEY em secrets.toml"
-        ) from e
-    except Exception as e:
-        logger.critical(f"❌ Erro ao criar cliente Supabase: {e}", exc_info=True)
-        raise
-
-
-# Cliente global (inicializado sob demanda)
-supabase = get_supabase_client()
-
 """
 Cliente Supabase centralizado - PETDor2
 SDK + REST helpers + Admin client
@@ -46,8 +5,13 @@ SDK + REST helpers + Admin client
 
 import streamlit as st
 import logging
+import re
 from supabase import create_client, Client
-from typing import Optional, Dict, Any, List
+from postgrest.exceptions import APIError
+from typing import Optional, Dict, Any, List, Iterator
+
+from .circuit_breaker import ChamadaProtegida
+from .query_cache import get_query_cache, invalidar_cache_tabela
 
 logger = logging.getLogger(__name__)
 
@@ -75,42 +39,308 @@ def get_supabase_admin_client() -> Client:
     return create_client(url, key)
 
 
-# Instâncias globais
-supabase: Client = get_supabase_client()
-supabase_admin: Client = get_supabase_admin_client()
+class _ClienteSobDemanda:
+    """
+    Encaminha atributos para o cliente criado na primeira utilização.
+
+    Importar o pacote `backend` não cria clientes nem lê st.secrets
+    (ex.: processos do pool de PDFs, jobs).
+    """
+
+    def __init__(self, fabrica):
+        self._fabrica = fabrica
+
+    def __getattr__(self, nome: str):
+        return getattr(self._fabrica(), nome)
+
+
+# Instâncias globais (criadas no primeiro uso)
+supabase: Client = _ClienteSobDemanda(get_supabase_client)
+supabase_admin: Client = _ClienteSobDemanda(get_supabase_admin_client)
 
 # ==========================================================
 # SELECT
 # ==========================================================
 
+_RE_RECURSO_EMBUTIDO = re.compile(r"(?:\w+:)?(\w+)(?:!\w+)?\s*\(")
+
+
+def tabelas_embutidas(select: str) -> List[str]:
+    """
+    Tabelas referenciadas como recursos embutidos no select.
+
+    Ex.: "*, animais(nome, especie)" → ["animais"]
+         "*, dono:usuarios!tutor_id(nome)" → ["usuarios"]
+    """
+    return _RE_RECURSO_EMBUTIDO.findall(select)
+
+
+def _montar_select(
+    client,
+    table: str,
+    filters: Optional[Dict[str, Any]],
+    select: str,
+    order: Optional[str],
+    limit: Optional[int],
+    offset: Optional[int],
+):
+    """Query builder do SELECT (mesma API no cliente sync e no async)."""
+    query = client.table(table).select(select)
+
+    if filters:
+        for k, v in filters.items():
+            query = query.eq(k, v)
+
+    if order:
+        col, direction = order.split(".")
+        query = query.order(col, desc=(direction == "desc"))
+
+    if offset:
+        if limit:
+            query = query.range(offset, offset + limit - 1)
+        else:
+            query = query.offset(offset)
+    elif limit:
+        query = query.limit(limit)
+
+    return query
+
+
 def supabase_table_select(
     table: str,
     filters: Optional[Dict[str, Any]] = None,
     select: str = "*",
     order: Optional[str] = None,
     limit: Optional[int] = None,
+    cache_ttl: float = 0,
+    offset: Optional[int] = None,
+    permitir_obsoleta: bool = False,
 ) -> Optional[List[Dict[str, Any]]]:
+    """
+    SELECT simples, com cache por sessão opcional.
+
+    `select` aceita recursos embutidos do PostgREST (joins por FK), ex.:
+    `select="*, animais(nome, especie)"` traz o animal de cada linha na
+    mesma requisição. `offset` + `limit` paginam o resultado.
+
+    Por padrão (`cache_ttl=0`) a consulta sempre vai ao banco. Com
+    `cache_ttl > 0` (ex.: QUERY_CACHE_TTL) o resultado fica no cache
+    da sessão por esse tempo e é descartado em qualquer escrita na
+    tabela principal ou nas embutidas. Use só em leituras de tela que
+    toleram esse atraso, nunca em verificações (tokens, duplicidade).
+
+    Com `permitir_obsoleta=True` (e cache ligado), se o Supabase estiver
+    indisponível devolve a última resposta boa da mesma consulta como
+    `LeituraObsoleta` (ver `e_leitura_obsoleta`). Só para leituras de
+    exibição; nunca em auth, tokens ou verificações.
+    """
+    cache = get_query_cache()
+    usar_cache = cache_ttl > 0
+    usar_obsoleta = permitir_obsoleta and usar_cache
+    chave = cache.chave(
+        table, filters=filters, select=select, order=order, limit=limit, offset=offset
+    )
+
+    if usar_cache:
+        em_cache = cache.obter(chave)
+        if em_cache is not None:
+            return em_cache
+
+    with ChamadaProtegida("SELECT", table, chave if usar_obsoleta else None) as chamada:
+        if not chamada.permitida():
+            return chamada.recusada()
+
+        try:
+            query = _montar_select(supabase, table, filters, select, order, limit, offset)
+            response = query.execute()
+            chamada.sucesso(response.data)
+
+            if usar_cache and response.data is not None:
+                cache.salvar(
+                    chave,
+                    response.data,
+                    ttl=cache_ttl,
+                    tabelas=tabelas_embutidas(select),
+                )
+
+            return response.data
+
+        except Exception as e:
+            logger.error(f"❌ SELECT erro: {e}", exc_info=True)
+            return chamada.falha(e)
 
-    try:
-        query = supabase.table(table).select(select)
 
-        if filters:
-            for k, v in filters.items():
-                query = query.eq(k, v)
+# ==========================================================
+# COUNT
+# ==========================================================
 
-        if order:
-            col, direction = order.split(".")
-            query = query.order(col, desc=(direction == "desc"))
+def supabase_table_count(
+    table: str,
+    filters: Optional[Dict[str, Any]] = None,
+) -> Optional[int]:
+    """
+    Total exato de linhas (count=exact do PostgREST), trazendo no
+    máximo uma linha. None em caso de erro.
+    """
+    with ChamadaProtegida("COUNT", table) as chamada:
+        if not chamada.permitida():
+            return None
 
-        if limit:
-            query = query.limit(limit)
+        try:
+            query = supabase.table(table).select("id", count="exact")
 
-        response = query.execute()
-        return response.data
+            if filters:
+                for k, v in filters.items():
+                    query = query.eq(k, v)
 
-    except Exception as e:
-        logger.error(f"❌ SELECT erro: {e}", exc_info=True)
-        return None
+            response = query.limit(1).execute()
+            chamada.sucesso()
+            return response.count
+
+        except Exception as e:
+            logger.error(f"❌ COUNT erro | Tabela={table} | Erro={e}", exc_info=True)
+            chamada.falha(e)
+            return None
+
+
+# ==========================================================
+# SELECT PAGINADO (keyset / streaming)
+# ==========================================================
+
+def _incluir_colunas(select: str, colunas: List[str]) -> str:
+    """Garante que as colunas do cursor venham no select."""
+    if select.strip().startswith("*"):
+        return select
+
+    presentes = {c.strip() for c in select.split(",")}
+    faltantes = [c for c in colunas if c not in presentes]
+
+    if not faltantes:
+        return select
+
+    return ", ".join([select] + faltantes)
+
+
+def _valor_postgrest(valor: Any) -> str:
+    """Escapa valor para uso dentro de filtros `or=(...)` do PostgREST."""
+    texto = str(valor).replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{texto}"'
+
+
+def _montar_pagina(
+    client,
+    table: str,
+    filters: Optional[Dict[str, Any]],
+    select: str,
+    cursor: str,
+    desc: bool,
+    ultimo: Optional[Dict[str, Any]],
+    tamanho: int,
+):
+    """Query builder de uma página keyset a partir da linha `ultimo`."""
+    op = "lt" if desc else "gt"
+    query = client.table(table).select(select)
+
+    if filters:
+        for k, v in filters.items():
+            query = query.eq(k, v)
+
+    if ultimo is not None:
+        if cursor == "id":
+            query = getattr(query, op)("id", ultimo["id"])
+        else:
+            valor = _valor_postgrest(ultimo[cursor])
+            ultimo_id = _valor_postgrest(ultimo["id"])
+            query = query.or_(
+                f"{cursor}.{op}.{valor},"
+                f"and({cursor}.eq.{valor},id.{op}.{ultimo_id})"
+            )
+
+    for col in _colunas_cursor(cursor):
+        query = query.order(col, desc=desc)
+
+    return query.limit(tamanho)
+
+
+def _colunas_cursor(cursor: str) -> List[str]:
+    return [cursor] if cursor == "id" else [cursor, "id"]
+
+
+class LeituraIncompleta(Exception):
+    """Varredura interrompida antes do fim (circuito aberto ou erro numa página)."""
+
+    def __init__(self, table: str, entregues: int):
+        super().__init__(f"Leitura de '{table}' interrompida após {entregues} linha(s)")
+        self.table = table
+        self.entregues = entregues
+
+
+def supabase_table_iter(
+    table: str,
+    filters: Optional[Dict[str, Any]] = None,
+    select: str = "*",
+    cursor: str = "id",
+    desc: bool = False,
+    page_size: int = 1000,
+    max_rows: Optional[int] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Percorre a tabela em páginas keyset e devolve as linhas uma a uma.
+
+    Ao contrário de `supabase_table_select`, mantém no máximo `page_size`
+    linhas em memória e nunca usa OFFSET: cada página continua a partir
+    do último valor de `cursor` visto. Quando o cursor não é `id`
+    (ex.: `criado_em`), o `id` é usado como desempate.
+
+    Args:
+        cursor: coluna ordenável usada como cursor (`id` ou `criado_em`).
+        desc: percorre do mais recente para o mais antigo.
+        page_size: linhas por requisição.
+        max_rows: limite total de linhas devolvidas (None = sem limite).
+
+    Raises:
+        LeituraIncompleta: uma página foi recusada pelo circuito ou
+            falhou. As linhas já entregues NÃO são a tabela inteira;
+            quem agrega ou lista deve tratar como erro.
+    """
+    if page_size <= 0:
+        raise ValueError("page_size deve ser positivo.")
+
+    select = _incluir_colunas(select, _colunas_cursor(cursor))
+
+    ultimo: Optional[Dict[str, Any]] = None
+    entregues = 0
+
+    while max_rows is None or entregues < max_rows:
+        tamanho = page_size
+        if max_rows is not None:
+            tamanho = min(page_size, max_rows - entregues)
+
+        with ChamadaProtegida("SELECT paginado", table) as chamada:
+            if not chamada.permitida():
+                raise LeituraIncompleta(table, entregues)
+
+            try:
+                query = _montar_pagina(
+                    supabase, table, filters, select, cursor, desc, ultimo, tamanho
+                )
+                rows = query.execute().data or []
+                chamada.sucesso()
+
+            except Exception as e:
+                logger.error(f"❌ SELECT paginado erro | Tabela={table} | Erro={e}", exc_info=True)
+                chamada.falha(e)
+                raise LeituraIncompleta(table, entregues) from e
+
+        for row in rows:
+            yield row
+
+        entregues += len(rows)
+
+        if len(rows) < tamanho:
+            return
+
+        ultimo = rows[-1]
 
 
 # ==========================================================
@@ -122,20 +352,135 @@ def supabase_table_insert(
     data: Dict[str, Any],
 ) -> Optional[Dict[str, Any]]:
 
-    try:
-        response = supabase_admin.table(table).insert(data).execute()
+    with ChamadaProtegida("INSERT", table) as chamada:
+        if not chamada.permitida():
+            return None
 
-        if response.data:
-            return response.data[0]
+        try:
+            response = supabase_admin.table(table).insert(data).execute()
+            chamada.sucesso()
+            invalidar_cache_tabela(table)
 
-        return None
+            if response.data:
+                return response.data[0]
 
-    except Exception as e:
-        logger.error(
-            f"❌ INSERT erro | Tabela={table} | Payload={data} | Erro={e}",
-            exc_info=True,
-        )
-        return None
+            return None
+
+        except Exception as e:
+            logger.error(
+                f"❌ INSERT erro | Tabela={table} | Payload={data} | Erro={e}",
+                exc_info=True,
+            )
+            chamada.falha(e)
+            return None
+
+
+# ==========================================================
+# INSERT / UPSERT EM LOTE
+# ==========================================================
+
+DEFAULT_BATCH_SIZE = 500
+
+
+def _executar_em_lotes(
+    table: str,
+    rows: List[Dict[str, Any]],
+    batch_size: int,
+    operacao: str,
+    executar,
+) -> List[bool]:
+    """
+    Envia `rows` em blocos de `batch_size` (uma requisição por bloco).
+
+    Se o PostgREST rejeitar um bloco (erro de dados), ele é dividido ao
+    meio e reenviado até isolar as linhas problemáticas, para que só elas
+    sejam marcadas como falha. Erros de rede não são subdivididos.
+
+    Returns:
+        Lista alinhada com `rows` (True = linha gravada).
+    """
+    if batch_size <= 0:
+        raise ValueError("batch_size deve ser positivo.")
+
+    resultado: List[bool] = [False] * len(rows)
+    pendentes = [
+        (inicio, min(inicio + batch_size, len(rows)))
+        for inicio in range(0, len(rows), batch_size)
+    ]
+
+    while pendentes:
+        inicio, fim = pendentes.pop(0)
+
+        with ChamadaProtegida(operacao, table) as chamada:
+            if not chamada.permitida():
+                break
+
+            try:
+                executar(rows[inicio:fim])
+                chamada.sucesso()
+                resultado[inicio:fim] = [True] * (fim - inicio)
+            except Exception as e:
+                chamada.falha(e)
+                if isinstance(e, APIError) and fim - inicio > 1:
+                    meio = (inicio + fim) // 2
+                    pendentes[:0] = [(inicio, meio), (meio, fim)]
+                    continue
+
+                logger.error(
+                    f"❌ {operacao} em lote erro | Tabela={table} | "
+                    f"Linhas={inicio}-{fim - 1} | Erro={e}",
+                )
+
+    if any(resultado):
+        invalidar_cache_tabela(table)
+
+    return resultado
+
+
+def supabase_table_insert_many(
+    table: str,
+    rows: List[Dict[str, Any]],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> List[bool]:
+    """
+    INSERT de várias linhas, `batch_size` por requisição.
+
+    Returns:
+        Lista de sucesso por linha, na mesma ordem de `rows`.
+    """
+
+    def executar(lote):
+        supabase_admin.table(table).insert(lote).execute()
+
+    return _executar_em_lotes(table, rows, batch_size, "INSERT", executar)
+
+
+def supabase_table_upsert(
+    table: str,
+    rows: List[Dict[str, Any]],
+    on_conflict: str = "id",
+    ignore_duplicates: bool = False,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> List[bool]:
+    """
+    UPSERT de várias linhas, `batch_size` por requisição.
+
+    Args:
+        on_conflict: coluna(s) únicas usadas para detectar conflito.
+        ignore_duplicates: mantém a linha existente em vez de atualizá-la.
+
+    Returns:
+        Lista de sucesso por linha, na mesma ordem de `rows`.
+    """
+
+    def executar(lote):
+        supabase_admin.table(table).upsert(
+            lote,
+            on_conflict=on_conflict,
+            ignore_duplicates=ignore_duplicates,
+        ).execute()
+
+    return _executar_em_lotes(table, rows, batch_size, "UPSERT", executar)
 
 
 # ==========================================================
@@ -148,18 +493,51 @@ def supabase_table_update(
     data: Dict[str, Any],
 ) -> Optional[List[Dict[str, Any]]]:
 
-    try:
-        query = supabase_admin.table(table).update(data)
+    with ChamadaProtegida("UPDATE", table) as chamada:
+        if not chamada.permitida():
+            return None
 
-        for k, v in filters.items():
-            query = query.eq(k, v)
+        try:
+            query = supabase_admin.table(table).update(data)
 
-        response = query.execute()
-        return response.data
+            for k, v in filters.items():
+                query = query.eq(k, v)
 
-    except Exception as e:
-        logger.error(f"❌ UPDATE erro: {e}", exc_info=True)
-        return None
+            response = query.execute()
+            chamada.sucesso()
+            invalidar_cache_tabela(table)
+            return response.data
+
+        except Exception as e:
+            logger.error(f"❌ UPDATE erro: {e}", exc_info=True)
+            chamada.falha(e)
+            return None
+
+
+# Ids por requisição no `in.(...)`: vão na URL, que tem limite de tamanho
+DEFAULT_IDS_POR_UPDATE = 200
+
+
+def supabase_table_update_many(
+    table: str,
+    ids: List[Any],
+    data: Dict[str, Any],
+    coluna: str = "id",
+    batch_size: int = DEFAULT_IDS_POR_UPDATE,
+) -> List[bool]:
+    """
+    UPDATE dos mesmos valores em várias linhas (`coluna IN (...)`),
+    `batch_size` ids por requisição. Só as colunas de `data` são
+    tocadas, ao contrário do UPSERT, que reenvia a linha inteira.
+
+    Returns:
+        Lista de sucesso por id, na mesma ordem de `ids`.
+    """
+
+    def executar(lote):
+        supabase_admin.table(table).update(data).in_(coluna, lote).execute()
+
+    return _executar_em_lotes(table, ids, batch_size, "UPDATE", executar)
 
 
 # ==========================================================
@@ -171,18 +549,25 @@ def supabase_table_delete(
     filters: Dict[str, Any],
 ) -> bool:
 
-    try:
-        query = supabase_admin.table(table).delete()
+    with ChamadaProtegida("DELETE", table) as chamada:
+        if not chamada.permitida():
+            return False
 
-        for k, v in filters.items():
-            query = query.eq(k, v)
+        try:
+            query = supabase_admin.table(table).delete()
 
-        query.execute()
-        return True
+            for k, v in filters.items():
+                query = query.eq(k, v)
 
-    except Exception as e:
-        logger.error(f"❌ DELETE erro: {e}", exc_info=True)
-        return False
+            query.execute()
+            chamada.sucesso()
+            invalidar_cache_tabela(table)
+            return True
+
+        except Exception as e:
+            logger.error(f"❌ DELETE erro: {e}", exc_info=True)
+            chamada.falha(e)
+            return False
 
 
 # ==========================================================
@@ -203,8 +588,14 @@ __all__ = [
     "supabase",
     "supabase_admin",
     "supabase_table_select",
+    "supabase_table_iter",
+    "supabase_table_count",
+    "LeituraIncompleta",
     "supabase_table_insert",
+    "supabase_table_insert_many",
+    "supabase_table_upsert",
     "supabase_table_update",
+    "supabase_table_update_many",
     "supabase_table_delete",
     "testar_conexao",
 ]
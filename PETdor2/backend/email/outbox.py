@@ -0,0 +1,407 @@
+"""
+Fila de saída (outbox) de e-mails - PETDor2
+
+- enfileirar() grava a mensagem num spool SQLite e retorna na hora;
+  o script do Streamlit não espera o SMTP/HTTP
+- Uma thread despachante entrega as mensagens num pool de threads
+  (EMAIL_OUTBOX_CONCORRENCIA envios simultâneos)
+- Falhas voltam para a fila com backoff; após MAX_TENTATIVAS ficam
+  como "falhou" (reprocessar_falhas() as reabre)
+- Mensagens pendentes sobrevivem a reinícios. Cada envio em andamento
+  tem dono (processo) e lease; só leases vencidos são retomados, então
+  vários processos podem dividir o mesmo spool sem reenviar e-mails
+- Mensagens enviadas perdem o payload (anexos, links de senha); só os
+  metadados ficam para o painel
+- status_outbox() alimenta o painel admin
+
+Canais:
+    "resend" → payload da API do Resend (backend/email/transport.py)
+    "smtp"   → {destinatario, assunto, texto, html} (utils/email_sender.py)
+"""
+
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from backend.utils.config import EMAIL_OUTBOX_PATH, EMAIL_OUTBOX_CONCORRENCIA
+
+logger = logging.getLogger(__name__)
+
+# ==========================================================
+# CONFIGURAÇÕES
+# ==========================================================
+
+MAX_TENTATIVAS = 5
+BACKOFF_BASE = 30  # segundos (30s, 60s, 120s, ...)
+INTERVALO_VARREDURA = 5  # segundos sem aviso → procura mensagens vencidas
+RETENCAO_ENVIADOS = 7 * 24 * 3600  # segundos
+# Tempo de posse de uma mensagem em envio; deve cobrir o pior caso
+# do transporte (tentativas + timeouts). Vencido, outro processo retoma.
+LEASE_SEGUNDOS = 300
+
+STATUS = ("pendente", "enviando", "enviado", "falhou")
+
+
+# ==========================================================
+# CANAIS
+# ==========================================================
+
+def _enviar_resend(payload: Dict[str, Any]) -> bool:
+    from backend.email.transport import get_transport
+
+    return get_transport().enviar(payload) is not None
+
+
+def _enviar_smtp(payload: Dict[str, Any]) -> bool:
+    from backend.utils.email_sender import _enviar_email
+
+    sucesso, _ = _enviar_email(
+        payload["destinatario"],
+        payload["assunto"],
+        payload["texto"],
+        payload["html"],
+    )
+    return sucesso
+
+
+CANAIS: Dict[str, Callable[[Dict[str, Any]], bool]] = {
+    "resend": _enviar_resend,
+    "smtp": _enviar_smtp,
+}
+
+
+# ==========================================================
+# OUTBOX
+# ==========================================================
+
+class Outbox:
+    """Spool SQLite + thread despachante + pool de envio."""
+
+    def __init__(self, caminho: str = EMAIL_OUTBOX_PATH, concorrencia: int = EMAIL_OUTBOX_CONCORRENCIA):
+        self.caminho = caminho
+        self.concorrencia = max(concorrencia, 1)
+        self.dono = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+        self._local = threading.local()
+        self._aviso = threading.Event()
+        self._vagas = threading.BoundedSemaphore(self.concorrencia)
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+        conn = self._conexao()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS outbox (
+                id TEXT PRIMARY KEY,
+                canal TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL,
+                tentativas INTEGER NOT NULL DEFAULT 0,
+                erro TEXT,
+                criado_em REAL NOT NULL,
+                atualizado_em REAL NOT NULL,
+                proxima_tentativa REAL NOT NULL,
+                dono TEXT,
+                lease_ate REAL
+            )
+            """
+        )
+        # Spools criados antes do lease
+        colunas = {linha[1] for linha in conn.execute("PRAGMA table_info(outbox)")}
+        for coluna, tipo in (("dono", "TEXT"), ("lease_ate", "REAL")):
+            if coluna not in colunas:
+                conn.execute(f"ALTER TABLE outbox ADD COLUMN {coluna} {tipo}")
+
+        # Spool em /tmp: só o usuário do processo lê
+        try:
+            os.chmod(self.caminho, 0o600)
+        except OSError:
+            pass
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_outbox_fila "
+            "ON outbox (status, proxima_tentativa)"
+        )
+
+    def _conexao(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(
+                self.caminho,
+                timeout=10,
+                isolation_level=None,  # transações explícitas
+                check_same_thread=False,
+            )
+            self._local.conn = conn
+        return conn
+
+    # ------------------------------------------------------
+    # Ciclo de vida
+    # ------------------------------------------------------
+
+    def iniciar(self) -> None:
+        """Sobe o despachante (idempotente)."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+
+            agora = time.time()
+            conn = self._conexao()
+            # Envios interrompidos são retomados por _reservar quando o
+            # lease vence; aqui só limpa o que já foi entregue
+            conn.execute("UPDATE outbox SET payload = '' WHERE status = 'enviado'")
+            conn.execute(
+                "DELETE FROM outbox WHERE status = 'enviado' AND atualizado_em < ?",
+                (agora - RETENCAO_ENVIADOS,),
+            )
+
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.concorrencia,
+                thread_name_prefix="outbox-envio",
+            )
+            self._thread = threading.Thread(
+                target=self._despachar,
+                name="outbox-despachante",
+                daemon=True,
+            )
+            self._thread.start()
+
+        logger.info(f"📮 Outbox iniciado ({self.caminho})")
+
+    # ------------------------------------------------------
+    # Produtor
+    # ------------------------------------------------------
+
+    def enfileirar(self, canal: str, payload: Dict[str, Any]) -> str:
+        """Grava a mensagem no spool e acorda o despachante."""
+        if canal not in CANAIS:
+            raise ValueError(f"Canal de e-mail desconhecido: {canal}")
+
+        mensagem_id = uuid.uuid4().hex
+        agora = time.time()
+
+        self._conexao().execute(
+            "INSERT INTO outbox (id, canal, payload, status, criado_em, "
+            "atualizado_em, proxima_tentativa) VALUES (?, ?, ?, 'pendente', ?, ?, ?)",
+            (mensagem_id, canal, json.dumps(payload), agora, agora, agora),
+        )
+
+        self.iniciar()
+        self._aviso.set()
+        return mensagem_id
+
+    # ------------------------------------------------------
+    # Consumidor
+    # ------------------------------------------------------
+
+    def _reservar(self, limite: int) -> List[sqlite3.Row]:
+        """
+        Toma posse de até `limite` mensagens: pendentes vencidas ou em
+        envio com lease expirado (dono morreu ou travou).
+        """
+        conn = self._conexao()
+        agora = time.time()
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            linhas = conn.execute(
+                "SELECT id, canal, payload, tentativas FROM outbox "
+                "WHERE (status = 'pendente' AND proxima_tentativa <= ?) "
+                "OR (status = 'enviando' AND COALESCE(lease_ate, 0) < ?) "
+                "ORDER BY proxima_tentativa LIMIT ?",
+                (agora, agora, limite),
+            ).fetchall()
+
+            conn.executemany(
+                "UPDATE outbox SET status = 'enviando', dono = ?, lease_ate = ?, "
+                "atualizado_em = ? WHERE id = ?",
+                [(self.dono, agora + LEASE_SEGUNDOS, agora, linha[0]) for linha in linhas],
+            )
+            conn.execute("COMMIT")
+            return linhas
+
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _despachar(self) -> None:
+        while True:
+            self._aviso.wait(INTERVALO_VARREDURA)
+            self._aviso.clear()
+
+            try:
+                while True:
+                    # Espera ao menos uma vaga antes de reservar
+                    self._vagas.acquire()
+                    livres = 1
+                    while livres < self.concorrencia and self._vagas.acquire(blocking=False):
+                        livres += 1
+
+                    # Vagas sem mensagem voltam em qualquer caso (inclusive
+                    # "database is locked" no _reservar ou falha no submit),
+                    # senão o despachante trava no acquire()
+                    enviadas = 0
+                    try:
+                        for linha in self._reservar(livres):
+                            self._pool.submit(self._entregar, *linha)
+                            enviadas += 1
+                    finally:
+                        for _ in range(livres - enviadas):
+                            self._vagas.release()
+
+                    if enviadas < livres:
+                        break
+
+            except Exception as e:
+                logger.error(f"❌ Outbox: erro no despachante: {e}", exc_info=True)
+
+    def _entregar(self, mensagem_id: str, canal: str, payload: str, tentativas: int) -> None:
+        erro = None
+        try:
+            sucesso = CANAIS[canal](json.loads(payload))
+        except Exception as e:
+            sucesso = False
+            erro = str(e)
+        finally:
+            self._vagas.release()
+            self._aviso.set()
+
+        agora = time.time()
+        tentativas += 1
+
+        if sucesso:
+            status, proxima = "enviado", agora
+        elif tentativas >= MAX_TENTATIVAS:
+            status, proxima = "falhou", agora
+            logger.error(f"❌ Outbox: desistindo de {mensagem_id} após {tentativas} tentativas")
+        else:
+            status, proxima = "pendente", agora + BACKOFF_BASE * 2 ** (tentativas - 1)
+
+        try:
+            # Só o dono atual grava; enviado → payload descartado
+            self._conexao().execute(
+                "UPDATE outbox SET status = ?, tentativas = ?, erro = ?, "
+                "atualizado_em = ?, proxima_tentativa = ?, dono = NULL, lease_ate = NULL, "
+                "payload = CASE WHEN ? = 'enviado' THEN '' ELSE payload END "
+                "WHERE id = ? AND dono = ?",
+                (status, tentativas, erro or (None if sucesso else "envio recusado"),
+                 agora, proxima, status, mensagem_id, self.dono),
+            )
+        except Exception as e:
+            logger.error(f"❌ Outbox: erro ao atualizar {mensagem_id}: {e}")
+
+    # ------------------------------------------------------
+    # Consulta / admin
+    # ------------------------------------------------------
+
+    def status(self) -> Dict[str, Any]:
+        conn = self._conexao()
+        contagem = dict.fromkeys(STATUS, 0)
+        contagem.update(
+            conn.execute("SELECT status, COUNT(*) FROM outbox GROUP BY status").fetchall()
+        )
+
+        mais_antiga = conn.execute(
+            "SELECT MIN(criado_em) FROM outbox WHERE status = 'pendente'"
+        ).fetchone()[0]
+
+        return {
+            "contagem": contagem,
+            "pendente_mais_antiga_segundos": int(time.time() - mais_antiga) if mais_antiga else 0,
+            "despachante_ativo": bool(self._thread and self._thread.is_alive()),
+        }
+
+    def listar(self, status: Optional[str] = None, limite: int = 50) -> List[Dict[str, Any]]:
+        sql = (
+            "SELECT id, canal, status, tentativas, erro, criado_em, atualizado_em "
+            "FROM outbox"
+        )
+        params: tuple = ()
+        if status:
+            sql += " WHERE status = ?"
+            params = (status,)
+        sql += " ORDER BY atualizado_em DESC LIMIT ?"
+
+        colunas = ("id", "canal", "status", "tentativas", "erro", "criado_em", "atualizado_em")
+        linhas = self._conexao().execute(sql, params + (limite,)).fetchall()
+        return [dict(zip(colunas, linha)) for linha in linhas]
+
+    def reprocessar_falhas(self) -> int:
+        cur = self._conexao().execute(
+            "UPDATE outbox SET status = 'pendente', tentativas = 0, "
+            "proxima_tentativa = ?, atualizado_em = ? WHERE status = 'falhou'",
+            (time.time(), time.time()),
+        )
+        if cur.rowcount:
+            self.iniciar()
+            self._aviso.set()
+        return cur.rowcount
+
+
+_outbox: Optional[Outbox] = None
+_outbox_lock = threading.Lock()
+
+
+def get_outbox() -> Outbox:
+    """
+    Outbox do processo (compartilhado entre sessões). O despachante sobe
+    junto, para retomar o que ficou no spool antes de um restart.
+    """
+    global _outbox
+    if _outbox is None:
+        with _outbox_lock:
+            if _outbox is None:
+                _outbox = Outbox()
+                _outbox.iniciar()
+    return _outbox
+
+
+# ==========================================================
+# API
+# ==========================================================
+
+def enfileirar(canal: str, payload: Dict[str, Any]) -> Optional[str]:
+    """
+    Coloca um e-mail na fila e retorna imediatamente.
+
+    Se o spool estiver indisponível, envia na hora (comportamento antigo).
+
+    Returns:
+        id da mensagem na fila; None se foi enviado direto e falhou.
+    """
+    try:
+        return get_outbox().enfileirar(canal, payload)
+    except sqlite3.Error as e:
+        logger.warning(f"⚠️ Outbox indisponível, enviando direto: {e}")
+        return "direto" if CANAIS[canal](payload) else None
+
+
+def status_outbox() -> Dict[str, Any]:
+    return get_outbox().status()
+
+
+def listar_mensagens(status: Optional[str] = None, limite: int = 50) -> List[Dict[str, Any]]:
+    return get_outbox().listar(status, limite)
+
+
+def reprocessar_falhas() -> int:
+    return get_outbox().reprocessar_falhas()
+
+
+__all__ = [
+    "CANAIS",
+    "Outbox",
+    "get_outbox",
+    "enfileirar",
+    "status_outbox",
+    "listar_mensagens",
+    "reprocessar_falhas",
+]
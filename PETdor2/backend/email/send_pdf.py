@@ -1,6 +1,9 @@
 import base64
-import requests
-import streamlit as st
+from typing import Any, Dict, Sequence
+
+from backend.email.outbox import enfileirar
+from backend.email.transport import remetente_padrao
+from backend.utils.report_engine import gerar_pdf_avaliacoes
 
 
 def enviar_pdf_email(
@@ -11,13 +14,10 @@ def enviar_pdf_email(
     nome_arquivo: str,
 ) -> bool:
 
-    api_key = st.secrets["email"]["RESEND_API_KEY"]
-    email_from = st.secrets["email"]["EMAIL_FROM"]
-
     pdf_base64 = base64.b64encode(pdf_bytes).decode()
 
     payload = {
-        "from": email_from,
+        "from": remetente_padrao(),
         "to": [destinatario],
         "subject": assunto,
         "html": corpo,
@@ -29,15 +29,22 @@ def enviar_pdf_email(
         ],
     }
 
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json",
-    }
+    # Envio em segundo plano pela fila de saída
+    return enfileirar("resend", payload) is not None
 
-    r = requests.post(
-        "https://api.resend.com/emails",
-        json=payload,
-        headers=headers,
-    )
 
-    return r.status_code in (200, 201)
+def enviar_relatorio_email(
+    destinatario: str,
+    avaliacoes: Sequence[Dict[str, Any]],
+    assunto: str = "PETDor – Relatório de Avaliação de Dor",
+    corpo: str = "<p>Segue em anexo o relatório de avaliação de dor.</p>",
+    nome_arquivo: str = "relatorio_petdor.pdf",
+) -> bool:
+    """Envia o relatório das avaliações (mesmo PDF/cache do download)."""
+    return enviar_pdf_email(
+        destinatario=destinatario,
+        assunto=assunto,
+        corpo=corpo,
+        pdf_bytes=gerar_pdf_avaliacoes(avaliacoes),
+        nome_arquivo=nome_arquivo,
+    )
@@ -1,35 +1,18 @@
-import requests
-import streamlit as st
-
-RESEND_URL = "https://api.resend.com/emails"
+from backend.email.outbox import enfileirar
+from backend.email.transport import remetente_padrao
 
 
 def enviar_email(destinatario: str, assunto: str, html: str) -> bool:
+    """Coloca o e-mail na fila de saída (envio em segundo plano)."""
     try:
-        api_key = st.secrets["email"]["RESEND_API_KEY"]
-        email_from = st.secrets["email"]["EMAIL_FROM"]
-
         payload = {
-            "from": email_from,
+            "from": remetente_padrao(),
             "to": [destinatario],
             "subject": assunto,
             "html": html,
         }
 
-        headers = {
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json",
-        }
-
-        response = requests.post(
-            RESEND_URL,
-            json=payload,
-            headers=headers,
-            timeout=10,
-        )
-
-        response.raise_for_status()
-        return True
+        return enfileirar("resend", payload) is not None
 
     except Exception as e:
         print("❌ ERRO AO ENVIAR E-MAIL:", e)
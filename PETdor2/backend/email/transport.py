@@ -0,0 +1,192 @@
+"""
+Transporte HTTP compartilhado para a API do Resend - PETDor2
+
+- Uma requests.Session por processo (keep-alive + pool de conexões):
+  o handshake TLS é pago uma vez, não a cada e-mail
+- Timeouts de conexão e leitura em toda chamada
+- Novas tentativas em 429/5xx/erros de rede, com backoff exponencial
+  e jitter, respeitando Retry-After e os headers ratelimit-* do Resend
+- Idempotency-Key por envio: uma nova tentativa nunca duplica o e-mail
+"""
+
+import logging
+import random
+import threading
+import time
+import uuid
+from typing import Any, Dict, Optional
+
+import requests
+import streamlit as st
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+# ==========================================================
+# CONFIGURAÇÕES
+# ==========================================================
+
+RESEND_URL = "https://api.resend.com/emails"
+
+TIMEOUT_CONEXAO = 5  # segundos
+TIMEOUT_LEITURA = 20  # segundos
+MAX_TENTATIVAS = 3
+BACKOFF_BASE = 0.5  # segundos
+BACKOFF_MAXIMO = 10  # segundos
+POOL_CONEXOES = 10
+
+STATUS_REPETIVEIS = {429, 500, 502, 503, 504}
+
+
+def _credenciais() -> Dict[str, str]:
+    return {
+        "api_key": st.secrets["email"]["RESEND_API_KEY"],
+        "from": st.secrets["email"]["EMAIL_FROM"],
+    }
+
+
+def remetente_padrao() -> str:
+    return _credenciais()["from"]
+
+
+# ==========================================================
+# TRANSPORTE
+# ==========================================================
+
+class ResendTransport:
+    """Cliente HTTP do Resend reaproveitado por todos os envios."""
+
+    def __init__(
+        self,
+        url: str = RESEND_URL,
+        max_tentativas: int = MAX_TENTATIVAS,
+        timeout: tuple = (TIMEOUT_CONEXAO, TIMEOUT_LEITURA),
+    ):
+        self.url = url
+        self.max_tentativas = max_tentativas
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_CONEXOES)
+        self.session.mount("https://", adapter)
+
+        # Pausa global quando o Resend avisa que a cota zerou
+        self._pausado_ate = 0.0
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------
+    # Limites informados pelo servidor
+    # ------------------------------------------------------
+
+    @staticmethod
+    def _segundos_header(response: requests.Response, nome: str) -> Optional[float]:
+        valor = response.headers.get(nome)
+        try:
+            return float(valor) if valor is not None else None
+        except ValueError:
+            return None
+
+    def _registrar_limites(self, response: requests.Response) -> None:
+        restantes = self._segundos_header(response, "ratelimit-remaining")
+        reset = self._segundos_header(response, "ratelimit-reset")
+
+        if restantes is not None and restantes <= 0 and reset:
+            with self._lock:
+                self._pausado_ate = max(self._pausado_ate, time.monotonic() + reset)
+
+    def _aguardar_cota(self) -> None:
+        with self._lock:
+            espera = self._pausado_ate - time.monotonic()
+        if espera > 0:
+            time.sleep(min(espera, BACKOFF_MAXIMO))
+
+    def _espera(self, tentativa: int, response: Optional[requests.Response]) -> float:
+        """Retry-After/ratelimit-reset do servidor, ou backoff com jitter."""
+        if response is not None:
+            for header in ("retry-after", "ratelimit-reset"):
+                segundos = self._segundos_header(response, header)
+                if segundos is not None:
+                    return min(segundos, BACKOFF_MAXIMO) + random.uniform(0, 0.25)
+
+        teto = min(BACKOFF_BASE * 2 ** tentativa, BACKOFF_MAXIMO)
+        return random.uniform(0, teto)  # full jitter
+
+    # ------------------------------------------------------
+    # Envio
+    # ------------------------------------------------------
+
+    def enviar(self, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        POST /emails com novas tentativas.
+
+        Returns:
+            JSON da resposta (ex.: {"id": ...}) ou None em falha.
+        """
+        headers = {
+            "Authorization": f"Bearer {_credenciais()['api_key']}",
+            "Content-Type": "application/json",
+            "Idempotency-Key": uuid.uuid4().hex,
+        }
+
+        for tentativa in range(self.max_tentativas):
+            self._aguardar_cota()
+            response = None
+
+            try:
+                response = self.session.post(
+                    self.url,
+                    json=payload,
+                    headers=headers,
+                    timeout=self.timeout,
+                )
+                self._registrar_limites(response)
+
+                if response.status_code not in STATUS_REPETIVEIS:
+                    response.raise_for_status()
+                    return response.json() if response.content else {}
+
+                motivo = f"HTTP {response.status_code}"
+
+            except (requests.ConnectionError, requests.Timeout) as e:
+                motivo = f"{type(e).__name__}: {e}"
+
+            except requests.HTTPError as e:
+                logger.error(f"❌ Resend recusou o e-mail: {e} | {response.text[:300]}")
+                return None
+
+            except Exception as e:
+                logger.error(f"❌ Erro ao enviar e-mail: {e}", exc_info=True)
+                return None
+
+            if tentativa + 1 < self.max_tentativas:
+                espera = self._espera(tentativa, response)
+                logger.warning(
+                    f"⚠️ Resend: {motivo}; nova tentativa em {espera:.1f}s "
+                    f"({tentativa + 2}/{self.max_tentativas})"
+                )
+                time.sleep(espera)
+
+        logger.error(f"❌ Resend: falha após {self.max_tentativas} tentativas ({motivo})")
+        return None
+
+
+_transport: Optional[ResendTransport] = None
+_transport_lock = threading.Lock()
+
+
+def get_transport() -> ResendTransport:
+    """Transporte do processo (compartilhado entre sessões)."""
+    global _transport
+    if _transport is None:
+        with _transport_lock:
+            if _transport is None:
+                _transport = ResendTransport()
+    return _transport
+
+
+__all__ = [
+    "RESEND_URL",
+    "ResendTransport",
+    "get_transport",
+    "remetente_padrao",
+]
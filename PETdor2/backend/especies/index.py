@@ -1,21 +1,136 @@
 """
 Sistema central de registro e consulta das espécies.
 Modelo COMPLETO (categorias + perguntas).
+
+Os módulos de espécie são importados sob demanda, no primeiro acesso
+a cada espécie (use `preload_all()` para aquecer todas de uma vez).
+
+As configs são congeladas no registro (MappingProxyType + tuplas,
+strings internadas) e indexadas uma única vez. As consultas devolvem
+visões somente-leitura, sem copiar nem percorrer a estrutura aninhada.
 """
 
 import logging
-from typing import Dict, List, Optional, Union
+import sys
+import threading
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple, Union
 from importlib import import_module
 
 from .base import EspecieConfig, Categoria, Pergunta
+from .scoring import PlanoPontuacao, compilar_plano
 
 logger = logging.getLogger(__name__)
 
+# ==========================================================
+# Estruturas imutáveis
+# ==========================================================
+
+@dataclass(frozen=True, slots=True)
+class PerguntaIndexada:
+    """Pergunta com o contexto necessário para exibição/relatórios."""
+    especie_id: str
+    categoria_id: str
+    categoria_nome: str
+    pergunta: Mapping[str, Any]
+    labels: Tuple[str, ...]
+
+    @property
+    def id(self) -> str:
+        return self.pergunta["id"]
+
+    @property
+    def texto(self) -> str:
+        return self.pergunta["texto"]
+
+
+@dataclass(frozen=True, slots=True)
+class EspecieRegistrada:
+    id: str
+    nome: str
+    config: Mapping[str, Any]
+    plano: PlanoPontuacao
+    perguntas: Mapping[str, PerguntaIndexada]
+
+
+def _congelar(valor: Any) -> Any:
+    """dict → MappingProxyType, list → tuple, str → interned (recursivo)."""
+    if isinstance(valor, Mapping):
+        return MappingProxyType({
+            (sys.intern(k) if isinstance(k, str) else k): _congelar(v)
+            for k, v in valor.items()
+        })
+    if isinstance(valor, (list, tuple)):
+        return tuple(_congelar(v) for v in valor)
+    if isinstance(valor, str):
+        return sys.intern(valor)
+    return valor
+
+
 # ==========================================================
 # Registro interno
 # ==========================================================
 
-_ESPECIES_REGISTRADAS: Dict[str, dict] = {}
+_ESPECIES_REGISTRADAS: Dict[str, EspecieRegistrada] = {}
+_NOME_PARA_ID: Dict[str, str] = {}
+
+# Módulo de cada espécie → nome da config exportada
+ESPECIES_IMPORTS = {
+    "cao": "CONFIG_CAES",
+    "gato": "CONFIG_GATOS",
+    "coelho": "CONFIG_COELHO",
+    "porquinho_da_india": "CONFIG_PORQUINHO_DA_INDIA",
+    "aves": "CONFIG_AVES",
+    "repteis": "CONFIG_REPTEIS",
+}
+
+_LOCK_CARGA = threading.RLock()
+_MODULOS_TENTADOS: set = set()
+_TODAS_CARREGADAS = False
+
+# ==========================================================
+# Carga sob demanda
+# ==========================================================
+
+def _carregar_especie(especie_id: str) -> None:
+    """Importa e registra o módulo da espécie, uma única vez."""
+    if especie_id in _ESPECIES_REGISTRADAS or especie_id not in ESPECIES_IMPORTS:
+        return
+
+    with _LOCK_CARGA:
+        if especie_id in _MODULOS_TENTADOS:
+            return
+        _MODULOS_TENTADOS.add(especie_id)
+
+        try:
+            mod = import_module(f"backend.especies.{especie_id}")
+            registrar_especie(getattr(mod, ESPECIES_IMPORTS[especie_id]))
+        except Exception as e:
+            logger.error(f"❌ Erro ao registrar espécie '{especie_id}': {e}")
+
+
+def preload_all() -> None:
+    """Carrega todas as espécies conhecidas (warmup / listagens)."""
+    global _TODAS_CARREGADAS
+
+    if _TODAS_CARREGADAS:
+        return
+
+    for especie_id in ESPECIES_IMPORTS:
+        _carregar_especie(especie_id)
+
+    _TODAS_CARREGADAS = True
+    logger.debug(f"Total de espécies registradas: {len(_ESPECIES_REGISTRADAS)}")
+
+
+def _registros_ordenados() -> List[EspecieRegistrada]:
+    preload_all()
+    ordem = {especie_id: i for i, especie_id in enumerate(ESPECIES_IMPORTS)}
+    return sorted(
+        _ESPECIES_REGISTRADAS.values(),
+        key=lambda r: ordem.get(r.id, len(ordem)),
+    )
 
 # ==========================================================
 # Registro e consulta
@@ -37,25 +152,72 @@ def registrar_especie(config: Union[EspecieConfig, dict]) -> None:
 
     if especie_id in _ESPECIES_REGISTRADAS:
         logger.warning(f"⚠️ Espécie '{especie_id}' já registrada. Atualizando...")
+        _NOME_PARA_ID.pop(_ESPECIES_REGISTRADAS[especie_id].nome, None)
+
+    congelada = _congelar(config)
+    plano = compilar_plano(congelada)
+
+    perguntas: Dict[str, PerguntaIndexada] = {}
+    for categoria in congelada["categorias"]:
+        for pergunta in categoria.get("perguntas", ()):
+            perguntas[pergunta["id"]] = PerguntaIndexada(
+                especie_id=congelada["id"],
+                categoria_id=categoria["id"],
+                categoria_nome=categoria["nome"],
+                pergunta=pergunta,
+                labels=plano.labels[plano.indice[pergunta["id"]]],
+            )
+
+    _ESPECIES_REGISTRADAS[especie_id] = EspecieRegistrada(
+        id=congelada["id"],
+        nome=congelada["nome"],
+        config=congelada,
+        plano=plano,
+        perguntas=MappingProxyType(perguntas),
+    )
+    _NOME_PARA_ID[congelada["nome"]] = congelada["id"]
+    logger.debug(f"Espécie '{nome}' registrada")
 
-    _ESPECIES_REGISTRADAS[especie_id] = config
-    logger.info(f"✅ Espécie '{nome}' registrada com sucesso")
 
+def buscar_especie_por_id(especie_id: str) -> Optional[Mapping[str, Any]]:
+    """Config da espécie (visão somente-leitura)."""
+    _carregar_especie(especie_id)
+    registro = _ESPECIES_REGISTRADAS.get(especie_id)
+    return registro.config if registro else None
 
-def buscar_especie_por_id(especie_id: str) -> Optional[dict]:
-    return _ESPECIES_REGISTRADAS.get(especie_id)
 
+def buscar_especie_por_nome(nome: str) -> Optional[Mapping[str, Any]]:
+    preload_all()
+    especie_id = _NOME_PARA_ID.get(nome)
+    return buscar_especie_por_id(especie_id) if especie_id else None
 
-def listar_especies() -> List[dict]:
-    return list(_ESPECIES_REGISTRADAS.values())
+
+def buscar_pergunta(especie_id: str, pergunta_id: str) -> Optional[PerguntaIndexada]:
+    """Lookup O(1) de pergunta → (categoria, pergunta, labels da escala)."""
+    _carregar_especie(especie_id)
+    registro = _ESPECIES_REGISTRADAS.get(especie_id)
+    return registro.perguntas.get(pergunta_id) if registro else None
+
+
+def obter_plano_pontuacao(especie_id: str) -> Optional[PlanoPontuacao]:
+    """Plano de pontuação compilado no registro da espécie."""
+    _carregar_especie(especie_id)
+    registro = _ESPECIES_REGISTRADAS.get(especie_id)
+    return registro.plano if registro else None
+
+
+def listar_especies() -> List[Mapping[str, Any]]:
+    return [registro.config for registro in _registros_ordenados()]
 
 
 def get_especies_nomes() -> List[str]:
-    return [config["nome"] for config in _ESPECIES_REGISTRADAS.values()]
+    return [registro.nome for registro in _registros_ordenados()]
 
 
 def get_especies_ids() -> List[str]:
-    return list(_ESPECIES_REGISTRADAS.keys())
+    """IDs conhecidos — não importa nenhum módulo de espécie."""
+    extras = [i for i in _ESPECIES_REGISTRADAS if i not in ESPECIES_IMPORTS]
+    return list(ESPECIES_IMPORTS.keys()) + extras
 
 
 # ==========================================================
@@ -83,37 +245,22 @@ def carregar_especies() -> List[dict]:
     return listar_especies()
 
 
-# ==========================================================
-# Importação automática das espécies
-# ==========================================================
-
-ESPECIES_IMPORTS = {
-    "cao": "CONFIG_CAES",
-    "gato": "CONFIG_GATOS",
-    "coelho": "CONFIG_COELHO",
-    "porquinho_da_india": "CONFIG_PORQUINHO_DA_INDIA",
-    "aves": "CONFIG_AVES",
-    "repteis": "CONFIG_REPTEIS",
-}
-
-for modulo, attr in ESPECIES_IMPORTS.items():
-    try:
-        mod = import_module(f"backend.especies.{modulo}")
-        registrar_especie(getattr(mod, attr))
-    except Exception as e:
-        logger.error(f"❌ Erro ao registrar espécie '{modulo}': {e}")
-
-logger.info(f"✅ Total de espécies registradas: {len(_ESPECIES_REGISTRADAS)}")
-
 __all__ = [
     "EspecieConfig",
     "Categoria",
     "Pergunta",
     "registrar_especie",
+    "PerguntaIndexada",
+    "EspecieRegistrada",
     "buscar_especie_por_id",
+    "buscar_especie_por_nome",
+    "buscar_pergunta",
+    "obter_plano_pontuacao",
     "listar_especies",
     "get_especies_nomes",
     "get_especies_ids",
     "get_escala_labels",
     "carregar_especies",
+    "preload_all",
+    "ESPECIES_IMPORTS",
 ]
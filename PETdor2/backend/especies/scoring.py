@@ -0,0 +1,206 @@
+# PETdor2/backend/especies/scoring.py
+
+"""
+Motor de pontuação pré-compilado dos questionários.
+
+Cada espécie é compilada UMA vez (no registro) em arrays planos:
+pesos, flags de inversão, máximos de escala e offsets de categoria.
+A pontuação de uma ou de milhares de avaliações vira álgebra de vetores.
+"""
+
+from typing import Any, Dict, List, Sequence, Union
+
+import numpy as np
+
+from .base import EspecieConfig
+
+
+def _labels_escala(escala: str) -> List[str]:
+    # Import tardio: index.py importa este módulo no registro
+    from .index import get_escala_labels
+
+    return get_escala_labels(escala)
+
+
+def formatar_pontuacao(valor: float) -> Union[int, float]:
+    """12.0 → 12 (colunas inteiras no banco); demais valores com 2 casas."""
+    valor = round(float(valor), 2)
+    return int(valor) if valor.is_integer() else valor
+
+
+class PlanoPontuacao:
+    """Plano de pontuação compilado de uma espécie."""
+
+    __slots__ = (
+        "especie_id",
+        "pergunta_ids",
+        "categoria_ids",
+        "categoria_nomes",
+        "labels",
+        "valores_label",
+        "indice",
+        "pesos",
+        "invertidas",
+        "maximos",
+        "inicios",
+        "fins",
+        "maximo_total",
+        "maximos_categoria",
+    )
+
+    def __init__(self, config: Union[EspecieConfig, dict]):
+        if isinstance(config, EspecieConfig):
+            config = config.to_dict()
+
+        self.especie_id: str = config["id"]
+
+        pergunta_ids: List[str] = []
+        labels: List[tuple] = []
+        pesos: List[float] = []
+        invertidas: List[bool] = []
+        categoria_ids: List[str] = []
+        categoria_nomes: List[str] = []
+        inicios: List[int] = []
+        fins: List[int] = []
+
+        for categoria in config.get("categorias", []):
+            categoria_ids.append(categoria["id"])
+            categoria_nomes.append(categoria["nome"])
+            inicios.append(len(pergunta_ids))
+
+            for pergunta in categoria.get("perguntas", []):
+                pergunta_ids.append(pergunta["id"])
+                labels.append(tuple(_labels_escala(pergunta["escala"])))
+                pesos.append(float(pergunta.get("peso", 1.0)))
+                invertidas.append(bool(pergunta.get("invertida", False)))
+
+            fins.append(len(pergunta_ids))
+
+        self.pergunta_ids = tuple(pergunta_ids)
+        self.categoria_ids = tuple(categoria_ids)
+        self.categoria_nomes = tuple(categoria_nomes)
+        self.labels = tuple(labels)
+        self.valores_label = tuple(
+            {label: i for i, label in enumerate(lbls)} for lbls in labels
+        )
+        self.indice = {pid: i for i, pid in enumerate(pergunta_ids)}
+
+        self.pesos = np.asarray(pesos, dtype=np.float64)
+        self.invertidas = np.asarray(invertidas, dtype=bool)
+        self.maximos = np.asarray([len(l) - 1 for l in labels], dtype=np.float64)
+        self.inicios = np.asarray(inicios, dtype=np.intp)
+        self.fins = np.asarray(fins, dtype=np.intp)
+
+        maximos_ponderados = self.maximos * self.pesos
+        self.maximo_total = float(maximos_ponderados.sum())
+        self.maximos_categoria = self._somar_categorias(maximos_ponderados)
+
+    # ------------------------------------------------------
+    # Codificação
+    # ------------------------------------------------------
+
+    def codificar(self, respostas: Dict[str, Any]) -> np.ndarray:
+        """Respostas {pergunta_id: label} → vetor (NaN = sem resposta)."""
+        vetor = np.full(len(self.pergunta_ids), np.nan)
+
+        for pergunta_id, label in (respostas or {}).items():
+            i = self.indice.get(pergunta_id)
+            if i is None:
+                continue
+
+            valor = self.valores_label[i].get(str(label))
+            if valor is not None:
+                vetor[i] = valor
+
+        return vetor
+
+    def codificar_matriz(self, lista_respostas: Sequence[Dict[str, Any]]) -> np.ndarray:
+        """Várias avaliações → matriz (n_avaliacoes × n_perguntas)."""
+        matriz = np.full((len(lista_respostas), len(self.pergunta_ids)), np.nan)
+
+        for linha, respostas in enumerate(lista_respostas):
+            matriz[linha] = self.codificar(respostas)
+
+        return matriz
+
+    # ------------------------------------------------------
+    # Pontuação
+    # ------------------------------------------------------
+
+    def _somar_categorias(self, valores: np.ndarray) -> np.ndarray:
+        """Soma por categoria via soma acumulada (suporta categorias vazias)."""
+        acumulado = np.concatenate(
+            [np.zeros(valores.shape[:-1] + (1,)), np.cumsum(valores, axis=-1)],
+            axis=-1,
+        )
+        return acumulado[..., self.fins] - acumulado[..., self.inicios]
+
+    def score_matriz(self, matriz: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Pontua uma matriz de respostas codificadas de uma só vez.
+
+        Perguntas sem resposta contam como 0. Perguntas `invertida`
+        pontuam `maximo - valor`. Cada pergunta é multiplicada pelo `peso`.
+
+        Returns:
+            {"total": (n,), "percentual": (n,), "categorias": (n, n_categorias)}
+        """
+        matriz = np.atleast_2d(np.asarray(matriz, dtype=np.float64))
+
+        valores = np.where(self.invertidas, self.maximos - matriz, matriz)
+        contribuicao = np.nan_to_num(valores, nan=0.0) * self.pesos
+
+        total = contribuicao.sum(axis=1)
+
+        if self.maximo_total > 0:
+            percentual = np.round(total / self.maximo_total * 100, 2)
+        else:
+            percentual = np.zeros_like(total)
+
+        return {
+            "total": total,
+            "percentual": percentual,
+            "categorias": self._somar_categorias(contribuicao),
+        }
+
+    def score(self, respostas: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Pontua uma avaliação.
+
+        Returns:
+            {
+                "total", "maximo", "percentual",
+                "categorias": {categoria_id: {"nome", "total", "maximo", "percentual"}},
+            }
+        """
+        resultado = self.score_matriz(self.codificar(respostas)[np.newaxis, :])
+        subtotais = resultado["categorias"][0]
+
+        categorias = {}
+        for i, categoria_id in enumerate(self.categoria_ids):
+            maximo = float(self.maximos_categoria[i])
+            subtotal = float(subtotais[i])
+            categorias[categoria_id] = {
+                "nome": self.categoria_nomes[i],
+                "total": formatar_pontuacao(subtotal),
+                "maximo": formatar_pontuacao(maximo),
+                "percentual": round(subtotal / maximo * 100, 2) if maximo > 0 else 0.0,
+            }
+
+        return {
+            "total": formatar_pontuacao(resultado["total"][0]),
+            "maximo": formatar_pontuacao(self.maximo_total),
+            "percentual": float(resultado["percentual"][0]),
+            "categorias": categorias,
+        }
+
+
+def compilar_plano(config: Union[EspecieConfig, dict]) -> PlanoPontuacao:
+    return PlanoPontuacao(config)
+
+
+__all__ = [
+    "PlanoPontuacao",
+    "compilar_plano",
+    "formatar_pontuacao",
+]
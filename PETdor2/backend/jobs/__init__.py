@@ -0,0 +1,5 @@
+"""
+Jobs offline do PETDor2 (execução via `python -m backend.jobs.<nome>`).
+"""
+
+__all__ = ["recalcular_pontuacoes"]
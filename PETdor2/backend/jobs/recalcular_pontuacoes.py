@@ -0,0 +1,238 @@
+"""
+Recalcula pontuacao_total / pontuacao_percentual das avaliações salvas.
+
+Uso (a partir de PETdor2/):
+    python -m backend.jobs.recalcular_pontuacoes --dry-run
+    python -m backend.jobs.recalcular_pontuacoes --especie cao
+
+Fluxo:
+1. Percorre `avaliacoes_dor` em páginas keyset (supabase_table_iter);
+   com --especie o filtro vai na consulta (join !inner com animais).
+2. Agrupa por espécie e codifica `respostas` numa matriz densa por bloco.
+3. Pontua o bloco inteiro de uma vez com o PlanoPontuacao da espécie.
+4. Grava só as linhas cuja pontuação mudou: UPDATE apenas das colunas
+   de pontuação, um por valor distinto (`id IN (...)` em lotes).
+
+Sai com código 1 se a leitura parou no meio ou alguma gravação falhou.
+"""
+
+import argparse
+import json
+import logging
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from backend.database.supabase_client import (
+    DEFAULT_IDS_POR_UPDATE,
+    LeituraIncompleta,
+    supabase_table_iter,
+    supabase_table_update_many,
+)
+from backend.especies.index import obter_plano_pontuacao
+from backend.especies.scoring import formatar_pontuacao
+
+logger = logging.getLogger(__name__)
+
+SELECT_AVALIACOES = (
+    "id, respostas, pontuacao_total, pontuacao_percentual, animais(especie)"
+)
+# Com --especie: só avaliações cujo animal é da espécie (filtro no banco)
+SELECT_AVALIACOES_ESPECIE = (
+    "id, respostas, pontuacao_total, pontuacao_percentual, animais!inner(especie)"
+)
+
+BLOCO_PADRAO = 50_000
+
+
+# ==========================================================
+# HELPERS
+# ==========================================================
+
+def _decodificar_respostas(valor: Any) -> Dict[str, Any]:
+    if isinstance(valor, dict):
+        return valor
+    if isinstance(valor, str) and valor:
+        try:
+            return json.loads(valor)
+        except ValueError:
+            return {}
+    return {}
+
+
+def _como_float(valor: Any) -> float:
+    return np.nan if valor is None else float(valor)
+
+
+# ==========================================================
+# PROCESSAMENTO POR BLOCO
+# ==========================================================
+
+def _processar_bloco(
+    especie: str,
+    linhas: List[Dict[str, Any]],
+    dry_run: bool,
+    batch_size: int,
+    stats: Dict[str, int],
+) -> None:
+    plano = obter_plano_pontuacao(especie)
+
+    if plano is None:
+        logger.warning(f"⚠️ Espécie sem plano de pontuação: {especie} ({len(linhas)} linhas)")
+        stats["ignoradas"] += len(linhas)
+        return
+
+    respostas = [_decodificar_respostas(l.get("respostas")) for l in linhas]
+    resultado = plano.score_matriz(plano.codificar_matriz(respostas))
+
+    novos_totais = np.round(resultado["total"], 2)
+    novos_percentuais = resultado["percentual"]
+
+    antigos_totais = np.fromiter(
+        (_como_float(l.get("pontuacao_total")) for l in linhas), float, len(linhas)
+    )
+    antigos_percentuais = np.fromiter(
+        (_como_float(l.get("pontuacao_percentual")) for l in linhas), float, len(linhas)
+    )
+
+    mudou = ~(
+        np.isclose(antigos_totais, novos_totais)
+        & np.isclose(antigos_percentuais, novos_percentuais)
+    )
+    indices = np.flatnonzero(mudou)
+
+    stats["processadas"] += len(linhas)
+    stats["alteradas"] += len(indices)
+
+    if dry_run or len(indices) == 0:
+        return
+
+    # Um UPDATE por valor distinto; só as colunas de pontuação mudam
+    por_valor: Dict[tuple, List[Any]] = {}
+    for i in indices:
+        total = formatar_pontuacao(novos_totais[i])
+        valor = (total, float(novos_percentuais[i]))
+        por_valor.setdefault(valor, []).append(linhas[i]["id"])
+
+    for (total, percentual), ids in por_valor.items():
+        sucesso = supabase_table_update_many(
+            "avaliacoes_dor",
+            ids,
+            {
+                "pontuacao_total": total,
+                "pontuacao_percentual": percentual,
+                "nivel_dor": str(total),
+            },
+            batch_size=batch_size,
+        )
+        stats["gravadas"] += sum(sucesso)
+        stats["falhas"] += len(sucesso) - sum(sucesso)
+
+
+# ==========================================================
+# JOB
+# ==========================================================
+
+def recalcular_pontuacoes(
+    especie: Optional[str] = None,
+    dry_run: bool = False,
+    page_size: int = 2000,
+    batch_size: int = DEFAULT_IDS_POR_UPDATE,
+    bloco: int = BLOCO_PADRAO,
+) -> Dict[str, int]:
+    """
+    Re-pontua todas as avaliações (ou só as de uma espécie).
+
+    Args:
+        especie: limita o job a uma espécie (id, ex.: "cao").
+        dry_run: só conta as diferenças, sem gravar.
+        page_size: linhas por página de leitura.
+        batch_size: ids por requisição de UPDATE.
+        bloco: linhas acumuladas por espécie antes de pontuar/gravar.
+
+    Returns:
+        Contadores {processadas, alteradas, gravadas, falhas, ignoradas,
+        incompleta}; incompleta=1 se a leitura parou antes do fim (o que
+        foi lido ainda é processado).
+    """
+    stats = {
+        "processadas": 0,
+        "alteradas": 0,
+        "gravadas": 0,
+        "falhas": 0,
+        "ignoradas": 0,
+        "incompleta": 0,
+    }
+    pendentes: Dict[str, List[Dict[str, Any]]] = {}
+
+    linhas = supabase_table_iter(
+        table="avaliacoes_dor",
+        filters={"animais.especie": especie} if especie else None,
+        select=SELECT_AVALIACOES_ESPECIE if especie else SELECT_AVALIACOES,
+        page_size=page_size,
+    )
+
+    try:
+        for linha in linhas:
+            especie_linha = (linha.get("animais") or {}).get("especie")
+
+            grupo = pendentes.setdefault(especie_linha, [])
+            grupo.append(linha)
+
+            if len(grupo) >= bloco:
+                _processar_bloco(especie_linha, grupo, dry_run, batch_size, stats)
+                pendentes[especie_linha] = []
+
+    except LeituraIncompleta as e:
+        logger.error(f"❌ {e}; processando só o que foi lido")
+        stats["incompleta"] = 1
+
+    for especie_linha, grupo in pendentes.items():
+        if grupo:
+            _processar_bloco(especie_linha, grupo, dry_run, batch_size, stats)
+
+    return stats
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Recalcula as pontuações salvas em avaliacoes_dor."
+    )
+    parser.add_argument("--especie", help="id da espécie (ex.: cao)")
+    parser.add_argument("--dry-run", action="store_true", help="não grava, só conta")
+    parser.add_argument("--page-size", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_IDS_POR_UPDATE)
+    parser.add_argument("--bloco", type=int, default=BLOCO_PADRAO)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+
+    inicio = time.perf_counter()
+    stats = recalcular_pontuacoes(
+        especie=args.especie,
+        dry_run=args.dry_run,
+        page_size=args.page_size,
+        batch_size=args.batch_size,
+        bloco=args.bloco,
+    )
+    duracao = time.perf_counter() - inicio
+
+    ok = not stats["incompleta"] and not stats["falhas"]
+
+    print(
+        f"{'✅' if ok else '⚠️'} Processadas={stats['processadas']} | "
+        f"Alteradas={stats['alteradas']} | "
+        f"Gravadas={stats['gravadas']} | Falhas={stats['falhas']} | "
+        f"Ignoradas={stats['ignoradas']} | {duracao:.1f}s"
+        + (" | leitura INCOMPLETA" if stats["incompleta"] else "")
+        + (" | dry-run" if args.dry_run else "")
+    )
+
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
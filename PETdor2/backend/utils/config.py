@@ -1,6 +1,7 @@
 # PETdor2/backend/utils/config.py
 
 import os
+import tempfile
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -41,11 +42,67 @@ SMTP_REMETENTE = os.getenv("EMAIL_SENDER", SMTP_EMAIL)
 
 SMTP_USAR_SSL = os.getenv("EMAIL_USE_SSL", "True").lower() == "true"
 
+# Fila de saída (outbox) de e-mails, persistida em SQLite
+EMAIL_OUTBOX_PATH = os.getenv(
+    "EMAIL_OUTBOX_PATH",
+    os.path.join(tempfile.gettempdir(), "petdor_outbox.sqlite3"),
+)
+EMAIL_OUTBOX_CONCORRENCIA = int(os.getenv("EMAIL_OUTBOX_CONCORRENCIA", "4"))
+
 # ================================
 # SEGURANÇA
 # ================================
 SECRET_KEY = os.getenv("SECRET_KEY", "CHAVE_SECRETA_TEMPORARIA")
 
+# ================================
+# RATE LIMIT
+# ================================
+# "memoria" (por processo) ou "sqlite" (compartilhado entre workers)
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memoria").lower()
+RATE_LIMIT_SQLITE_PATH = os.getenv(
+    "RATE_LIMIT_SQLITE_PATH",
+    os.path.join(tempfile.gettempdir(), "petdor_rate_limit.sqlite3"),
+)
+
+# ================================
+# CACHE DE RELATÓRIOS (PDF)
+# ================================
+REPORT_CACHE_MEMORIA_MB = int(os.getenv("REPORT_CACHE_MEMORIA_MB", "32"))
+REPORT_CACHE_DISCO_MB = int(os.getenv("REPORT_CACHE_DISCO_MB", "256"))
+REPORT_CACHE_DIR = os.getenv(
+    "REPORT_CACHE_DIR",
+    os.path.join(tempfile.gettempdir(), "petdor_relatorios"),
+)
+
+# ================================
+# SAÚDE DO BACKEND (monitor em segundo plano)
+# ================================
+HEALTH_INTERVALO_SEGUNDOS = float(os.getenv("HEALTH_INTERVALO_SEGUNDOS", "30"))
+
+# ================================
+# CIRCUIT BREAKER DO SUPABASE
+# ================================
+# Falhas seguidas que abrem o circuito e tempo até a próxima sonda
+SUPABASE_CB_FALHAS = int(os.getenv("SUPABASE_CB_FALHAS", "3"))
+SUPABASE_CB_ABERTO_SEGUNDOS = float(os.getenv("SUPABASE_CB_ABERTO_SEGUNDOS", "30"))
+# Sonda sem resposta após esse tempo conta como falha (reabre o circuito)
+SUPABASE_CB_SONDA_TIMEOUT = float(os.getenv("SUPABASE_CB_SONDA_TIMEOUT", "20"))
+# Espera máxima por um lote de consultas async (fan-out)
+SUPABASE_ASYNC_TIMEOUT = float(os.getenv("SUPABASE_ASYNC_TIMEOUT", "30"))
+# Últimas leituras boas servidas (obsoletas) durante indisponibilidade
+SUPABASE_ULTIMAS_LEITURAS_MAX = int(os.getenv("SUPABASE_ULTIMAS_LEITURAS_MAX", "512"))
+SUPABASE_ULTIMAS_LEITURAS_TTL = float(os.getenv("SUPABASE_ULTIMAS_LEITURAS_TTL", str(24 * 3600)))
+
+# ================================
+# COTA DO SUPABASE AUTH (governor)
+# ================================
+# Ajustar conforme Auth > Rate Limits do projeto no Supabase
+AUTH_COTA_EMAILS_POR_HORA = int(os.getenv("AUTH_COTA_EMAILS_POR_HORA", "30"))
+AUTH_COTA_LOGINS_POR_5MIN = int(os.getenv("AUTH_COTA_LOGINS_POR_5MIN", "30"))
+AUTH_COTA_GERAL_POR_5MIN = int(os.getenv("AUTH_COTA_GERAL_POR_5MIN", "30"))
+# Espera máxima na fila antes de recusar a requisição
+AUTH_ESPERA_MAX_SEGUNDOS = float(os.getenv("AUTH_ESPERA_MAX_SEGUNDOS", "5"))
+
 # ================================
 # URL DO APP STREAMLIT
 # ================================
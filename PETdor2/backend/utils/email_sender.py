@@ -2,9 +2,13 @@
 
 import smtplib
 import logging
+import queue
+import threading
+import time
+from contextlib import contextmanager
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from typing import Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 
 from backend.utils.config import (
     SMTP_SERVIDOR,
@@ -16,11 +20,171 @@ from backend.utils.config import (
 
 logger = logging.getLogger(__name__)
 
+SMTP_TIMEOUT = 20  # segundos
+SMTP_POOL_TAMANHO = 2  # conexões autenticadas mantidas abertas
+SMTP_NOOP_APOS = 15  # segundos ociosa → confirma com NOOP antes de usar
+SMTP_OCIOSA_MAX = 120  # segundos ociosa → descarta (servidores derrubam)
+
+
+# ============================================================
+#   POOL DE CONEXÕES SMTP
+# ============================================================
+
+class _ConexaoSMTP:
+    """Conexão autenticada + instante do último uso."""
+
+    def __init__(self):
+        if SMTP_USAR_SSL:
+            self.server = smtplib.SMTP_SSL(SMTP_SERVIDOR, SMTP_PORTA, timeout=SMTP_TIMEOUT)
+        else:
+            self.server = smtplib.SMTP(SMTP_SERVIDOR, SMTP_PORTA, timeout=SMTP_TIMEOUT)
+            self.server.starttls()
+
+        self.server.login(SMTP_EMAIL, SMTP_SENHA)
+        self.usada_em = time.monotonic()
+
+    def saudavel(self) -> bool:
+        ociosa = time.monotonic() - self.usada_em
+
+        if ociosa > SMTP_OCIOSA_MAX:
+            return False
+        if ociosa < SMTP_NOOP_APOS:
+            return True
+
+        try:
+            return self.server.noop()[0] == 250
+        except smtplib.SMTPException:
+            return False
+        except OSError:
+            return False
+
+    def fechar(self) -> None:
+        try:
+            self.server.quit()
+        except Exception:
+            try:
+                self.server.close()
+            except Exception:
+                pass
+
+
+class SMTPPool:
+    """
+    Mantém até `tamanho` conexões SMTP autenticadas para reuso.
+
+    STARTTLS/SSL + login são pagos uma vez por conexão, não por e-mail.
+    Conexões ociosas passam por NOOP antes do uso e são refeitas se o
+    servidor as derrubou.
+    """
+
+    def __init__(self, tamanho: int = SMTP_POOL_TAMANHO):
+        self._livres: "queue.LifoQueue[_ConexaoSMTP]" = queue.LifoQueue(maxsize=tamanho)
+
+    def _obter(self) -> _ConexaoSMTP:
+        while True:
+            try:
+                conexao = self._livres.get_nowait()
+            except queue.Empty:
+                return _ConexaoSMTP()
+
+            if conexao.saudavel():
+                return conexao
+            conexao.fechar()
+
+    def _devolver(self, conexao: _ConexaoSMTP) -> None:
+        conexao.usada_em = time.monotonic()
+        try:
+            self._livres.put_nowait(conexao)
+        except queue.Full:
+            conexao.fechar()
+
+    @contextmanager
+    def conexao(self) -> Iterator[_ConexaoSMTP]:
+        """Empresta uma conexão; em erro ela é descartada, não devolvida."""
+        conexao = self._obter()
+        try:
+            yield conexao
+        except Exception:
+            conexao.fechar()
+            raise
+        self._devolver(conexao)
+
+    def enviar_lote(self, mensagens: List[MIMEMultipart]) -> List[Tuple[bool, str]]:
+        """
+        Envia várias mensagens pela mesma sessão SMTP.
+
+        Se o servidor derrubar a conexão no meio do lote, reconecta uma
+        vez e continua da mensagem que falhou.
+        """
+        resultados: List[Tuple[bool, str]] = []
+        pendentes = list(mensagens)
+        reconectou = False
+
+        while pendentes:
+            try:
+                with self.conexao() as c:
+                    while pendentes:
+                        msg = pendentes[0]
+                        try:
+                            c.server.sendmail(SMTP_EMAIL, msg["To"], msg.as_string())
+                            resultados.append((True, "E-mail enviado com sucesso."))
+                        except (smtplib.SMTPRecipientsRefused, smtplib.SMTPDataError) as e:
+                            # Problema da mensagem, não da conexão
+                            resultados.append((False, f"Erro ao enviar e-mail: {e}"))
+                        pendentes.pop(0)
+
+            except (smtplib.SMTPServerDisconnected, OSError) as e:
+                if reconectou:
+                    resultados.extend(
+                        (False, f"Erro ao enviar e-mail: {e}") for _ in pendentes
+                    )
+                    break
+                logger.warning(f"⚠️ Conexão SMTP perdida, reconectando: {e}")
+                reconectou = True
+
+            except Exception as e:
+                resultados.extend((False, f"Erro ao enviar e-mail: {e}") for _ in pendentes)
+                break
+
+        return resultados
+
+    def fechar(self) -> None:
+        while True:
+            try:
+                self._livres.get_nowait().fechar()
+            except queue.Empty:
+                return
+
+
+_pool: Optional[SMTPPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_smtp_pool() -> SMTPPool:
+    """Pool SMTP do processo."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = SMTPPool()
+    return _pool
+
 
 # ============================================================
 #   FUNÇÃO INTERNA DE ENVIO
 # ============================================================
 
+def _montar_mensagem(destinatario: str, assunto: str, texto: str, html: str) -> MIMEMultipart:
+    msg = MIMEMultipart("alternative")
+    msg["From"] = SMTP_EMAIL
+    msg["To"] = destinatario
+    msg["Subject"] = assunto
+
+    msg.attach(MIMEText(texto, "plain"))
+    msg.attach(MIMEText(html, "html"))
+    return msg
+
+
 def _enviar_email(destinatario: str, assunto: str, texto: str, html: str) -> Tuple[bool, str]:
     """Função interna para envio de e-mails (HTML + texto)."""
 
@@ -28,40 +192,72 @@ def _enviar_email(destinatario: str, assunto: str, texto: str, html: str) -> Tup
         return False, "Endereço de e-mail do destinatário está vazio."
 
     try:
-        msg = MIMEMultipart("alternative")
-        msg["From"] = SMTP_EMAIL
-        msg["To"] = destinatario
-        msg["Subject"] = assunto
+        msg = _montar_mensagem(destinatario, assunto, texto, html)
+        sucesso, mensagem = get_smtp_pool().enviar_lote([msg])[0]
 
-        msg.attach(MIMEText(texto, "plain"))
-        msg.attach(MIMEText(html, "html"))
-
-        # Definição do servidor
-        if SMTP_USAR_SSL:
-            server = smtplib.SMTP_SSL(SMTP_SERVIDOR, SMTP_PORTA)
+        if sucesso:
+            logger.info(f"📧 Email enviado com sucesso → {destinatario}")
         else:
-            server = smtplib.SMTP(SMTP_SERVIDOR, SMTP_PORTA)
-            server.starttls()
+            logger.error(f"❌ Erro ao enviar e-mail para {destinatario}: {mensagem}")
 
-        with server:
-            server.login(SMTP_EMAIL, SMTP_SENHA)
-            server.sendmail(SMTP_EMAIL, destinatario, msg.as_string())
-
-        logger.info(f"📧 Email enviado com sucesso → {destinatario}")
-        return True, "E-mail enviado com sucesso."
+        return sucesso, mensagem
 
     except Exception as e:
         logger.error(f"❌ Erro ao enviar e-mail para {destinatario}: {e}", exc_info=True)
         return False, f"Erro ao enviar e-mail: {e}"
 
 
+def enviar_lote_emails(mensagens: List[Dict[str, str]]) -> List[Tuple[bool, str]]:
+    """
+    Envia vários e-mails numa única sessão SMTP (notificações em massa).
+
+    Args:
+        mensagens: dicts com destinatario, assunto, texto, html.
+
+    Returns:
+        (sucesso, mensagem) por e-mail, na mesma ordem.
+    """
+    validas = [m for m in mensagens if m.get("destinatario")]
+    enviados = iter(get_smtp_pool().enviar_lote([
+        _montar_mensagem(m["destinatario"], m["assunto"], m["texto"], m["html"])
+        for m in validas
+    ]))
+
+    return [
+        next(enviados) if m.get("destinatario")
+        else (False, "Endereço de e-mail do destinatário está vazio.")
+        for m in mensagens
+    ]
+
+
+def _enfileirar_email(destinatario: str, assunto: str, texto: str, html: str) -> Tuple[bool, str]:
+    """Coloca o e-mail na fila de saída; o envio SMTP ocorre em segundo plano."""
+
+    if not destinatario:
+        return False, "Endereço de e-mail do destinatário está vazio."
+
+    from backend.email.outbox import enfileirar
+
+    mensagem_id = enfileirar("smtp", {
+        "destinatario": destinatario,
+        "assunto": assunto,
+        "texto": texto,
+        "html": html,
+    })
+
+    if mensagem_id is None:
+        return False, "Erro ao enviar e-mail."
+
+    return True, "E-mail enviado com sucesso."
+
+
 # ============================================================
 #   FUNÇÕES PÚBLICAS
 # ============================================================
 
 def enviar_email_confirmacao_generico(destinatario_email: str, assunto: str, corpo_html: str, corpo_texto: str):
     """E-mail genérico usado pelo sistema."""
-    return _enviar_email(destinatario_email, assunto, corpo_texto, corpo_html)
+    return _enfileirar_email(destinatario_email, assunto, corpo_texto, corpo_html)
 
 
 def enviar_email_recuperacao_senha(destinatario_email: str, link_recuperacao: str):
@@ -87,10 +283,13 @@ def enviar_email_recuperacao_senha(destinatario_email: str, link_recuperacao: st
     </p>
     """
 
-    return _enviar_email(destinatario_email, assunto, corpo_texto, corpo_html)
+    return _enfileirar_email(destinatario_email, assunto, corpo_texto, corpo_html)
 
 
 __all__ = [
+    "SMTPPool",
+    "get_smtp_pool",
+    "enviar_lote_emails",
     "enviar_email_confirmacao_generico",
     "enviar_email_recuperacao_senha",
 ]
@@ -0,0 +1,203 @@
+# PETdor2/backend/utils/report_batch.py
+
+"""
+Exportação em lote de relatórios PDF.
+
+Renderiza muitas avaliações em paralelo (ProcessPoolExecutor, um
+processo por núcleo) e entrega:
+- "zip": um PDF por avaliação dentro de um ZIP
+- "pdf": um único PDF com todas as avaliações (mescla via pypdf;
+  sem pypdf, renderiza o relatório inteiro num só processo)
+
+Relatórios já presentes no cache de relatórios não são renderizados
+de novo. O progresso é informado por callback (concluídos, total).
+"""
+
+import importlib.util
+import logging
+import multiprocessing
+import os
+import re
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from backend.utils.report_engine import (
+    gerar_pdf_avaliacoes,
+    guardar_pdf_em_cache,
+    pdf_em_cache,
+    renderizar_relatorio,
+)
+
+logger = logging.getLogger(__name__)
+
+# ==========================================================
+# CONFIGURAÇÕES
+# ==========================================================
+
+FORMATOS_LOTE = ("zip", "pdf")
+
+# Abaixo disso o custo de despachar para outro processo não compensa
+LOTE_MINIMO_PARALELO = 4
+
+MAX_WORKERS = max((os.cpu_count() or 1) - 1, 1)
+
+Progresso = Callable[[int, int], None]
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+# ==========================================================
+# POOL DE PROCESSOS
+# ==========================================================
+
+def _get_pool() -> ProcessPoolExecutor:
+    """
+    Pool reaproveitado entre exportações (o custo de subir os processos
+    é pago uma vez). "spawn" evita herdar as threads do Streamlit.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=MAX_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def _descartar_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def _renderizar_uma(avaliacao: Dict[str, Any]) -> bytes:
+    """Executado nos processos do pool."""
+    return renderizar_relatorio([avaliacao])
+
+
+# ==========================================================
+# RENDERIZAÇÃO
+# ==========================================================
+
+def _renderizar_todas(
+    avaliacoes: Sequence[Dict[str, Any]],
+    progresso: Optional[Progresso] = None,
+) -> List[bytes]:
+    """Um PDF por avaliação, na mesma ordem da entrada."""
+    total = len(avaliacoes)
+    pdfs: List[Optional[bytes]] = [pdf_em_cache([a]) for a in avaliacoes]
+    pendentes = [i for i, pdf in enumerate(pdfs) if pdf is None]
+
+    concluidos = total - len(pendentes)
+    if progresso:
+        progresso(concluidos, total)
+
+    def concluir(i: int, pdf: bytes) -> None:
+        nonlocal concluidos
+        pdfs[i] = pdf
+        guardar_pdf_em_cache([avaliacoes[i]], pdf)
+        concluidos += 1
+        if progresso:
+            progresso(concluidos, total)
+
+    if len(pendentes) >= LOTE_MINIMO_PARALELO and MAX_WORKERS > 1:
+        try:
+            pool = _get_pool()
+            futuros = {pool.submit(_renderizar_uma, avaliacoes[i]): i for i in pendentes}
+
+            for futuro in as_completed(futuros):
+                concluir(futuros[futuro], futuro.result())
+
+            pendentes = []
+
+        except (BrokenProcessPool, OSError) as e:
+            logger.warning(f"⚠️ Pool de PDFs indisponível, renderizando em série: {e}")
+            _descartar_pool()
+            pendentes = [i for i, pdf in enumerate(pdfs) if pdf is None]
+
+    for i in pendentes:
+        concluir(i, _renderizar_uma(avaliacoes[i]))
+
+    return pdfs  # type: ignore[return-value]
+
+
+def _nome_arquivo(avaliacao: Dict[str, Any], posicao: int) -> str:
+    data = str(avaliacao.get("criado_em") or "")[:10]
+    animal = re.sub(r"[^\w-]+", "_", str(avaliacao.get("animal_nome") or "animal")).strip("_")
+    identificador = avaliacao.get("id") or posicao
+    return f"{posicao:04d}_{data}_{animal}_{identificador}.pdf"
+
+
+def _pypdf_disponivel() -> bool:
+    return importlib.util.find_spec("pypdf") is not None
+
+
+def _mesclar(pdfs: Sequence[bytes]) -> bytes:
+    from pypdf import PdfWriter
+
+    writer = PdfWriter()
+    for pdf in pdfs:
+        writer.append(BytesIO(pdf))
+
+    saida = BytesIO()
+    writer.write(saida)
+    return saida.getvalue()
+
+
+# ==========================================================
+# API
+# ==========================================================
+
+def exportar_lote(
+    avaliacoes: Sequence[Dict[str, Any]],
+    formato: str = "zip",
+    progresso: Optional[Progresso] = None,
+) -> bytes:
+    """
+    Exporta várias avaliações de uma vez.
+
+    Args:
+        avaliacoes: dicts no formato de report_engine.renderizar_relatorio.
+        formato: "zip" (um PDF por avaliação) ou "pdf" (arquivo único).
+        progresso: callback(concluidos, total).
+
+    Returns:
+        Bytes do ZIP ou do PDF.
+    """
+    if formato not in FORMATOS_LOTE:
+        raise ValueError(f"Formato inválido: {formato}")
+
+    avaliacoes = list(avaliacoes)
+
+    if formato == "pdf" and not _pypdf_disponivel():
+        # Sem pypdf não há como mesclar: relatório único, em série
+        pdf = gerar_pdf_avaliacoes(avaliacoes)
+        if progresso:
+            progresso(len(avaliacoes), len(avaliacoes))
+        return pdf
+
+    pdfs = _renderizar_todas(avaliacoes, progresso)
+
+    if formato == "pdf":
+        return _mesclar(pdfs)
+
+    buffer = BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for posicao, (avaliacao, pdf) in enumerate(zip(avaliacoes, pdfs), start=1):
+            zf.writestr(_nome_arquivo(avaliacao, posicao), pdf)
+
+    return buffer.getvalue()
+
+
+__all__ = [
+    "FORMATOS_LOTE",
+    "exportar_lote",
+]
@@ -0,0 +1,268 @@
+# PETdor2/backend/utils/report_cache.py
+
+"""
+Cache de relatórios PDF endereçado por conteúdo.
+
+A chave é o SHA-256 do payload de entrada (tipo + dados), então o mesmo
+relatório pedido de novo — download repetido, reenvio por e-mail — custa
+uma busca em vez de uma nova diagramação.
+
+Dois níveis, ambos limitados em bytes:
+- memória: LRU por processo
+- disco: arquivos em REPORT_CACHE_DIR, removidos do menos usado
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from backend.utils.config import (
+    REPORT_CACHE_MEMORIA_MB,
+    REPORT_CACHE_DISCO_MB,
+    REPORT_CACHE_DIR,
+)
+
+logger = logging.getLogger(__name__)
+
+# Mudar quando o layout dos relatórios mudar (invalida o cache inteiro)
+VERSAO_LAYOUT = "1"
+
+_MB = 1024 * 1024
+
+
+class ReportCache:
+    """Cache LRU de bytes em memória com transbordo para disco."""
+
+    def __init__(
+        self,
+        diretorio: Optional[str] = REPORT_CACHE_DIR,
+        max_bytes_memoria: int = REPORT_CACHE_MEMORIA_MB * _MB,
+        max_bytes_disco: int = REPORT_CACHE_DISCO_MB * _MB,
+    ):
+        self.diretorio = diretorio
+        self.max_bytes_memoria = max_bytes_memoria
+        self.max_bytes_disco = max_bytes_disco
+
+        self._memoria: "OrderedDict[str, bytes]" = OrderedDict()
+        self._bytes_memoria = 0
+        self._lock = threading.Lock()
+
+        self.hits_memoria = 0
+        self.hits_disco = 0
+        self.misses = 0
+
+        self._bytes_disco = 0
+        if self.diretorio and self.max_bytes_disco > 0:
+            try:
+                # PDFs trazem dados do paciente e do tutor: só o usuário
+                # do processo acessa (o chmod cobre diretório já existente)
+                os.makedirs(self.diretorio, mode=0o700, exist_ok=True)
+                os.chmod(self.diretorio, 0o700)
+                self._bytes_disco = sum(
+                    os.path.getsize(c) for c in self._arquivos_disco()
+                )
+            except OSError as e:
+                logger.warning(f"⚠️ Cache de relatórios sem disco ({self.diretorio}): {e}")
+                self.diretorio = None
+
+    # ------------------------------------------------------
+    # Chave
+    # ------------------------------------------------------
+
+    @staticmethod
+    def chave(tipo: str, payload: Any) -> str:
+        """SHA-256 de (versão do layout, tipo, payload em JSON canônico)."""
+        conteudo = json.dumps(
+            [VERSAO_LAYOUT, tipo, payload],
+            sort_keys=True,
+            default=str,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(conteudo.encode("utf-8")).hexdigest()
+
+    # ------------------------------------------------------
+    # Memória
+    # ------------------------------------------------------
+
+    def _guardar_memoria(self, chave: str, dados: bytes) -> None:
+        if len(dados) > self.max_bytes_memoria:
+            return
+
+        antigo = self._memoria.pop(chave, None)
+        if antigo is not None:
+            self._bytes_memoria -= len(antigo)
+
+        self._memoria[chave] = dados
+        self._bytes_memoria += len(dados)
+
+        while self._bytes_memoria > self.max_bytes_memoria:
+            _, removido = self._memoria.popitem(last=False)
+            self._bytes_memoria -= len(removido)
+
+    # ------------------------------------------------------
+    # Disco
+    # ------------------------------------------------------
+
+    def _caminho(self, chave: str) -> str:
+        return os.path.join(self.diretorio, f"{chave}.pdf")
+
+    def _arquivos_disco(self):
+        with os.scandir(self.diretorio) as entradas:
+            return [e.path for e in entradas if e.is_file() and e.name.endswith(".pdf")]
+
+    def _ler_disco(self, chave: str) -> Optional[bytes]:
+        if not self.diretorio:
+            return None
+
+        caminho = self._caminho(chave)
+        try:
+            with open(caminho, "rb") as f:
+                dados = f.read()
+            os.utime(caminho)  # marca como usado recentemente
+            return dados
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning(f"⚠️ Erro ao ler relatório em cache: {e}")
+            return None
+
+    def _gravar_disco(self, chave: str, dados: bytes) -> None:
+        if not self.diretorio or len(dados) > self.max_bytes_disco:
+            return
+
+        caminho = self._caminho(chave)
+        if os.path.exists(caminho):
+            return
+
+        temporario = f"{caminho}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            fd = os.open(temporario, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "wb") as f:
+                f.write(dados)
+            os.replace(temporario, caminho)  # atômico entre workers
+        except OSError as e:
+            logger.warning(f"⚠️ Erro ao gravar relatório em cache: {e}")
+            return
+
+        self._bytes_disco += len(dados)
+        if self._bytes_disco > self.max_bytes_disco:
+            self._reduzir_disco()
+
+    def _reduzir_disco(self) -> None:
+        """Remove os arquivos menos usados até caber em 90% do limite."""
+        try:
+            arquivos = []
+            for caminho in self._arquivos_disco():
+                info = os.stat(caminho)
+                arquivos.append((info.st_mtime, info.st_size, caminho))
+        except OSError as e:
+            logger.warning(f"⚠️ Erro ao listar cache de relatórios: {e}")
+            return
+
+        arquivos.sort()
+        total = sum(tamanho for _, tamanho, _ in arquivos)
+        alvo = self.max_bytes_disco * 0.9
+
+        for _, tamanho, caminho in arquivos:
+            if total <= alvo:
+                break
+            try:
+                os.remove(caminho)
+                total -= tamanho
+            except OSError:
+                pass
+
+        self._bytes_disco = total
+
+    # ------------------------------------------------------
+    # API
+    # ------------------------------------------------------
+
+    def obter(self, chave: str) -> Optional[bytes]:
+        with self._lock:
+            dados = self._memoria.get(chave)
+            if dados is not None:
+                self._memoria.move_to_end(chave)
+                self.hits_memoria += 1
+                return dados
+
+            dados = self._ler_disco(chave)
+            if dados is not None:
+                self._guardar_memoria(chave, dados)
+                self.hits_disco += 1
+                return dados
+
+            self.misses += 1
+            return None
+
+    def salvar(self, chave: str, dados: bytes) -> None:
+        with self._lock:
+            self._guardar_memoria(chave, dados)
+            self._gravar_disco(chave, dados)
+
+    def obter_ou_gerar(self, tipo: str, payload: Any, gerar: Callable[[], bytes]) -> bytes:
+        """Retorna o relatório em cache ou o gera (e guarda) com `gerar()`."""
+        chave = self.chave(tipo, payload)
+
+        dados = self.obter(chave)
+        if dados is not None:
+            return dados
+
+        inicio = time.perf_counter()
+        dados = gerar()
+        logger.debug(
+            f"Relatório gerado | Tipo={tipo} | {len(dados)} bytes | "
+            f"{(time.perf_counter() - inicio) * 1000:.0f} ms"
+        )
+
+        self.salvar(chave, dados)
+        return dados
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._memoria.clear()
+            self._bytes_memoria = 0
+
+            if self.diretorio:
+                for caminho in self._arquivos_disco():
+                    try:
+                        os.remove(caminho)
+                    except OSError:
+                        pass
+                self._bytes_disco = 0
+
+    def estatisticas(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entradas_memoria": len(self._memoria),
+                "bytes_memoria": self._bytes_memoria,
+                "bytes_disco": self._bytes_disco,
+                "hits_memoria": self.hits_memoria,
+                "hits_disco": self.hits_disco,
+                "misses": self.misses,
+            }
+
+
+_cache: Optional[ReportCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_report_cache() -> ReportCache:
+    """Cache de relatórios do processo (compartilhado entre sessões)."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ReportCache()
+    return _cache
+
+
+__all__ = [
+    "ReportCache",
+    "get_report_cache",
+]
@@ -0,0 +1,283 @@
+# PETdor2/backend/utils/report_engine.py
+
+"""
+Motor único de relatórios PDF (reportlab).
+
+- Renderiza direto para memória (BytesIO), sem arquivos temporários
+- Estilos e logo carregados uma vez por processo
+- Um relatório pode conter várias avaliações (uma por página)
+- gerar_pdf_avaliacoes() passa pelo cache de relatórios (report_cache)
+
+Usado pelo histórico, pelo envio por e-mail e por pdf_generator.
+"""
+
+import logging
+import os
+from datetime import datetime
+from functools import lru_cache
+from io import BytesIO
+from typing import Any, Dict, List, Optional, Sequence
+
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import mm
+from reportlab.lib.utils import ImageReader
+from reportlab.platypus import (
+    PageBreak,
+    Paragraph,
+    SimpleDocTemplate,
+    Spacer,
+    Table,
+    TableStyle,
+)
+from xml.sax.saxutils import escape
+
+from backend.utils.report_cache import get_report_cache
+
+logger = logging.getLogger(__name__)
+
+# ==========================================================
+# CONFIGURAÇÕES
+# ==========================================================
+
+LOGO_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "frontend",
+    "assets",
+    "PETDOR.jpg",
+)
+
+TITULO_PADRAO = "PETDor – Relatório de Avaliação de Dor"
+MARGEM = 40
+ALTURA_LOGO = 14 * mm
+
+
+# ==========================================================
+# RECURSOS (carregados uma vez por processo)
+# ==========================================================
+
+@lru_cache(maxsize=1)
+def _estilos() -> Dict[str, ParagraphStyle]:
+    base = getSampleStyleSheet()
+    return {
+        "titulo": base["Title"],
+        "secao": base["Heading2"],
+        "normal": base["Normal"],
+        "rodape": ParagraphStyle(
+            "rodape", parent=base["Normal"], fontSize=8, alignment=TA_CENTER
+        ),
+    }
+
+
+@lru_cache(maxsize=1)
+def _logo() -> Optional[ImageReader]:
+    """Logo decodificado uma vez; None se o arquivo não existir."""
+    if not os.path.exists(LOGO_PATH):
+        logger.warning(f"⚠️ Logo não encontrado: {LOGO_PATH}")
+        return None
+
+    try:
+        return ImageReader(LOGO_PATH)
+    except Exception as e:
+        logger.warning(f"⚠️ Erro ao carregar logo: {e}")
+        return None
+
+
+def _desenhar_pagina(canvas, doc) -> None:
+    """Cabeçalho (logo) e rodapé (nº da página) de todas as páginas."""
+    canvas.saveState()
+    largura, altura = doc.pagesize
+
+    logo = _logo()
+    if logo is not None:
+        lw, lh = logo.getSize()
+        canvas.drawImage(
+            logo,
+            MARGEM,
+            altura - MARGEM / 2 - ALTURA_LOGO,
+            width=ALTURA_LOGO * lw / lh,
+            height=ALTURA_LOGO,
+            preserveAspectRatio=True,
+            mask="auto",
+        )
+
+    canvas.setFont("Helvetica-Oblique", 8)
+    canvas.drawCentredString(largura / 2, MARGEM / 2, f"Página {doc.page}")
+    canvas.restoreState()
+
+
+# ==========================================================
+# CONTEÚDO
+# ==========================================================
+
+def texto_pergunta(especie_id: str, pergunta_id: str) -> str:
+    """Texto da pergunta via índice do registro de espécies."""
+    from backend.especies.index import buscar_pergunta
+
+    pergunta = buscar_pergunta(especie_id, pergunta_id)
+    if pergunta:
+        return pergunta.texto
+    return str(pergunta_id).replace("_", " ").title()
+
+
+def _formatar_data(valor: Any) -> str:
+    if not valor:
+        return "—"
+    try:
+        if not isinstance(valor, datetime):
+            valor = datetime.fromisoformat(str(valor).replace("Z", "+00:00"))
+        return valor.strftime("%d/%m/%Y %H:%M")
+    except ValueError:
+        return str(valor)
+
+
+def _p(texto: Any, estilo: ParagraphStyle) -> Paragraph:
+    return Paragraph(escape(str(texto)), estilo)
+
+
+def _elementos_avaliacao(avaliacao: Dict[str, Any]) -> List[Any]:
+    e = _estilos()
+    especie = avaliacao.get("animal_especie", "—")
+
+    dados = [
+        ["Animal", avaliacao.get("animal_nome", "—")],
+        ["Espécie", especie],
+        ["Data", _formatar_data(avaliacao.get("criado_em"))],
+    ]
+    for campo, rotulo in (("tutor", "Tutor"), ("veterinario", "Veterinário(a)")):
+        if avaliacao.get(campo):
+            dados.append([rotulo, avaliacao[campo]])
+
+    if avaliacao.get("pontuacao_total") is not None:
+        dados.append(["Pontuação Total", avaliacao["pontuacao_total"]])
+    if avaliacao.get("pontuacao_percentual") is not None:
+        dados.append(["Percentual", f"{avaliacao['pontuacao_percentual']}%"])
+    if avaliacao.get("resultado"):
+        dados.append(["Resultado", avaliacao["resultado"]])
+
+    tabela = Table(
+        [[_p(r, e["normal"]), _p(v, e["normal"])] for r, v in dados],
+        colWidths=[45 * mm, None],
+    )
+    tabela.setStyle(TableStyle([
+        ("BACKGROUND", (0, 0), (0, -1), colors.whitesmoke),
+        ("GRID", (0, 0), (-1, -1), 0.25, colors.lightgrey),
+        ("VALIGN", (0, 0), (-1, -1), "TOP"),
+    ]))
+
+    elementos: List[Any] = [tabela, Spacer(1, 12)]
+
+    respostas = avaliacao.get("respostas") or {}
+    if respostas:
+        elementos.append(Paragraph("Respostas", e["secao"]))
+        for pergunta_id, resposta in respostas.items():
+            elementos.append(
+                Paragraph(
+                    f"- {escape(texto_pergunta(especie, pergunta_id))}: "
+                    f"<b>{escape(str(resposta))}</b>",
+                    e["normal"],
+                )
+            )
+
+    if "observacoes" in avaliacao:
+        elementos.append(Spacer(1, 12))
+        elementos.append(Paragraph("Observações", e["secao"]))
+        elementos.append(_p(avaliacao.get("observacoes") or "Sem observações.", e["normal"]))
+
+    return elementos
+
+
+# ==========================================================
+# API
+# ==========================================================
+
+def renderizar_relatorio(
+    avaliacoes: Sequence[Dict[str, Any]],
+    titulo: str = TITULO_PADRAO,
+) -> bytes:
+    """
+    Renderiza uma ou mais avaliações num único PDF (uma por página).
+
+    Cada avaliação é um dict com animal_nome, animal_especie, criado_em,
+    pontuacao_total e respostas; opcionais: pontuacao_percentual, tutor,
+    veterinario, resultado, observacoes.
+    """
+    e = _estilos()
+    buffer = BytesIO()
+
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=A4,
+        rightMargin=MARGEM,
+        leftMargin=MARGEM,
+        topMargin=MARGEM + ALTURA_LOGO,
+        bottomMargin=MARGEM,
+        title=titulo,
+    )
+
+    elementos: List[Any] = []
+    for i, avaliacao in enumerate(avaliacoes):
+        if i:
+            elementos.append(PageBreak())
+        elementos.append(_p(titulo, e["titulo"]))
+        elementos.append(Spacer(1, 12))
+        elementos.extend(_elementos_avaliacao(avaliacao))
+
+    if not elementos:
+        elementos.append(_p("Nenhuma avaliação.", e["normal"]))
+
+    elementos.append(Spacer(1, 18))
+    elementos.append(
+        _p(f"Gerado em: {datetime.now().strftime('%d/%m/%Y %H:%M')}", e["rodape"])
+    )
+
+    doc.build(elementos, onFirstPage=_desenhar_pagina, onLaterPages=_desenhar_pagina)
+    return buffer.getvalue()
+
+
+def _payload(avaliacoes: Sequence[Dict[str, Any]], titulo: str) -> Dict[str, Any]:
+    return {"titulo": titulo, "avaliacoes": list(avaliacoes)}
+
+
+def gerar_pdf_avaliacoes(
+    avaliacoes: Sequence[Dict[str, Any]],
+    titulo: str = TITULO_PADRAO,
+) -> bytes:
+    """renderizar_relatorio() com cache por conteúdo (memória + disco)."""
+    avaliacoes = list(avaliacoes)
+    return get_report_cache().obter_ou_gerar(
+        "relatorio",
+        _payload(avaliacoes, titulo),
+        lambda: renderizar_relatorio(avaliacoes, titulo),
+    )
+
+
+def pdf_em_cache(
+    avaliacoes: Sequence[Dict[str, Any]],
+    titulo: str = TITULO_PADRAO,
+) -> Optional[bytes]:
+    """PDF já gerado para estas avaliações, sem renderizar."""
+    cache = get_report_cache()
+    return cache.obter(cache.chave("relatorio", _payload(avaliacoes, titulo)))
+
+
+def guardar_pdf_em_cache(
+    avaliacoes: Sequence[Dict[str, Any]],
+    pdf: bytes,
+    titulo: str = TITULO_PADRAO,
+) -> None:
+    """Registra um PDF renderizado fora deste processo (ex.: pool)."""
+    cache = get_report_cache()
+    cache.salvar(cache.chave("relatorio", _payload(avaliacoes, titulo)), pdf)
+
+
+__all__ = [
+    "TITULO_PADRAO",
+    "texto_pergunta",
+    "renderizar_relatorio",
+    "gerar_pdf_avaliacoes",
+    "pdf_em_cache",
+    "guardar_pdf_em_cache",
+]
@@ -0,0 +1,97 @@
+# PETdor2/backend/utils/report_engine_bench.py
+
+"""
+Benchmark de latência do motor de relatórios.
+
+Mede, por relatório:
+- primeira renderização (inclui carga de estilos/logo)
+- renderização a quente (recursos já carregados)
+- relatório com várias avaliações
+- leitura pelo cache de relatórios
+
+Uso (a partir de PETdor2/):
+    python -m backend.utils.report_engine_bench
+    python -m backend.utils.report_engine_bench --repeticoes 50 --avaliacoes 20
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+from backend.utils import report_engine
+from backend.utils.report_cache import ReportCache
+
+
+def _avaliacao_exemplo(i: int) -> Dict[str, Any]:
+    return {
+        "id": f"bench-{i}",
+        "animal_nome": f"Animal {i}",
+        "animal_especie": "cao",
+        "criado_em": "2025-01-01T10:00:00",
+        "pontuacao_total": i % 30,
+        "pontuacao_percentual": round(i % 30 / 30 * 100, 2),
+        "respostas": {f"pergunta_{j}": "Leve" for j in range(20)},
+    }
+
+
+def _medir(fn, repeticoes: int) -> List[float]:
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        fn()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return tempos
+
+
+def executar(repeticoes: int = 20, n_avaliacoes: int = 10) -> Dict[str, Dict[str, float]]:
+    """Latências em ms: {cenario: {p50, p95, max}}."""
+    avaliacao = _avaliacao_exemplo(0)
+    varias = [_avaliacao_exemplo(i) for i in range(n_avaliacoes)]
+
+    report_engine._estilos.cache_clear()
+    report_engine._logo.cache_clear()
+
+    cenarios = {
+        "primeira": _medir(lambda: report_engine.renderizar_relatorio([avaliacao]), 1),
+        "a_quente": _medir(lambda: report_engine.renderizar_relatorio([avaliacao]), repeticoes),
+        f"{n_avaliacoes}_avaliacoes": _medir(
+            lambda: report_engine.renderizar_relatorio(varias), max(repeticoes // 4, 1)
+        ),
+    }
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        cache = ReportCache(diretorio)
+        cache.obter_ou_gerar("bench", avaliacao, lambda: report_engine.renderizar_relatorio([avaliacao]))
+        cenarios["cache"] = _medir(
+            lambda: cache.obter_ou_gerar("bench", avaliacao, lambda: b""), repeticoes
+        )
+
+    resultado = {}
+    for nome, tempos in cenarios.items():
+        tempos = sorted(tempos)
+        resultado[nome] = {
+            "p50": statistics.median(tempos),
+            "p95": tempos[min(int(len(tempos) * 0.95), len(tempos) - 1)],
+            "max": tempos[-1],
+        }
+    return resultado
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Latência por relatório PDF.")
+    parser.add_argument("--repeticoes", type=int, default=20)
+    parser.add_argument("--avaliacoes", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    resultado = executar(args.repeticoes, args.avaliacoes)
+
+    print(f"{'cenário':>16} | {'p50 (ms)':>9} | {'p95 (ms)':>9} | {'max (ms)':>9}")
+    print("-" * 52)
+    for nome, r in resultado.items():
+        print(f"{nome:>16} | {r['p50']:>9.2f} | {r['p95']:>9.2f} | {r['max']:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+import streamlit as st
+
+from backend.database import e_leitura_obsoleta
+
+
+# ==========================================================
+# DADOS OBSOLETOS (Supabase indisponível)
+# ==========================================================
+def aviso_dados_obsoletos(dados) -> None:
+    """Avisa quando a lista veio da última leitura boa, não do banco."""
+    if not e_leitura_obsoleta(dados):
+        return
+
+    minutos = max(dados.idade_segundos // 60, 1)
+    st.warning(
+        f"⚠️ Servidor indisponível no momento. Exibindo dados salvos há "
+        f"{minutos} min; novas alterações podem falhar até a conexão voltar."
+    )
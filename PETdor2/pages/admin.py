@@ -7,14 +7,41 @@ import streamlit as st
 import pandas as pd
 import logging
 from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict
 
 from backend.database import (
-    supabase_table_select,
     supabase_table_update,
+    agregar_avaliacoes,
 )
+from backend.database.async_client import (
+    async_table_count,
+    async_table_iter,
+    em_thread,
+    executar_em_paralelo,
+)
+from backend.auth.auth_governor import obter_folga
+from backend.database.health import status_backend, historico_saude, verificar_backend_agora
+from backend.database.circuit_breaker import estado_circuito
+from backend.email.outbox import status_outbox, listar_mensagens, reprocessar_falhas
+from backend.auth.user import obter_usuario_atual, invalidar_perfil_usuario
 
 logger = logging.getLogger(__name__)
 
+# Teto de linhas por listagem (evita carregar tabelas inteiras a cada rerun)
+ADMIN_LIMITE_LINHAS = 2000
+
+# Avaliações exibidas na tabela (as métricas vêm da agregação no banco)
+ADMIN_AVALIACOES_RECENTES = 200
+
+SECOES_ADMIN = ["👥 Usuários", "🐾 Animais", "📊 Avaliações", "⚙️ Sistema"]
+
+AGRUPAMENTOS_AVALIACOES = {
+    "Sem agrupamento": None,
+    "Espécie": "especie",
+    "Dia": "dia",
+    "Avaliador": "avaliador",
+}
+
 # ============================================================
 # 🔐 CONTROLE DE ACESSO
 # ============================================================
@@ -26,25 +53,145 @@ def is_admin(user_data: dict) -> bool:
 # 📦 FUNÇÕES DE DADOS
 # ============================================================
 
-def listar_usuarios() -> list:
-    return supabase_table_select(
-        table="usuarios",
-        select="id, nome, email, tipo_usuario, pais, email_confirmado, ativo, is_admin, criado_em"
-    ) or []
+# Listagens do painel: mais recentes primeiro (keyset por criado_em)
+CONSULTAS_ADMIN = {
+    "usuarios": {
+        "table": "usuarios",
+        "select": "id, nome, email, tipo_usuario, pais, email_confirmado, ativo, is_admin, criado_em",
+    },
+    "animais": {
+        "table": "animais",
+        "select": "id, nome, especie, raca, tutor_id, ativo, criado_em",
+    },
+    "avaliacoes": {
+        "table": "avaliacoes_dor",
+        "select": "id, animal_id, avaliador_id, pontuacao_total, nivel_dor, criado_em",
+    },
+}
+
+
+def _listar(nome: str, limite: int) -> Awaitable[list]:
+    """
+    Corrotina da listagem, para o fan-out. Leitura incompleta levanta
+    LeituraIncompleta, que executar_em_paralelo transforma em None:
+    lista parcial nunca entra no cache da seção.
+    """
+    return async_table_iter(
+        **CONSULTAS_ADMIN[nome],
+        cursor="criado_em",
+        desc=True,
+        max_rows=limite,
+    )
+
+
+def listar_usuarios(limite: int = ADMIN_LIMITE_LINHAS) -> Awaitable[list]:
+    return _listar("usuarios", limite)
+
+
+def listar_animais(limite: int = ADMIN_LIMITE_LINHAS) -> Awaitable[list]:
+    return _listar("animais", limite)
+
 
+def listar_avaliacoes(limite: int = ADMIN_LIMITE_LINHAS) -> Awaitable[list]:
+    return _listar("avaliacoes", limite)
 
-def listar_animais() -> list:
-    return supabase_table_select(
-        table="animais",
-        select="id, nome, especie, raca, tutor_id, ativo, criado_em"
-    ) or []
 
+def agregar_avaliacoes_atual(agrupar_por=None):
+    """
+    Agregação sem o cache de consultas da sessão: o painel já guarda
+    a seção (dados_secao), e "🔄 Atualizar" precisa do valor atual.
+    """
+    return agregar_avaliacoes(agrupar_por=agrupar_por, cache_ttl=0)
 
-def listar_avaliacoes() -> list:
-    return supabase_table_select(
-        table="avaliacoes_dor",
-        select="id, animal_id, avaliador_id, pontuacao_total, nivel_dor, criado_em"
-    ) or []
+
+# ============================================================
+# 🗂️ DADOS POR SEÇÃO (carregados só quando a seção é aberta)
+# ============================================================
+
+CHAVE_DADOS_ADMIN = "_admin_dados_secao"
+
+# Depois disso a seção recarrega sozinha ao ser reaberta
+ADMIN_DADOS_TTL = 300  # segundos
+
+
+def _guardado(cache: dict, nome: str, agora: datetime) -> bool:
+    item = cache.get(nome)
+    return item is not None and (agora - item["carregado_em"]).total_seconds() <= ADMIN_DADOS_TTL
+
+
+def dados_secao(nome: str, carregar):
+    """
+    Dados da seção guardados na sessão; `carregar()` só roda na
+    primeira abertura, após ADMIN_DADOS_TTL ou após invalidar_secao().
+    Falhas (None) não são guardadas.
+    """
+    cache = st.session_state.setdefault(CHAVE_DADOS_ADMIN, {})
+    agora = datetime.now()
+
+    if _guardado(cache, nome, agora):
+        return cache[nome]["dados"]
+
+    dados = carregar()
+    if dados is not None:
+        cache[nome] = {"dados": dados, "carregado_em": agora}
+    return dados
+
+
+def dados_secoes(cargas: Dict[str, Callable[[], Awaitable[Any]]]) -> Dict[str, Any]:
+    """
+    Como dados_secao, para as várias consultas de uma seção: as que não
+    estão guardadas saem juntas (executar_em_paralelo), então abrir a
+    seção custa max(consulta), não a soma. Cada carga cria a corrotina
+    e só é chamada se for preciso carregar.
+    """
+    cache = st.session_state.setdefault(CHAVE_DADOS_ADMIN, {})
+    agora = datetime.now()
+
+    dados = {nome: cache[nome]["dados"] for nome in cargas if _guardado(cache, nome, agora)}
+    pendentes = {nome: carregar() for nome, carregar in cargas.items() if nome not in dados}
+
+    for nome, valor in executar_em_paralelo(pendentes).items():
+        if valor is not None:
+            cache[nome] = {"dados": valor, "carregado_em": agora}
+        dados[nome] = valor
+
+    return dados
+
+
+def invalidar_secao(*nomes: str) -> None:
+    """Sem nomes, descarta todas as seções."""
+    cache = st.session_state.get(CHAVE_DADOS_ADMIN, {})
+    for nome in nomes or list(cache):
+        cache.pop(nome, None)
+
+
+def _barra_secao(*nomes: str) -> None:
+    """Horário da carga + botão de atualizar as seções informadas."""
+    cache = st.session_state.get(CHAVE_DADOS_ADMIN, {})
+    carregados = [cache[n]["carregado_em"] for n in nomes if n in cache]
+
+    col_info, col_botao = st.columns([4, 1])
+    if carregados:
+        col_info.caption(f"Dados carregados às {min(carregados).strftime('%H:%M:%S')}")
+
+    if col_botao.button("🔄 Atualizar", key=f"atualizar_{nomes[0]}"):
+        invalidar_secao(*nomes)
+        st.rerun()
+
+
+def _metrica_total(rotulo: str, total, linhas: list) -> None:
+    """Total exato (count) ou, se indisponível, a amostra limitada."""
+    if total is not None:
+        st.metric(rotulo, total)
+    elif len(linhas) >= ADMIN_LIMITE_LINHAS:
+        st.metric(f"{rotulo} (amostra)", f"{len(linhas)}+")
+    else:
+        st.metric(rotulo, len(linhas))
+
+
+def _aviso_limite(linhas: list) -> None:
+    if len(linhas) >= ADMIN_LIMITE_LINHAS:
+        st.caption(f"Exibindo os {ADMIN_LIMITE_LINHAS} registros mais recentes.")
 
 # ============================================================
 # 🖥️ RENDERIZAÇÃO
@@ -53,7 +200,8 @@ def listar_avaliacoes() -> list:
 def render():
     st.title("🔐 Painel Administrativo — PETdor")
 
-    user_data = st.session_state.get("user_data")
+    # Perfil cacheado na sessão (revalidado a cada PERFIL_CACHE_TTL)
+    user_data = obter_usuario_atual() if st.session_state.get("user_data") else None
 
     if not is_admin(user_data):
         st.error("❌ Acesso restrito a administradores.")
@@ -62,23 +210,34 @@ def render():
     st.success(f"✅ Bem-vindo, **{user_data.get('nome', 'Administrador')}**")
     st.divider()
 
-    tab_usuarios, tab_animais, tab_avaliacoes, tab_sistema = st.tabs([
-        "👥 Usuários",
-        "🐾 Animais",
-        "📊 Avaliações",
-        "⚙️ Sistema"
-    ])
+    # st.tabs executa o corpo de todas as abas; com o seletor só a
+    # seção visível roda (e consulta o banco)
+    secao = st.radio(
+        "Seção",
+        SECOES_ADMIN,
+        horizontal=True,
+        key="admin_secao",
+        label_visibility="collapsed",
+    )
 
     # ========================================================
     # 👥 USUÁRIOS
     # ========================================================
-    with tab_usuarios:
-        usuarios = listar_usuarios()
-
-        if not usuarios:
+    if secao == "👥 Usuários":
+        dados = dados_secoes({
+            "usuarios": listar_usuarios,
+            "usuarios_total": lambda: async_table_count("usuarios"),
+        })
+        usuarios, total_usuarios = dados["usuarios"], dados["usuarios_total"]
+        _barra_secao("usuarios", "usuarios_total")
+
+        if usuarios is None:
+            st.error("Erro ao carregar usuários. Tente 🔄 Atualizar.")
+        elif not usuarios:
             st.info("Nenhum usuário cadastrado.")
         else:
-            st.metric("Total de Usuários", len(usuarios))
+            _metrica_total("Total de Usuários", total_usuarios, usuarios)
+            _aviso_limite(usuarios)
             st.divider()
 
             tipos_validos = ["tutor", "veterinario", "clinica", "admin"]
@@ -123,6 +282,9 @@ def render():
                             )
 
                             if atualizado is not None:
+                                if uid == user_data.get("id"):
+                                    invalidar_perfil_usuario()
+                                invalidar_secao("usuarios", "usuarios_total")
                                 st.success("Usuário atualizado com sucesso.")
                                 st.rerun()
                             else:
@@ -141,6 +303,9 @@ def render():
                             )
 
                             if atualizado is not None:
+                                if uid == user_data.get("id"):
+                                    invalidar_perfil_usuario()
+                                invalidar_secao("usuarios", "usuarios_total")
                                 st.success("Status atualizado.")
                                 st.rerun()
                             else:
@@ -149,45 +314,159 @@ def render():
     # ========================================================
     # 🐾 ANIMAIS
     # ========================================================
-    with tab_animais:
-        animais = listar_animais()
-
-        if not animais:
+    elif secao == "🐾 Animais":
+        dados = dados_secoes({
+            "animais": listar_animais,
+            "animais_total": lambda: async_table_count("animais"),
+        })
+        animais, total_animais = dados["animais"], dados["animais_total"]
+        _barra_secao("animais", "animais_total")
+
+        if animais is None:
+            st.error("Erro ao carregar animais. Tente 🔄 Atualizar.")
+        elif not animais:
             st.info("Nenhum animal cadastrado.")
         else:
-            st.metric("Total de Animais", len(animais))
+            _metrica_total("Total de Animais", total_animais, animais)
+            _aviso_limite(animais)
             st.dataframe(pd.DataFrame(animais), use_container_width=True)
 
     # ========================================================
     # 📊 AVALIAÇÕES
     # ========================================================
-    with tab_avaliacoes:
-        avaliacoes = listar_avaliacoes()
-
-        if not avaliacoes:
+    elif secao == "📊 Avaliações":
+        dados = dados_secoes({
+            "avaliacoes_resumo": lambda: em_thread(agregar_avaliacoes_atual),
+            "avaliacoes_recentes": lambda: listar_avaliacoes(limite=ADMIN_AVALIACOES_RECENTES),
+        })
+        resumo, recentes = dados["avaliacoes_resumo"], dados["avaliacoes_recentes"]
+        _barra_secao(
+            "avaliacoes_resumo",
+            "avaliacoes_recentes",
+            *(f"avaliacoes_{g}" for g in AGRUPAMENTOS_AVALIACOES.values() if g),
+        )
+
+        if resumo is None:
+            st.error("Erro ao calcular estatísticas das avaliações.")
+        elif not resumo:
             st.info("Nenhuma avaliação registrada.")
         else:
-            df = pd.DataFrame(avaliacoes)
-            st.metric("Total de Avaliações", len(df))
+            geral = resumo[0]
 
-            if "pontuacao_total" in df.columns:
-                st.metric("Dor Média", f"{df['pontuacao_total'].mean():.1f}")
+            col1, col2, col3, col4 = st.columns(4)
+            col1.metric("Total de Avaliações", geral["total"])
+            col2.metric("Dor Média", f"{geral['media']:.1f}")
+            col3.metric("Mediana (p50)", f"{geral['p50']:.1f}")
+            col4.metric("p90", f"{geral['p90']:.1f}")
 
-            st.dataframe(df, use_container_width=True)
+            st.divider()
+
+            rotulo = st.selectbox(
+                "Agrupar por",
+                list(AGRUPAMENTOS_AVALIACOES.keys()),
+                key="admin_agrupar_avaliacoes",
+            )
+            agrupar_por = AGRUPAMENTOS_AVALIACOES[rotulo]
+
+            if agrupar_por:
+                grupos = dados_secao(
+                    f"avaliacoes_{agrupar_por}",
+                    lambda: agregar_avaliacoes_atual(agrupar_por),
+                )
+                if grupos is None:
+                    st.error("Erro ao agrupar as avaliações.")
+                elif grupos:
+                    st.dataframe(pd.DataFrame(grupos), use_container_width=True)
+
+            st.subheader(f"🕒 {ADMIN_AVALIACOES_RECENTES} avaliações mais recentes")
+            if recentes is None:
+                st.error("Erro ao carregar as avaliações recentes.")
+            else:
+                st.dataframe(pd.DataFrame(recentes), use_container_width=True)
 
     # ========================================================
     # ⚙️ SISTEMA
     # ========================================================
-    with tab_sistema:
+    else:
         st.info("📦 **PETdor 2.0**")
         st.info(f"🕒 {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}")
 
+        st.subheader("🩺 Saúde do Supabase")
         if st.button("🔄 Testar conexão com Supabase"):
-            teste = supabase_table_select("usuarios", limit=1)
-            if teste is not None:
+            verificar_backend_agora()
+
+        saude = status_backend()
+        if saude["online"] is None:
+            st.info("Primeira verificação em andamento...")
+        else:
+            if saude["online"]:
                 st.success("Conexão ativa ✅")
             else:
-                st.error("Falha na conexão ❌")
+                st.error(f"Falha na conexão ❌ ({saude['erro']})")
+
+            c1, c2, c3 = st.columns(3)
+            c1.metric("Latência", f"{saude['latencia_ms']:.0f} ms")
+            c2.metric("Disponibilidade", f"{saude['disponibilidade']}%")
+            c3.metric("Verificado há", f"{saude['verificado_ha_segundos']}s")
+
+            historico = historico_saude()
+            if len(historico) > 1:
+                df_saude = pd.DataFrame(historico)
+                df_saude["momento"] = pd.to_datetime(df_saude["momento"], unit="s")
+                st.line_chart(df_saude.set_index("momento")["latencia_ms"])
+
+        circuito = estado_circuito()
+        c1, c2, c3 = st.columns(3)
+        c1.metric("Circuito", circuito["estado"].replace("_", "-"))
+        c2.metric("Falhas seguidas", circuito["falhas_consecutivas"])
+        c3.metric("Leituras guardadas", circuito["leituras_guardadas"])
+        if circuito["estado"] != "fechado":
+            st.warning(
+                f"⛔ Supabase isolado: {circuito['rejeitadas']} chamada(s) recusada(s); "
+                f"próxima sonda em {circuito['sonda_em']}s."
+            )
+
+        st.subheader("🔐 Cota do Supabase Auth (este servidor)")
+        folga = obter_folga()
+        cols = st.columns(len(folga))
+        for col, (categoria, info) in zip(cols, folga.items()):
+            col.metric(
+                categoria.capitalize(),
+                f"{info['disponiveis']}/{info['capacidade']}",
+                f"{info['percentual']}% livre",
+            )
+            if info["cooldown_segundos"]:
+                col.warning(f"⏱️ Cooldown: {info['cooldown_segundos']}s")
+            if info["na_fila"] or info["recusadas"]:
+                col.caption(f"Na fila: {info['na_fila']} · Recusadas: {info['recusadas']}")
+
+        st.subheader("📮 Fila de e-mails")
+        try:
+            fila = status_outbox()
+        except Exception as e:
+            logger.error(f"Erro ao consultar outbox: {e}")
+            fila = None
+
+        if fila is None:
+            st.warning("Fila de e-mails indisponível.")
+        else:
+            contagem = fila["contagem"]
+            c1, c2, c3, c4 = st.columns(4)
+            c1.metric("Pendentes", contagem["pendente"])
+            c2.metric("Enviando", contagem["enviando"])
+            c3.metric("Enviados", contagem["enviado"])
+            c4.metric("Falharam", contagem["falhou"])
+
+            if fila["pendente_mais_antiga_segundos"]:
+                st.caption(f"Pendente mais antiga: {fila['pendente_mais_antiga_segundos']}s")
+
+            if contagem["falhou"]:
+                st.dataframe(
+                    pd.DataFrame(listar_mensagens(status="falhou", limite=20)),
+                    use_container_width=True,
+                )
+                if st.button("🔁 Reenviar e-mails com falha"):
+                    st.success(f"{reprocessar_falhas()} e-mail(s) recolocado(s) na fila.")
 
 
 # ============================================================
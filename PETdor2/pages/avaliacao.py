@@ -10,12 +10,14 @@ from typing import Dict, Any, List
 
 from backend.database import (
     supabase_table_select,
+    QUERY_CACHE_TTL,
     supabase_table_insert,
 )
 from backend.especies.index import (
     buscar_especie_por_id,
-    get_escala_labels,
+    obter_plano_pontuacao,
 )
+from frontend.components.avisos import aviso_dados_obsoletos
 
 logger = logging.getLogger(__name__)
 
@@ -32,6 +34,8 @@ def carregar_animais_do_tutor(tutor_id: str) -> List[Dict[str, Any]]:
                 "ativo": True,
             },
             order="nome.asc",
+            cache_ttl=QUERY_CACHE_TTL,
+            permitir_obsoleta=True,
         ) or []
     except Exception as e:
         logger.error(
@@ -49,23 +53,16 @@ def salvar_avaliacao(
     animal_id: str,
     avaliador_id: str,
     respostas: Dict[str, Any],
-    pontuacao_total: int,
+    resultado: Dict[str, Any],
 ) -> bool:
-    try:
-        # ----------------------------------------------------
-        # 🔢 Cálculo da pontuação percentual
-        # ----------------------------------------------------
-        total_perguntas = len(respostas)
-        max_por_pergunta = 7  # escala 0–7
+    """
+    Salva a avaliação já pontuada.
 
-        if total_perguntas == 0:
-            pontuacao_percentual = 0.0
-        else:
-            pontuacao_maxima = total_perguntas * max_por_pergunta
-            pontuacao_percentual = round(
-                (pontuacao_total / pontuacao_maxima) * 100,
-                2
-            )
+    `resultado` é o retorno de `PlanoPontuacao.score(respostas)`.
+    """
+    try:
+        pontuacao_total = resultado["total"]
+        pontuacao_percentual = resultado["percentual"]
 
         # ----------------------------------------------------
         # 📤 Insert no Supabase
@@ -98,6 +95,11 @@ def salvar_avaliacao(
 def render():
     st.title("📋 Avaliação de Dor")
 
+    # Mensagem do salvamento anterior (o form é limpo com rerun)
+    salva = st.session_state.pop("avaliacao_salva", None)
+    if salva:
+        st.success(f"Avaliação de {salva} salva com sucesso 🐾")
+
     # --------------------------------------------------------
     # 🔐 Usuário logado
     # --------------------------------------------------------
@@ -112,6 +114,7 @@ def render():
     # 🐾 Seleção do animal
     # --------------------------------------------------------
     animais = carregar_animais_do_tutor(tutor_id)
+    aviso_dados_obsoletos(animais)
 
     if not animais:
         st.info("Você ainda não possui animais cadastrados.")
@@ -129,71 +132,80 @@ def render():
         return
 
     categorias = especie_cfg.get("categorias", [])
-    if not categorias:
+    plano = obter_plano_pontuacao(especie_cfg["id"])
+    if not categorias or plano is None:
         st.warning("Esta espécie não possui categorias configuradas.")
         return
 
     # --------------------------------------------------------
-    # 📋 Questionário
+    # 📋 Questionário (um único form: cliques não geram rerun)
     # --------------------------------------------------------
     st.subheader(f"🧪 Avaliação para {animal['nome']}")
 
     respostas: Dict[str, Any] = {}
-    pontuacao_total = 0
+    chaves_form = []
 
-    for categoria in categorias:
-        st.markdown(f"### 🔹 {categoria['nome']}")
+    with st.form(key=f"form_avaliacao_{animal['id']}"):
+        for categoria in categorias:
+            st.markdown(f"### 🔹 {categoria['nome']}")
 
-        perguntas = categoria.get("perguntas", [])
-        if not perguntas:
-            continue
+            perguntas = categoria.get("perguntas", [])
+            if not perguntas:
+                continue
 
-        for pergunta in perguntas:
-            labels = get_escala_labels(pergunta["escala"])
+            for pergunta in perguntas:
+                labels = plano.labels[plano.indice[pergunta["id"]]]
 
-            key_radio = f"{animal['id']}_{categoria['id']}_{pergunta['id']}"
+                key_radio = f"{animal['id']}_{categoria['id']}_{pergunta['id']}"
+                chaves_form.append(key_radio)
 
-            escolha = st.radio(
-                pergunta["texto"],
-                labels,
-                key=key_radio,
-                horizontal=True,
-            )
+                escolha = st.radio(
+                    pergunta["texto"],
+                    labels,
+                    key=key_radio,
+                    horizontal=True,
+                )
 
-            respostas[pergunta["id"]] = escolha
+                respostas[pergunta["id"]] = escolha
 
-            try:
-                pontuacao_total += labels.index(escolha)
-            except ValueError:
-                pass
+            st.divider()
 
-        st.divider()
+        col_calcular, col_salvar = st.columns(2)
+        calcular = col_calcular.form_submit_button("📊 Calcular pontuação")
+        salvar = col_salvar.form_submit_button("💾 Salvar Avaliação", type="primary")
 
     # --------------------------------------------------------
-    # 📊 Resultado
+    # 📊 Resultado (valores enviados pelo form)
     # --------------------------------------------------------
-    st.metric("Pontuação Total", pontuacao_total)
+    resultado = plano.score(respostas)
 
-    if respostas:
-        percentual = round(
-            (pontuacao_total / (len(respostas) * 7)) * 100,
-            2
-        )
-        st.metric("Percentual de Dor", f"{percentual}%")
+    if calcular or salvar:
+        col1, col2 = st.columns(2)
+        col1.metric("Pontuação Total", f"{resultado['total']} / {resultado['maximo']}")
+        col2.metric("Percentual de Dor", f"{resultado['percentual']}%")
+
+        with st.expander("Pontuação por categoria"):
+            for cat in resultado["categorias"].values():
+                st.write(f"- {cat['nome']}: **{cat['total']} / {cat['maximo']}**")
+    else:
+        st.caption("Responda e clique em **Calcular pontuação** para ver o resultado.")
 
     # --------------------------------------------------------
     # 💾 Salvar
     # --------------------------------------------------------
-    if st.button("💾 Salvar Avaliação"):
+    if salvar:
         sucesso = salvar_avaliacao(
             animal_id=animal["id"],
             avaliador_id=tutor_id,
             respostas=respostas,
-            pontuacao_total=pontuacao_total,
+            resultado=resultado,
         )
 
         if sucesso:
-            st.success("Avaliação salva com sucesso 🐾")
+            # Limpa as respostas: um novo clique em Salvar não duplica
+            for chave in chaves_form:
+                st.session_state.pop(chave, None)
+            st.session_state["avaliacao_salva"] = animal["nome"]
             st.rerun()
         else:
             st.error("Erro ao salvar avaliação.")
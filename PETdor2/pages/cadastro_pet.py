@@ -15,8 +15,10 @@ from typing import List, Dict, Any, Optional
 from backend.database import (
     supabase_table_insert,
     supabase_table_select,
+    QUERY_CACHE_TTL,
 )
 from backend.especies.index import listar_especies
+from frontend.components.avisos import aviso_dados_obsoletos
 
 logger = logging.getLogger(__name__)
 
@@ -60,6 +62,8 @@ def listar_pets_do_tutor(tutor_id: str) -> List[Dict[str, Any]]:
                 "ativo": True,
             },
             order="nome.asc",
+            cache_ttl=QUERY_CACHE_TTL,
+            permitir_obsoleta=True,
         ) or []
     except Exception as e:
         logger.error("Erro ao listar pets", exc_info=True)
@@ -132,6 +136,7 @@ def render():
     st.subheader("Seus pets cadastrados")
 
     pets = listar_pets_do_tutor(tutor_id)
+    aviso_dados_obsoletos(pets)
 
     if not pets:
         st.info("Você ainda não cadastrou nenhum pet.")
@@ -9,6 +9,7 @@ import logging
 from typing import Dict, Any
 
 from backend.database import supabase_table_update
+from backend.auth.user import invalidar_perfil_usuario
 from backend.utils.validators import validar_email
 
 logger = logging.getLogger(__name__)
@@ -116,6 +117,7 @@ def render():
                 # Atualiza session_state
                 st.session_state["user_data"]["nome"] = nome
                 st.session_state["user_data"]["email"] = email
+                invalidar_perfil_usuario()
 
                 st.rerun()
             else:
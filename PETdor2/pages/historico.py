@@ -9,17 +9,22 @@ import streamlit as st
 import pandas as pd
 import logging
 from datetime import datetime
-from typing import List, Dict, Any
-from io import BytesIO
-
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib.pagesizes import A4
+from typing import List, Dict, Any, Optional, Tuple
 
 from backend.database import (
     supabase_table_select,
+    supabase_table_iter,
     supabase_table_delete,
+    LeituraIncompleta,
+    QUERY_CACHE_TTL,
+)
+from backend.utils.report_engine import (
+    texto_pergunta,
+    gerar_pdf_avaliacoes,
+    pdf_em_cache,
 )
+from backend.utils.report_batch import exportar_lote
+from frontend.components.avisos import aviso_dados_obsoletos
 
 logger = logging.getLogger(__name__)
 
@@ -27,82 +32,166 @@ logger = logging.getLogger(__name__)
 # Buscar avaliações
 # ==========================================================
 
-def buscar_avaliacoes_usuario(usuario_id: str) -> List[Dict[str, Any]]:
-    try:
-        avaliacoes = supabase_table_select(
-            table="avaliacoes_dor",
-            filters={"avaliador_id": usuario_id},
-            order="criado_em.desc",
-        ) or []
-
-        animais = supabase_table_select(
-            table="animais",
-            filters={"tutor_id": usuario_id},
-        ) or []
-
-        animais_map = {a["id"]: a for a in animais}
-
-        for a in avaliacoes:
-            animal = animais_map.get(a.get("animal_id"), {})
-            a["animal_nome"] = animal.get("nome", "Desconhecido")
-            a["animal_especie"] = animal.get("especie", "Desconhecida")
-
-        return avaliacoes
+HISTORICO_POR_PAGINA = 20
+OPCOES_POR_PAGINA = [10, 20, 50]
+
+SELECT_HISTORICO = "*, animais(nome, especie)"
+
+
+def consulta_historico(
+    usuario_id: str,
+    pagina: int = 0,
+    por_pagina: int = HISTORICO_POR_PAGINA,
+) -> Dict[str, Any]:
+    """Argumentos de supabase_table_select para uma página do histórico."""
+    # Pede uma linha a mais só para saber se existe próxima página
+    return {
+        "table": "avaliacoes_dor",
+        "filters": {"avaliador_id": usuario_id},
+        "select": SELECT_HISTORICO,
+        "order": "criado_em.desc",
+        "limit": por_pagina + 1,
+        "offset": pagina * por_pagina,
+        "cache_ttl": QUERY_CACHE_TTL,
+        "permitir_obsoleta": True,
+    }
+
+
+def consulta_animais(usuario_id: str) -> Dict[str, Any]:
+    return {
+        "table": "animais",
+        "filters": {"tutor_id": usuario_id},
+        "select": "id, nome",
+        "order": "nome.asc",
+        "cache_ttl": QUERY_CACHE_TTL,
+        "permitir_obsoleta": True,
+    }
+
+
+def montar_pagina(
+    linhas: Optional[List[Dict[str, Any]]],
+    por_pagina: int = HISTORICO_POR_PAGINA,
+) -> Tuple[List[Dict[str, Any]], bool]:
+    """(avaliacoes, tem_proxima_pagina) a partir do resultado da consulta."""
+    linhas = linhas or []
+    aviso_dados_obsoletos(linhas)
+
+    tem_proxima = len(linhas) > por_pagina
+    avaliacoes = [_achatar_animal(a) for a in linhas[:por_pagina]]
+
+    return avaliacoes, tem_proxima
+
+
+def _achatar_animal(avaliacao: Dict[str, Any]) -> Dict[str, Any]:
+    animal = avaliacao.pop("animais", None) or {}
+    avaliacao["animal_nome"] = animal.get("nome", "Desconhecido")
+    avaliacao["animal_especie"] = animal.get("especie", "Desconhecida")
+    return avaliacao
+
+
+def buscar_todas_avaliacoes(
+    usuario_id: str,
+    animal_id: Optional[str] = None,
+) -> Optional[List[Dict[str, Any]]]:
+    """
+    Histórico completo (ou de um animal) para exportação em lote.
+    None se a leitura parar no meio (não exporta histórico pela metade).
+    """
+    filtros = {"avaliador_id": usuario_id}
+    if animal_id:
+        filtros["animal_id"] = animal_id
 
-    except Exception:
-        logger.exception("Erro ao buscar avaliações")
-        return []
+    try:
+        return [
+            _achatar_animal(a)
+            for a in supabase_table_iter(
+                table="avaliacoes_dor",
+                filters=filtros,
+                select=SELECT_HISTORICO,
+                cursor="criado_em",
+                desc=True,
+            )
+        ]
+    except LeituraIncompleta:
+        logger.exception("Histórico incompleto para exportação")
+        return None
 
 
 # ==========================================================
 # PDF
 # ==========================================================
 
-def gerar_pdf_avaliacao(avaliacao: Dict[str, Any]) -> bytes:
-    buffer = BytesIO()
+def obter_pdf_avaliacao(avaliacao: Dict[str, Any]) -> bytes:
+    """PDF da avaliação via cache de relatórios (gera só na primeira vez)."""
+    return gerar_pdf_avaliacoes([avaliacao])
 
-    doc = SimpleDocTemplate(
-        buffer,
-        pagesize=A4,
-        rightMargin=40,
-        leftMargin=40,
-        topMargin=40,
-        bottomMargin=40,
-    )
 
-    styles = getSampleStyleSheet()
-    elements = []
+# ==========================================================
+# Exportação em lote
+# ==========================================================
 
-    elements.append(Paragraph("PETDor – Relatório de Avaliação de Dor", styles["Title"]))
-    elements.append(Spacer(1, 12))
+FORMATOS_EXPORTACAO = {
+    "ZIP (um PDF por avaliação)": ("zip", "application/zip"),
+    "PDF único": ("pdf", "application/pdf"),
+}
 
-    elements.append(Paragraph(f"<b>Animal:</b> {avaliacao['animal_nome']}", styles["Normal"]))
-    elements.append(Paragraph(f"<b>Espécie:</b> {avaliacao['animal_especie']}", styles["Normal"]))
-    elements.append(
-        Paragraph(
-            f"<b>Data:</b> {pd.to_datetime(avaliacao['criado_em']).strftime('%d/%m/%Y %H:%M')}",
-            styles["Normal"],
-        )
-    )
-    elements.append(Paragraph(f"<b>Pontuação Total:</b> {avaliacao['pontuacao_total']}", styles["Normal"]))
-    elements.append(Spacer(1, 12))
 
-    elements.append(Paragraph("Respostas:", styles["Heading2"]))
-    elements.append(Spacer(1, 6))
+def render_exportacao_lote(usuario_id: str) -> None:
+    with st.expander("📦 Exportar histórico em lote"):
+        # O corpo do expander roda mesmo fechado: a lista de animais só
+        # é buscada depois que o usuário liga a exportação
+        if not st.toggle("Preparar exportação", key="lote_ativo"):
+            return
 
-    for pergunta, resposta in avaliacao.get("respostas", {}).items():
-        elements.append(
-            Paragraph(
-                f"- {pergunta.replace('_', ' ').title()}: <b>{resposta}</b>",
-                styles["Normal"],
-            )
-        )
+        animais = supabase_table_select(**consulta_animais(usuario_id)) or []
 
-    doc.build(elements)
-    pdf = buffer.getvalue()
-    buffer.close()
+        opcoes = {"Todos os animais": None}
+        opcoes.update({a["nome"]: a["id"] for a in animais})
 
-    return pdf
+        escopo = st.selectbox("Paciente", list(opcoes.keys()), key="lote_animal")
+        rotulo_formato = st.radio(
+            "Formato",
+            list(FORMATOS_EXPORTACAO.keys()),
+            horizontal=True,
+            key="lote_formato",
+        )
+        formato, mime = FORMATOS_EXPORTACAO[rotulo_formato]
+
+        if st.button("⚙️ Gerar exportação", key="lote_gerar"):
+            avaliacoes = buscar_todas_avaliacoes(usuario_id, opcoes[escopo])
+
+            if avaliacoes is None:
+                st.error("Não foi possível ler todo o histórico. Tente novamente em instantes.")
+                return
+
+            if not avaliacoes:
+                st.info("Nenhuma avaliação para exportar.")
+                return
+
+            barra = st.progress(0.0, text="Gerando relatórios...")
+
+            def progresso(concluidos: int, total: int) -> None:
+                barra.progress(concluidos / total, text=f"{concluidos}/{total} relatórios")
+
+            dados = exportar_lote(avaliacoes, formato, progresso)
+            barra.empty()
+
+            st.session_state["historico_lote"] = {
+                "dados": dados,
+                "mime": mime,
+                "arquivo": f"historico_petdor_{datetime.now():%Y%m%d_%H%M}.{formato}",
+                "total": len(avaliacoes),
+            }
+
+        lote = st.session_state.get("historico_lote")
+        if lote:
+            st.download_button(
+                label=f"⬇️ Baixar {lote['total']} avaliação(ões)",
+                data=lote["dados"],
+                file_name=lote["arquivo"],
+                mime=lote["mime"],
+                key="lote_download",
+            )
 
 
 # ==========================================================
@@ -137,7 +226,25 @@ def render():
     usuario_id = usuario["id"]
     is_admin = bool(usuario.get("is_admin"))
 
-    avaliacoes = buscar_avaliacoes_usuario(usuario_id)
+    por_pagina = st.selectbox(
+        "Avaliações por página",
+        OPCOES_POR_PAGINA,
+        index=OPCOES_POR_PAGINA.index(HISTORICO_POR_PAGINA),
+        key="historico_por_pagina",
+        on_change=lambda: st.session_state.update(historico_pagina=0),
+    )
+
+    pagina = st.session_state.get("historico_pagina", 0)
+
+    render_exportacao_lote(usuario_id)
+
+    linhas = supabase_table_select(**consulta_historico(usuario_id, pagina, por_pagina))
+    avaliacoes, tem_proxima = montar_pagina(linhas, por_pagina)
+
+    if not avaliacoes and pagina > 0:
+        # Página ficou vazia (ex.: após deletar) → volta uma
+        st.session_state["historico_pagina"] = pagina - 1
+        st.rerun()
 
     if not avaliacoes:
         st.info("Nenhuma avaliação encontrada.")
@@ -152,19 +259,27 @@ def render():
             f"🐾 {aval['animal_nome']} — {aval['animal_especie']} — {data_formatada} — Dor: {aval['pontuacao_total']}"
         ):
             st.metric("Pontuação de Dor", aval["pontuacao_total"])
-            st.json(aval["respostas"])
+            for pergunta_id, resposta in (aval.get("respostas") or {}).items():
+                st.write(f"- {texto_pergunta(aval['animal_especie'], pergunta_id)}: **{resposta}**")
 
             col1, col2 = st.columns(2)
 
-            # PDF
+            # PDF (gerado só quando pedido)
             with col1:
-                pdf = gerar_pdf_avaliacao(aval)
-                st.download_button(
-                    label="📄 Exportar PDF",
-                    data=pdf,
-                    file_name=f"avaliacao_{aval_id}.pdf",
-                    mime="application/pdf",
-                )
+                pdf = pdf_em_cache([aval])
+
+                if pdf is None and st.button("📄 Gerar PDF", key=f"pdf_{aval_id}"):
+                    with st.spinner("Gerando PDF..."):
+                        pdf = obter_pdf_avaliacao(aval)
+
+                if pdf is not None:
+                    st.download_button(
+                        label="⬇️ Baixar PDF",
+                        data=pdf,
+                        file_name=f"avaliacao_{aval_id}.pdf",
+                        mime="application/pdf",
+                        key=f"download_{aval_id}",
+                    )
 
             # Delete (admin only)
             with col2:
@@ -178,6 +293,22 @@ def render():
                 else:
                     st.info("🔒 Apenas administradores podem deletar.")
 
+    # Navegação entre páginas
+    col_ant, col_pag, col_prox = st.columns([1, 2, 1])
+
+    with col_ant:
+        if pagina > 0 and st.button("⬅️ Anteriores", key="historico_anterior"):
+            st.session_state["historico_pagina"] = pagina - 1
+            st.rerun()
+
+    with col_pag:
+        st.caption(f"Página {pagina + 1}")
+
+    with col_prox:
+        if tem_proxima and st.button("Próximas ➡️", key="historico_proxima"):
+            st.session_state["historico_pagina"] = pagina + 1
+            st.rerun()
+
 
 # ==========================================================
 # 🚀 EXECUÇÃO AUTOMÁTICA (ESSENCIAL)
@@ -46,19 +46,39 @@ except Exception:
 # ==========================================================
 
 try:
-    from backend.database import testar_conexao
+    from backend.database import status_backend
+
+    # Lido da memória: a sonda roda em segundo plano (backend/database/health.py)
+    saude = status_backend()
 
     with st.sidebar:
         st.divider()
 
-        if testar_conexao():
+        if saude["online"] is None:
+            st.info("🟡 Verificando backend...")
+        elif saude["online"]:
             st.success("🟢 Backend online")
+            st.caption(f"Latência: {saude['latencia_ms']:.0f} ms")
         else:
             st.error("🔴 Backend offline")
 
 except Exception:
     pass
 
+# ==========================================================
+# 📮 OUTBOX DE E-MAILS
+# ==========================================================
+
+try:
+    from backend.email.outbox import get_outbox
+
+    # Sobe o despachante já no início: e-mails que ficaram no spool
+    # antes de um restart saem sem esperar um novo enfileiramento
+    get_outbox()
+
+except Exception:
+    pass
+
 # ==========================================================
 # 🧠 SESSION CONTROL
 # ==========================================================